@@ -4,3 +4,20 @@ from django.apps import AppConfig
 class AccountsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'accounts'
+
+    def ready(self):
+        # KPIs do dashboard global mantidos por sinais (crontex/kpis.py)
+        from django.contrib.auth import get_user_model
+
+        from crontex.kpis import register
+
+        from .models import Account, Membership
+
+        User = get_user_model()
+        register("accounts.account.total", Account)
+        register("accounts.account.active", Account, match={"is_active": True})
+        register("accounts.account.plan", Account, group_by="plan")
+        register("accounts.membership.users", Membership, distinct="user_id")
+        register("auth.user.total", User)
+        register("auth.user.staff", User, match={"is_staff": True})
+        register("auth.user.superuser", User, match={"is_superuser": True})
@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+"""
+Reconta do zero os KPIs dos dashboards (tabela accounts_kpicounter).
+
+Uso:
+    python manage.py recount_kpis
+    python manage.py recount_kpis --name catalog.product.active
+
+Normalmente desnecessário: sinais e a importação mantêm os contadores. Use
+após escritas feitas por fora do ORM (SQL direto, queryset.update em massa,
+restauração de backup).
+"""
+
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand, CommandError
+
+from crontex.kpis import recount, registered
+
+
+class Command(BaseCommand):
+    help = "Reconta os KPIs dos dashboards a partir das tabelas de origem."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--name", action="append", default=None, help="KPI a recontar (repetível); padrão: todos")
+
+    def handle(self, *args, **opts):
+        names = opts["name"]
+        known = registered()
+        unknown = [n for n in names or () if n not in known]
+        if unknown:
+            raise CommandError(f"KPI desconhecido: {', '.join(unknown)}. Registrados: {', '.join(known)}")
+        for name, value in sorted(recount(names).items()):
+            self.stdout.write(f"{name}: {value}")
+        self.stdout.write(self.style.SUCCESS("KPIs recontados."))
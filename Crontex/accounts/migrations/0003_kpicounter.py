@@ -0,0 +1,23 @@
+# Generated by Django 5.2.6 on 2026-10-17 01:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_globaluserrole_servicetoken'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='KpiCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=120, unique=True)),
+                ('value', models.BigIntegerField(default=0)),
+                ('stale', models.BooleanField(default=False)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -112,3 +112,18 @@ class ServiceToken(models.Model):
     def masked(self) -> str:
         """Representação mascarada p/ logs e UI."""
         return f"***{self.key_hash[-6:]}"
+
+
+# ---------------- KPIs (dashboards) ----------------
+class KpiCounter(models.Model):
+    """
+    Contador de KPI mantido por sinais e operações em lote (crontex/kpis.py).
+    stale=True: valor não confiável (escrita sem delta conhecido) — recontado na próxima leitura.
+    """
+    name = models.CharField(max_length=120, unique=True)  # ex.: catalog.product.active, accounts.account.plan:pro
+    value = models.BigIntegerField(default=0)
+    stale = models.BooleanField(default=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self) -> str:
+        return f"{self.name}={self.value}{' (stale)' if self.stale else ''}"
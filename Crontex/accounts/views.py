@@ -1,7 +1,7 @@
 from django.contrib import messages
 from django.contrib.auth import get_user_model
 from django.contrib.auth.decorators import login_required, user_passes_test
-from django.db.models import Count, Q
+from django.db.models import Q
 from django.shortcuts import get_object_or_404, redirect, render
 from django.utils.decorators import method_decorator
 from django.views import View
@@ -12,7 +12,9 @@ from .forms import (
     GlobalUserForm,
     GlobalUserRoleForm,
 )
-from .models import Account, Membership, GlobalUserRole
+from crontex.kpis import get_kpis, group
+
+from .models import Account, GlobalUserRole
 
 User = get_user_model()
 
@@ -48,27 +50,19 @@ class GlobalDashboardView(View):
     template_name = "accounts/global_dashboard.html"
 
     def get(self, request):
-        # KPIs de contas
-        total_accounts = Account.objects.count()
-        active_accounts = Account.objects.filter(is_active=True).count()
-        per_plan = Account.objects.values("plan").annotate(qty=Count("id")).order_by("plan")
-
-        # KPIs de usuários da plataforma
-        users_plat_total = User.objects.count()
-        staff_count = User.objects.filter(is_staff=True).count()
-        superusers_count = User.objects.filter(is_superuser=True).count()
-
-        # Usuários distintos vinculados a tenants
-        users_tenants_distinct = Membership.objects.values("user_id").distinct().count()
-
+        # KPIs mantidos por sinais (crontex/kpis.py): uma leitura em cache, sem COUNT(*) por acesso
+        kpis = get_kpis()
         ctx = {
-            "total_accounts": total_accounts,
-            "active_accounts": active_accounts,
-            "per_plan": per_plan,
-            "users_plat_total": users_plat_total,
-            "staff_count": staff_count,
-            "superusers_count": superusers_count,
-            "users_tenants_distinct": users_tenants_distinct,
+            # contas
+            "total_accounts": kpis["accounts.account.total"],
+            "active_accounts": kpis["accounts.account.active"],
+            "per_plan": [{"plan": plan, "qty": qty} for plan, qty in group(kpis, "accounts.account.plan")],
+            # usuários da plataforma
+            "users_plat_total": kpis["auth.user.total"],
+            "staff_count": kpis["auth.user.staff"],
+            "superusers_count": kpis["auth.user.superuser"],
+            # usuários distintos vinculados a tenants
+            "users_tenants_distinct": kpis["accounts.membership.users"],
         }
         return render(request, self.template_name, ctx)
 
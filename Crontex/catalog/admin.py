@@ -1,6 +1,8 @@
 # -*- coding: utf-8 -*-
 from django.contrib import admin
-from .models import Product
+from .models import EanCounter, ImportJob, Product
+from .services.import_jobs import requeue
+from .services.product_search import fts_enabled, search_products
 
 @admin.register(Product)
 class ProductAdmin(admin.ModelAdmin):
@@ -14,4 +16,44 @@ class ProductAdmin(admin.ModelAdmin):
         "ncm", "gtin", "brand", "supplier_code", "supplier_name",
     )
     list_filter = ("is_active", "product_category", "brand", "status")
-    readonly_fields = ("created_at", "updated_at")
+    readonly_fields = ("ean_block", "created_at", "updated_at")
+
+    def get_ordering(self, request):
+        # com busca e sem ordenação escolhida na tela: mais relevantes primeiro
+        if (request.GET.get("q") or "").strip() and "o" not in request.GET and fts_enabled():
+            return ("search_document__rank", "-id")
+        return super().get_ordering(request)
+
+    def get_search_results(self, request, queryset, search_term):
+        # índice FTS (services/product_search.py); search_fields fica como fallback sem FTS5
+        if not search_term.strip() or not fts_enabled(queryset.db):
+            return super().get_search_results(request, queryset, search_term)
+        return search_products(queryset, search_term), False
+
+
+@admin.register(EanCounter)
+class EanCounterAdmin(admin.ModelAdmin):
+    list_display = ("name", "next_value", "updated_at")
+    readonly_fields = ("updated_at",)
+
+
+@admin.register(ImportJob)
+class ImportJobAdmin(admin.ModelAdmin):
+    list_display = (
+        "id", "kind", "mode", "status", "original_name", "rows_processed",
+        "error_count", "rows_per_sec", "attempts", "created_at",
+    )
+    list_filter = ("kind", "mode", "status")
+    search_fields = ("original_name",)
+    readonly_fields = (
+        "rows_processed", "rows_created", "rows_updated", "rows_unchanged", "rows_missing",
+        "error_count", "errors",
+        "rows_per_sec", "checkpoint", "worker", "attempts", "heartbeat_at",
+        "started_at", "finished_at", "created_at",
+    )
+    actions = ["requeue_jobs"]
+
+    @admin.action(description="Reenfileirar (continua do checkpoint)")
+    def requeue_jobs(self, request, queryset):
+        for job in queryset.exclude(status=ImportJob.Status.RUNNING):
+            requeue(job)
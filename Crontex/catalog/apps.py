@@ -1,4 +1,5 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 class CatalogConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
@@ -6,4 +7,23 @@ class CatalogConfig(AppConfig):
 
     def ready(self):
         # registra validações de EAN em variantes
-        import catalog.signals.ean  # noqa: F401
\ No newline at end of file
+        import catalog.signals.ean  # noqa: F401
+        # mantém o índice de códigos de barras coerente com exclusões
+        import catalog.signals.barcode  # noqa: F401
+        # índice FTS de busca de produtos (save/delete)
+        import catalog.signals.search  # noqa: F401
+        # totais das listas paginadas (crontex/pagination.py) invalidados a cada escrita
+        from catalog.models import Product
+        from crontex.pagination import connect_count_invalidation
+
+        connect_count_invalidation(Product, "catalog.product")
+        # KPIs do dashboard (crontex/kpis.py)
+        from crontex.kpis import register
+
+        register("catalog.product.total", Product)
+        register("catalog.product.active", Product, match={"is_active": True})
+
+        if getattr(settings, "CATALOG_BARCODE_WARM_ON_START", False):
+            from catalog.services.barcode_index import warm_in_background
+
+            warm_in_background()
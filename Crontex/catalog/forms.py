@@ -9,8 +9,11 @@ from django.core.exceptions import ValidationError
 
 # NOVO: validar IDs de pessoa
 from people.models import Contact
+from people.services.contact_resolver import ContactResolver
 
 from .models import Product
+from .services.people_links import PEOPLE_FIELDS
+from .services.grade_combos import combo_count, grade_value_lists, max_combos
 
 
 # =========================
@@ -127,7 +130,10 @@ class ContactIdField(forms.IntegerField):
     """
     Campo inteiro opcional que garante a existência de um Contact.
     Útil para os pares TEXT + HIDDEN vindos do autocomplete.
+    Com `resolver` (ProductForm liga o do form), a checagem sai do lote já buscado.
     """
+    resolver: Optional[ContactResolver] = None
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, required=False, min_value=1, **kwargs)
 
@@ -135,7 +141,11 @@ class ContactIdField(forms.IntegerField):
         value = super().clean(value)
         if not value:
             return None
-        if not Contact.objects.filter(pk=value).exists():
+        if self.resolver is not None:
+            found = self.resolver.exists(value)
+        else:
+            found = Contact.objects.filter(pk=value).exists()
+        if not found:
             raise ValidationError("Contato inválido (ID não encontrado).")
         return int(value)
 
@@ -144,6 +154,11 @@ class ContactIdField(forms.IntegerField):
 # Form
 # =========================
 
+# Pares pessoa (texto, *_id). Nos do pedido o texto só vale com ID selecionado;
+# em OS/manufatura o texto livre (legado) continua aceito quando não há ID.
+PERSON_PAIRS: List[Tuple[str, str]] = [(f[:-3], f) for _section, _key, f in PEOPLE_FIELDS]
+STRICT_PERSON_PAIRS = frozenset({"pedido_requisitante", "pedido_cliente"})
+
 class ProductForm(forms.ModelForm):
     """
     Form de Produto com abas:
@@ -169,6 +184,12 @@ class ProductForm(forms.ModelForm):
     os_pilotagem = forms.CharField(label="Pilotagem", max_length=150, required=False)  # <- pessoa
     os_encaixe = forms.CharField(label="Encaixe", max_length=150, required=False)      # <- pessoa
 
+    os_estilo_id = ContactIdField(widget=forms.HiddenInput())
+    os_arte_id = ContactIdField(widget=forms.HiddenInput())
+    os_modelagem_id = ContactIdField(widget=forms.HiddenInput())
+    os_pilotagem_id = ContactIdField(widget=forms.HiddenInput())
+    os_encaixe_id = ContactIdField(widget=forms.HiddenInput())
+
     # ===================== ABA: MANUFATURA =====================
     m_corte = forms.CharField(label="Corte", max_length=150, required=False)           # <- pessoa
     m_costura = forms.CharField(label="Costura", max_length=150, required=False)       # <- pessoa
@@ -177,6 +198,13 @@ class ProductForm(forms.ModelForm):
     m_lavanderia = forms.CharField(label="Lavanderia", max_length=150, required=False) # <- pessoa
     m_acabamento = forms.CharField(label="Acabamento", max_length=150, required=False) # <- pessoa
 
+    m_corte_id = ContactIdField(widget=forms.HiddenInput())
+    m_costura_id = ContactIdField(widget=forms.HiddenInput())
+    m_estamparia_id = ContactIdField(widget=forms.HiddenInput())
+    m_bordado_id = ContactIdField(widget=forms.HiddenInput())
+    m_lavanderia_id = ContactIdField(widget=forms.HiddenInput())
+    m_acabamento_id = ContactIdField(widget=forms.HiddenInput())
+
     # ===================== ABA: MATERIAL =====================
     material_tecido_1 = forms.CharField(label="Tecido 1", max_length=150, required=False)
 
@@ -272,25 +300,26 @@ class ProductForm(forms.ModelForm):
         self.fields["gtin"].widget.attrs.setdefault("placeholder", "EAN/GTIN")
         self.fields["product_category"].widget.attrs.setdefault("placeholder", "Categoria interna")
 
-        # [NOVO] Hidrata o texto quando já houver ID salvo (edição)
-        def _hydrate_text(text_field: str, id_field: str):
+        # Pessoas: IDs salvos em bling_extra["people"] viram initial (edição) e todos os
+        # IDs possíveis (initial + POST) são resolvidos numa consulta só (in_bulk)
+        self.contacts = ContactResolver()
+        people = _as_dict(_as_dict(getattr(self.instance, "bling_extra", None)).get("people"))
+        for section, key, id_field in PEOPLE_FIELDS:
+            saved = _as_dict(people.get(section)).get(key)
+            if saved and id_field not in self.initial:
+                self.initial[id_field] = saved
+            self.fields[id_field].resolver = self.contacts
+            self.contacts.want(self.initial.get(id_field), self.data.get(id_field))
+
+        # Hidrata o texto quando já houver ID salvo (edição)
+        for text_field, id_field in PERSON_PAIRS:
             # tenta pegar do initial (edição) ou POST (re-render)
             txt = self.initial.get(text_field) or self.data.get(text_field)
-            cid = (
-                self.initial.get(id_field)
-                or self.data.get(id_field)
-                or self.fields[id_field].initial
-            )
-            if (not txt) and cid:
-                try:
-                    c = Contact.objects.get(pk=int(cid))
-                    self.initial[text_field] = getattr(c, "name", str(c))
-                except Exception:
-                    pass
-
-        _hydrate_text("pedido_requisitante", "pedido_requisitante_id")
-        _hydrate_text("pedido_cliente", "pedido_cliente_id")
-        # (Se desejar, replicamos para OS/Manufatura em um próximo passo.)
+            cid = self.initial.get(id_field) or self.data.get(id_field)
+            if not txt and cid:
+                name = self.contacts.name(cid)
+                if name:
+                    self.initial[text_field] = name
 
         # Pré-carregar grade_payload a partir de bling_extra.grade (edição)
         try:
@@ -326,6 +355,13 @@ class ProductForm(forms.ModelForm):
 
         norm, issues = _validate_grade_payload_struct(obj)
 
+        # trava contra explosão combinatória (conta sem expandir)
+        total = combo_count(grade_value_lists(norm))
+        if total > max_combos():
+            issues.append(
+                f"A grade gera {total} combinações; o máximo permitido é {max_combos()}."
+            )
+
         if issues:
             # concatena mensagens amigáveis; 1 erro por linha
             raise ValidationError("\n".join(issues))
@@ -333,29 +369,25 @@ class ProductForm(forms.ModelForm):
         # retorna JSON compactado e normalizado
         return json.dumps(norm, ensure_ascii=False, separators=(",", ":"))
 
-    # [NOVO] Clean geral para manter coerência entre texto e ID (requisitante/cliente)
+    # [NOVO] Clean geral para manter coerência entre texto e ID (pares pessoa)
     def clean(self):
         data = super().clean()
 
-        def _sync_pair(text_key: str, id_key: str):
-            txt = (data.get(text_key) or "").strip()
+        for text_key, id_key in PERSON_PAIRS:
             cid = data.get(id_key)
             if cid:
-                try:
-                    c = Contact.objects.get(pk=int(cid))
-                    # força o texto para o nome oficial
-                    data[text_key] = getattr(c, "name", str(c))
-                except Exception:
+                # força o texto para o nome oficial (contato já buscado no lote do resolver)
+                name = self.contacts.name(cid)
+                if name:
+                    data[text_key] = name
+                else:
                     # se o ID não existir aqui por algum motivo, zera ambos
                     data[text_key] = ""
                     data[id_key] = None
-            else:
+            elif text_key in STRICT_PERSON_PAIRS:
                 # sem ID selecionado => não deixa sobrar texto solto
                 data[text_key] = ""
 
-        _sync_pair("pedido_requisitante", "pedido_requisitante_id")
-        _sync_pair("pedido_cliente", "pedido_cliente_id")
-
         return data
 
     # ----------------- save -----------------
@@ -418,3 +450,20 @@ class ProductForm(forms.ModelForm):
             self.save_m2m()
 
         return instance
+
+
+# =========================
+# Importação Bling
+# =========================
+
+class ProdutoImportForm(forms.Form):
+    file = forms.FileField(
+        label="Planilha Bling",
+        help_text="CSV (; ou ,) ou XLSX exportado do Bling. Colunas obrigatórias: Código e Descrição.",
+        widget=forms.ClearableFileInput(attrs={"accept": ".csv,.xlsx,.xlsm", "class": "input"}),
+    )
+    dry_run = forms.BooleanField(
+        label="Só pré-visualizar",
+        required=False,
+        help_text="Mostra novos, alterados (por campo) e ausentes sem gravar nada; depois é possível aplicar.",
+    )
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""
+Micro-benchmark do dígito verificador GTIN: laço por dígito (implementação
+antiga) x tabelas pré-calculadas de catalog.utils.gtin.
+
+Uso:
+    python manage.py bench_gtin --codes 200000
+
+Gera GTIN-8/12/13/14 sintéticos (válidos, um a cada 10 com DV errado) e mede
+check_digit(), is_valid() e validate_many() — sem banco.
+"""
+
+from __future__ import annotations
+
+import random
+import time
+from typing import Callable, List
+
+from django.core.management.base import BaseCommand
+
+from catalog.utils import gtin
+
+
+def _legacy_check_digit(body: str) -> int:
+    # implementação anterior (validators._check_digit_mod10), mantida só como referência
+    total = 0
+    for i, ch in enumerate(reversed(body), start=1):
+        total += (ord(ch) - 48) * (3 if i % 2 == 1 else 1)
+    return (10 - (total % 10)) % 10
+
+
+def _synthetic_codes(n: int, seed: int) -> List[str]:
+    rnd = random.Random(seed)
+    out: List[str] = []
+    for i in range(n):
+        length = gtin.GTIN_LENGTHS[i % len(gtin.GTIN_LENGTHS)]
+        body = "".join(rnd.choice("0123456789") for _ in range(length - 1))
+        dv = gtin.check_digit(body)
+        if i % 10 == 0:
+            dv = (dv + 1) % 10
+        out.append(f"{body}{dv}")
+    return out
+
+
+class Command(BaseCommand):
+    help = "Mede o cálculo/validação de DV GTIN: laço por dígito x tabelas pré-calculadas."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--codes", type=int, default=200000)
+        parser.add_argument("--seed", type=int, default=42)
+
+    def _time(self, label: str, n: int, fn: Callable[[], object]) -> float:
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        self.stdout.write(f"{label:<22}: {elapsed:7.3f}s  {n / elapsed:12.0f} códigos/s")
+        return elapsed
+
+    def handle(self, *args, **opts):
+        n = opts["codes"]
+        codes = _synthetic_codes(n, opts["seed"])
+        bodies = [c[:-1] for c in codes]
+
+        legacy = self._time("DV laço por dígito", n, lambda: [_legacy_check_digit(b) for b in bodies])
+        table = self._time("DV gtin.check_digit", n, lambda: [gtin.check_digit(b) for b in bodies])
+        self._time("gtin.is_valid", n, lambda: [gtin.is_valid(c) for c in codes])
+        self._time("gtin.validate_many", n, lambda: gtin.validate_many(codes))
+
+        mismatches = sum(_legacy_check_digit(b) != gtin.check_digit(b) for b in bodies)
+        if mismatches:
+            self.stdout.write(self.style.ERROR(f"{mismatches} divergências entre as implementações"))
+        self.stdout.write(self.style.SUCCESS(f"speedup DV: {legacy / table:.2f}x"))
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark do estágio de parse/validação da importação Bling: serial x process pool.
+
+Uso:
+    python manage.py bench_import_parse --rows 100000 --workers 4
+
+Gera linhas sintéticas no formato da planilha (todas as colunas decimais,
+NCM, GTIN e algumas colunas extras) e mede só o parse — sem banco.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Any, Dict, Iterator
+
+from django.core.management.base import BaseCommand
+
+from catalog.schema import KNOWN_FIELDS
+from catalog.services.bling_rows import parse_rows_parallel
+from catalog.utils.ean import ean13_compose
+
+
+def _synthetic_rows(n: int) -> Iterator[Dict[str, Any]]:
+    headers = [f.excel_header for f in KNOWN_FIELDS]
+    for i in range(n):
+        row: Dict[str, Any] = {h: "" for h in headers}
+        row.update({
+            "Código": f"BENCH-{i:07d}",
+            "Descrição": f"Produto sintético {i}",
+            "NCM": "6109.10.00",
+            "GTIN/EAN": ean13_compose(i % 10000, 1, 1, 1),
+            "Preço": f"{i % 1000},90",
+            "Preço de custo": "12,34",
+            "Preço de compra": "1.234,56",
+            "Estoque": "10",
+            "Largura (cm)": "30",
+            "Altura (cm)": "2,5",
+            "Profundidade (cm)": "40",
+            "Peso Líquido (kg)": "0,200",
+            "Peso Bruto (kg)": "0,250",
+            "Frete Grátis": "Não",
+            "Ativo": "Sim",
+        })
+        for c in range(16, 46):
+            row[f"Coluna {c}"] = f"valor {c}"
+        yield row
+
+
+class Command(BaseCommand):
+    help = "Compara o parse/validação serial com o paralelo (process pool) da importação Bling."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=50000)
+        parser.add_argument("--workers", type=int, default=4)
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def _run(self, rows: int, workers: int, batch_size: int) -> float:
+        start = time.perf_counter()
+        errors = 0
+        for parsed in parse_rows_parallel(_synthetic_rows(rows), workers=workers, batch_size=batch_size):
+            errors += not parsed.ok
+        elapsed = time.perf_counter() - start
+        if errors:
+            self.stdout.write(self.style.WARNING(f"  {errors} linhas com erro de validação"))
+        return elapsed
+
+    def handle(self, *args, **opts):
+        rows, workers, batch = opts["rows"], opts["workers"], opts["batch_size"]
+
+        serial = self._run(rows, 1, batch)
+        self.stdout.write(f"serial      : {serial:7.2f}s  {rows / serial:10.0f} linhas/s")
+
+        parallel = self._run(rows, workers, batch)
+        self.stdout.write(f"{workers} processos: {parallel:7.2f}s  {rows / parallel:10.0f} linhas/s")
+        self.stdout.write(self.style.SUCCESS(f"speedup: {serial / parallel:.2f}x"))
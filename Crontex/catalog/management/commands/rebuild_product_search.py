@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+"""
+Reconstrói o índice FTS de busca de produtos (catalog_product_fts).
+
+Uso:
+    python manage.py rebuild_product_search
+
+Normalmente desnecessário: save/delete e a importação mantêm o índice. Use
+após cargas feitas por fora do ORM (SQL direto, restauração de backup).
+"""
+
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand
+
+from catalog.services.product_search import fts_enabled, rebuild_index
+
+
+class Command(BaseCommand):
+    help = "Reconstrói o índice FTS5 de busca de produtos."
+
+    def handle(self, *args, **opts):
+        if not fts_enabled():
+            self.stdout.write(self.style.WARNING("Banco sem índice FTS5 (não é SQLite ou falta a extensão); nada a fazer."))
+            return
+        total = rebuild_index()
+        self.stdout.write(self.style.SUCCESS(f"Índice de busca reconstruído: {total} produtos."))
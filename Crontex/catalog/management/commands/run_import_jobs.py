@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+"""
+Worker local das importações (ImportJob).
+
+Uso:
+    python manage.py run_import_jobs              # loop: consulta a fila a cada 2s
+    python manage.py run_import_jobs --once       # processa o que houver na fila e sai
+    python manage.py run_import_jobs --stale-after 300
+    python manage.py run_import_jobs --workers 4  # parse/validação em 4 processos
+
+Jobs "running" sem heartbeat há mais de --stale-after segundos (worker caiu)
+voltam para a fila e são retomados a partir do checkpoint.
+"""
+
+from __future__ import annotations
+
+import os
+import socket
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from catalog.services.import_jobs import claim_next, requeue_stale, run_job
+
+
+class Command(BaseCommand):
+    help = "Processa a fila de importações (produtos Bling / contatos) fora do request."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Esvazia a fila e sai.")
+        parser.add_argument("--interval", type=float, default=2.0, help="Segundos entre consultas à fila.")
+        parser.add_argument("--stale-after", type=float, default=300.0,
+                            help="Segundos sem heartbeat para considerar um job abandonado.")
+        parser.add_argument("--chunk-size", type=int, default=0, help="Linhas por transação (0 = padrão).")
+        parser.add_argument("--workers", type=int, default=0,
+                            help="Processos de parse/validação (0 = settings.CATALOG_IMPORT_WORKERS).")
+        parser.add_argument("--worker-id", default="", help="Identificador do worker (padrão: host:pid).")
+
+    def handle(self, *args, **opts):
+        worker = opts["worker_id"] or f"{socket.gethostname()}:{os.getpid()}"
+        self.stdout.write(f"Worker {worker} iniciado.")
+        try:
+            while True:
+                close_old_connections()
+                requeued = requeue_stale(opts["stale_after"])
+                if requeued:
+                    self.stdout.write(self.style.WARNING(f"{requeued} job(s) abandonado(s) voltaram para a fila."))
+
+                job = claim_next(worker)
+                if job is None:
+                    if opts["once"]:
+                        break
+                    time.sleep(opts["interval"])
+                    continue
+
+                self.stdout.write(f"Job #{job.pk} ({job.kind}) a partir da linha {job.checkpoint}...")
+                job = run_job(job, chunk_size=opts["chunk_size"] or None, workers=opts["workers"] or None)
+                style = self.style.SUCCESS if job.status == job.Status.DONE else self.style.ERROR
+                self.stdout.write(style(
+                    f"Job #{job.pk}: {job.get_status_display()} — {job.rows_processed} linhas, "
+                    f"{job.rows_created} criados, {job.rows_updated} atualizados, "
+                    f"{job.error_count} erros, {job.rows_per_sec} linhas/s. {job.message}".strip()
+                ))
+        except KeyboardInterrupt:
+            self.stdout.write("Worker interrompido.")
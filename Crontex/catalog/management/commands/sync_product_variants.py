@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+"""
+Materializa a grade (bling_extra["grade"]) dos produtos em ProductVariant.
+
+Uso:
+    python manage.py sync_product_variants                    # produtos com grade e bloco EAN
+    python manage.py sync_product_variants --assign-blocks    # reserva bloco p/ os que não têm antes
+    python manage.py sync_product_variants --sku CAM-001
+
+Cada produto é sincronizado na sua própria transação (ver services/variant_sync.py),
+com a unicidade de EAN checada contra um EanIndex em memória; conflitos de
+EAN/SKU com outro produto são reportados e o produto é pulado.
+
+Variantes só existem para produtos com Product.ean_block (o EAN derivado do
+SKU não é único). Com CATALOG_EAN_AUTO_BLOCKS=False (padrão) nada reserva
+blocos sozinho: rode uma vez com --assign-blocks para reservar os blocos dos
+produtos com grade (contador atômico, ver services/ean_blocks.py).
+"""
+
+from __future__ import annotations
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand
+
+from catalog.models import Product
+from catalog.services.ean_blocks import assign_blocks, default_allocator
+from catalog.services.ean_unique import EanIndex
+from catalog.services.variant_sync import sync_variants
+from crontex.imports import chunked
+
+ASSIGN_CHUNK = 500
+
+
+class Command(BaseCommand):
+    help = "Sincroniza ProductVariant com a grade salva em bling_extra dos produtos."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sku", action="append", default=[], help="Só estes SKUs (pode repetir).")
+        parser.add_argument(
+            "--assign-blocks", action="store_true",
+            help="Reserva bloco EAN para os produtos com grade que ainda não têm, antes de sincronizar.",
+        )
+
+    def handle(self, *args, **opts):
+        graded = Product.objects.filter(bling_extra__has_key="grade")
+        if opts["sku"]:
+            graded = graded.filter(sku__in=opts["sku"])
+        unblocked = graded.filter(ean_block__isnull=True).only("id", "ean_block").order_by("pk")
+        if opts["assign_blocks"]:
+            assigned = 0
+            for chunk in chunked(unblocked.iterator(chunk_size=ASSIGN_CHUNK), ASSIGN_CHUNK):
+                default_allocator.reserve_ahead(len(chunk))  # fora de transação: reserva durável
+                assigned += assign_blocks(chunk)
+            self.stdout.write(f"Blocos EAN reservados: {assigned}.")
+        else:
+            skipped = unblocked.count()
+            if skipped:
+                self.stdout.write(self.style.WARNING(
+                    f"{skipped} produto(s) com grade sem bloco EAN ficaram de fora (use --assign-blocks)."
+                ))
+
+        qs = graded.filter(ean_block__isnull=False).only("id", "sku", "bling_extra", "ean_block").order_by("pk")
+
+        index = EanIndex().load()  # 1 SELECT; checagem de EAN sem consulta por produto
+        totals = {"created": 0, "updated": 0, "deleted": 0, "unchanged": 0}
+        failed = 0
+        for product in qs.iterator(chunk_size=500):
+            try:
+                res = sync_variants(product, index=index)
+            except ValidationError as exc:
+                failed += 1
+                self.stdout.write(self.style.WARNING(f"{product.sku}: {'; '.join(exc.messages)}"))
+                continue
+            for k in totals:
+                totals[k] += getattr(res, k)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Variantes: {totals['created']} criadas, {totals['updated']} atualizadas, "
+            f"{totals['deleted']} removidas, {totals['unchanged']} sem alteração; {failed} produto(s) com conflito."
+        ))
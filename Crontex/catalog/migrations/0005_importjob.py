@@ -0,0 +1,47 @@
+# Generated by Django 5.2.6 on 2026-10-17 00:47
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0004_product_variations_grid_productvariant'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('products', 'Produtos (Bling)'), ('contacts', 'Contatos (CSV)')], max_length=20, verbose_name='Tipo')),
+                ('status', models.CharField(choices=[('queued', 'Na fila'), ('running', 'Processando'), ('done', 'Concluído'), ('failed', 'Falhou')], default='queued', max_length=20, verbose_name='Status')),
+                ('file', models.FileField(upload_to='imports/%Y/%m/', verbose_name='Arquivo')),
+                ('original_name', models.CharField(blank=True, max_length=255, verbose_name='Nome original')),
+                ('rows_processed', models.PositiveIntegerField(default=0, verbose_name='Linhas processadas')),
+                ('rows_created', models.PositiveIntegerField(default=0, verbose_name='Criados')),
+                ('rows_updated', models.PositiveIntegerField(default=0, verbose_name='Atualizados')),
+                ('error_count', models.PositiveIntegerField(default=0, verbose_name='Linhas com erro')),
+                ('errors', models.JSONField(blank=True, default=list, verbose_name='Erros por linha')),
+                ('rows_per_sec', models.FloatField(default=0, verbose_name='Linhas/s')),
+                ('checkpoint', models.PositiveIntegerField(default=0, verbose_name='Checkpoint (linhas commitadas)')),
+                ('message', models.TextField(blank=True, verbose_name='Mensagem')),
+                ('worker', models.CharField(blank=True, max_length=100, verbose_name='Worker')),
+                ('attempts', models.PositiveIntegerField(default=0, verbose_name='Tentativas')),
+                ('heartbeat_at', models.DateTimeField(blank=True, null=True, verbose_name='Último sinal')),
+                ('started_at', models.DateTimeField(blank=True, null=True, verbose_name='Iniciado em')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Finalizado em')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Criado em')),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='import_jobs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Importação',
+                'verbose_name_plural': 'Importações',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'created_at'], name='catalog_imp_status_ce07e9_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.6 on 2026-10-17 00:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0005_importjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='importjob',
+            name='rows_unchanged',
+            field=models.PositiveIntegerField(default=0, verbose_name='Sem alteração'),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='content_hash',
+            field=models.CharField(blank=True, editable=False, max_length=40, verbose_name='Hash do conteúdo importado'),
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.6 on 2026-10-17 00:52
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0006_product_content_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='importjob',
+            name='mode',
+            field=models.CharField(choices=[('import', 'Importar'), ('preview', 'Pré-visualizar (dry-run)'), ('apply', 'Aplicar pré-visualização')], default='import', max_length=20, verbose_name='Modo'),
+        ),
+        migrations.AddField(
+            model_name='importjob',
+            name='rows_missing',
+            field=models.PositiveIntegerField(default=0, verbose_name='Ausentes na planilha'),
+        ),
+        migrations.AddField(
+            model_name='importjob',
+            name='source',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='applies', to='catalog.importjob'),
+        ),
+        migrations.CreateModel(
+            name='ImportChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('action', models.CharField(choices=[('new', 'Novo'), ('changed', 'Alterado'), ('missing', 'Ausente na planilha')], max_length=10, verbose_name='Ação')),
+                ('line', models.PositiveIntegerField(blank=True, null=True, verbose_name='Linha')),
+                ('sku', models.CharField(max_length=64, verbose_name='Código')),
+                ('diff', models.JSONField(blank=True, default=dict, verbose_name='Diferenças')),
+                ('payload', models.JSONField(blank=True, default=dict, verbose_name='Linha importada')),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='changes', to='catalog.importjob')),
+            ],
+            options={
+                'verbose_name': 'Alteração de importação',
+                'verbose_name_plural': 'Alterações de importação',
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['job', 'action', 'id'], name='catalog_imp_job_id_53b498_idx')],
+            },
+        ),
+    ]
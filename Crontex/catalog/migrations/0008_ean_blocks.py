@@ -0,0 +1,31 @@
+# Generated by Django 5.2.6 on 2026-10-17 01:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0007_import_preview'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EanCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=40, unique=True, verbose_name='Nome')),
+                ('next_value', models.BigIntegerField(verbose_name='Próximo valor livre')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Atualizado em')),
+            ],
+            options={
+                'verbose_name': 'Contador de EAN',
+                'verbose_name_plural': 'Contadores de EAN',
+            },
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='ean_block',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, unique=True, verbose_name='Bloco EAN (ref+base)'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.6 on 2026-10-17 01:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0008_ean_blocks'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['updated_at'], name='catalog_pro_updated_951dea_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='productvariant',
+            index=models.Index(fields=['updated_at'], name='catalog_pro_updated_61ee08_idx'),
+        ),
+    ]
@@ -0,0 +1,66 @@
+# Generated by Django 5.2.6 on 2026-10-17 01:11
+
+import catalog.models
+import django.db.models.deletion
+from django.db import OperationalError, migrations, models
+
+# Índice FTS5 de produtos (ver catalog/services/product_search.py). Só SQLite;
+# sem a extensão FTS5 a busca continua no icontains.
+FTS_CREATE = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS catalog_product_fts USING fts5("
+    "sku, name, brand, category, supplier, gtin, "
+    "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3 4')"
+)
+# pesos bm25 na ordem das colunas: sku, name, brand, category, supplier, gtin
+FTS_RANK = "INSERT INTO catalog_product_fts (catalog_product_fts, rank) VALUES ('rank', 'bm25(10.0, 4.0, 2.0, 2.0, 1.0, 10.0)')"
+FTS_FILL = (
+    "INSERT INTO catalog_product_fts (rowid, sku, name, brand, category, supplier, gtin) "
+    "SELECT id, sku, name, brand, product_category, trim(supplier_name || ' ' || supplier_code), gtin "
+    "FROM catalog_product"
+)
+
+
+def create_fts(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    with schema_editor.connection.cursor() as cur:
+        try:
+            cur.execute(FTS_CREATE)
+        except OperationalError:  # SQLite sem FTS5
+            return
+        cur.execute(FTS_RANK)
+        cur.execute(FTS_FILL)
+
+
+def drop_fts(apps, schema_editor):
+    if schema_editor.connection.vendor == "sqlite":
+        schema_editor.execute("DROP TABLE IF EXISTS catalog_product_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0009_updated_at_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductSearchDocument',
+            fields=[
+                ('product', models.OneToOneField(db_column='rowid', db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_document', serialize=False, to='catalog.product')),
+                ('sku', models.TextField()),
+                ('name', models.TextField()),
+                ('brand', models.TextField()),
+                ('category', models.TextField()),
+                ('supplier', models.TextField()),
+                ('gtin', models.TextField()),
+                ('document', catalog.models.FtsMatchField(db_column='catalog_product_fts')),
+                ('rank', models.FloatField(db_column='rank')),
+            ],
+            options={
+                'db_table': 'catalog_product_fts',
+                'managed': False,
+            },
+        ),
+        migrations.RunPython(create_fts, drop_fts),
+    ]
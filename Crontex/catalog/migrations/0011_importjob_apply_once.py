@@ -0,0 +1,34 @@
+# Generated by Django 5.2.6 on 2026-10-17 02:18
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def detach_repeated_applies(apps, schema_editor):
+    # aplicações repetidas de uma mesma pré-visualização (antes do UNIQUE): fica
+    # a mais antiga ligada à origem; as demais perdem o source (como no SET_NULL)
+    ImportJob = apps.get_model("catalog", "ImportJob")
+    seen = set()
+    repeated = []
+    for pk, source_id in ImportJob.objects.filter(mode="apply", source__isnull=False).order_by("pk").values_list("pk", "source_id"):
+        if source_id in seen:
+            repeated.append(pk)
+        seen.add(source_id)
+    if repeated:
+        ImportJob.objects.filter(pk__in=repeated).update(source=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0010_product_search_fts'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(detach_repeated_applies, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='importjob',
+            constraint=models.UniqueConstraint(condition=models.Q(('mode', 'apply')), fields=('source',), name='uniq_importjob_apply_per_preview'),
+        ),
+    ]
@@ -1,9 +1,28 @@
 # -*- coding: utf-8 -*-
 from decimal import Decimal
-from django.db import models
+from django.conf import settings
+from django.db import IntegrityError, models, transaction
 from django.utils.translation import gettext_lazy as _
 from catalog.validators import validate_gtin, validate_ncm, validate_nonnegative
-from catalog.validators.ean import validate_ean13
+from catalog.validators.ean import validate_ean13, variant_integrity_error
+
+class ProductQuerySet(models.QuerySet):
+    """Projeções de listagem: não carregam bling_extra, notes, extra_info e afins."""
+
+    # colunas exibidas em templates/catalog/produto_list.html
+    LIST_FIELDS = ("id", "sku", "name", "product_category", "price", "stock_qty", "is_active")
+
+    def list_rows(self):
+        return self.only(*self.LIST_FIELDS)
+
+    def cards(self):
+        """Dicts no formato dos cards do dashboard (nome/preco/estoque/ativo)."""
+        return self.values(
+            "id", "sku",
+            nome=models.F("name"), preco=models.F("price"),
+            estoque=models.F("stock_qty"), ativo=models.F("is_active"),
+        )
+
 
 class Product(models.Model):
     # Bling básicos
@@ -58,15 +77,26 @@ class Product(models.Model):
     weight_gross = models.DecimalField("Peso bruto (kg)", max_digits=10, decimal_places=3, default=Decimal("0"), blank=True, validators=[validate_nonnegative])
     is_active = models.BooleanField("Ativo", default=True)
 
+    # Hash da última linha importada do Bling (ver services/bling_rows.row_content_hash).
+    # Vazio = produto editado fora do importador -> próxima importação regrava.
+    content_hash = models.CharField("Hash do conteúdo importado", max_length=40, blank=True, editable=False)
+
+    # Bloco ref/base (8 dígitos) reservado pelo alocador (services/ean_blocks.py).
+    # Vazio = ref/base derivados do SKU (comportamento original).
+    ean_block = models.PositiveIntegerField("Bloco EAN (ref+base)", null=True, blank=True, unique=True, editable=False)
+
     created_at = models.DateTimeField("Criado em", auto_now_add=True)
     updated_at = models.DateTimeField("Atualizado em", auto_now=True)
 
+    objects = ProductQuerySet.as_manager()
+
     class Meta:
         indexes = [
             models.Index(fields=["sku"]),
             models.Index(fields=["ncm"]),
             models.Index(fields=["gtin"]),
             models.Index(fields=["product_category"]),
+            models.Index(fields=["updated_at"]),
         ]
         ordering = ["sku"]
         verbose_name = "Produto"
@@ -74,6 +104,15 @@ class Product(models.Model):
 
     def __str__(self):
         return f"{self.sku} - {self.name}"
+
+    def save(self, *args, **kwargs):
+        # O importador grava via bulk_create/bulk_update (não passa por aqui);
+        # qualquer save() comum é edição manual e invalida o hash importado.
+        self.content_hash = ""
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            kwargs["update_fields"] = {*update_fields, "content_hash"}
+        super().save(*args, **kwargs)
     
 class ProductVariant(models.Model):
     product = models.ForeignKey(Product, related_name="variants", on_delete=models.CASCADE)
@@ -102,6 +141,7 @@ class ProductVariant(models.Model):
             models.Index(fields=["product"]),
             models.Index(fields=["sku"]),
             models.Index(fields=["ean13"]),
+            models.Index(fields=["updated_at"]),
         ]
         constraints = [
             models.UniqueConstraint(fields=["product", "size_name", "color_name"], name="uniq_variant_by_names_per_product"),
@@ -109,8 +149,185 @@ class ProductVariant(models.Model):
         verbose_name = "Variante de produto"
         verbose_name_plural = "Variantes de produto"
 
+    def save(self, *args, **kwargs):
+        # unicidade de EAN/SKU garantida pelos índices; erro vira ValidationError por campo
+        try:
+            with transaction.atomic():
+                super().save(*args, **kwargs)
+        except IntegrityError as exc:
+            mapped = variant_integrity_error(exc)
+            if mapped is None:
+                raise
+            raise mapped from exc
+
     def __str__(self):
         prod = getattr(self, "product", None)
         base = getattr(prod, "sku", "—")
         tag = "/".join([s for s in [self.size_name, self.color_name] if s]) or "variante"
         return f"{base} · {tag}"
+
+
+class FtsMatchField(models.TextField):
+    """Coluna oculta de uma tabela FTS5 (mesmo nome da tabela): alvo do MATCH."""
+
+
+@FtsMatchField.register_lookup
+class FtsMatch(models.Lookup):
+    lookup_name = "match"
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f"{lhs} MATCH {rhs}", [*lhs_params, *rhs_params]
+
+
+class ProductSearchDocument(models.Model):
+    """
+    Índice de busca de produtos: tabela virtual SQLite FTS5 (rowid = Product.id),
+    criada na migração 0010 e mantida por services/product_search.py.
+    Não é consultada sozinha — só via join: Product.objects.filter(search_document__document__match=...).
+    """
+    product = models.OneToOneField(
+        Product, primary_key=True, db_column="rowid", on_delete=models.DO_NOTHING,
+        related_name="search_document", db_constraint=False,
+    )
+    sku = models.TextField()
+    name = models.TextField()
+    brand = models.TextField()
+    category = models.TextField()
+    supplier = models.TextField()
+    gtin = models.TextField()
+    document = FtsMatchField(db_column="catalog_product_fts")
+    rank = models.FloatField(db_column="rank")
+
+    class Meta:
+        managed = False
+        db_table = "catalog_product_fts"
+
+
+class EanCounter(models.Model):
+    """
+    Contador atômico dos blocos ref/base de EAN (ver services/ean_blocks.py).
+    Cada reserva é um UPDATE next_value = next_value + n, então workers
+    concorrentes nunca recebem o mesmo bloco. A linha fica travada até o fim da
+    transação que fez o UPDATE: por isso as reservas são feitas fora de
+    transação (BlockAllocator.reserve_ahead) e os blocos saem do cache.
+    """
+    name = models.CharField("Nome", max_length=40, unique=True)
+    next_value = models.BigIntegerField("Próximo valor livre")
+    updated_at = models.DateTimeField("Atualizado em", auto_now=True)
+
+    class Meta:
+        verbose_name = "Contador de EAN"
+        verbose_name_plural = "Contadores de EAN"
+
+    def __str__(self):
+        return f"{self.name} → {self.next_value}"
+
+
+class ImportJob(models.Model):
+    """
+    Fila (no banco) de importações rodadas fora do request pelo worker
+    `python manage.py run_import_jobs`.
+
+    checkpoint = nº de linhas de dados já commitadas; um job que caiu no meio
+    volta para a fila e continua do último chunk gravado.
+    """
+    class Kind(models.TextChoices):
+        PRODUCTS = "products", _("Produtos (Bling)")
+        CONTACTS = "contacts", _("Contatos (CSV)")
+
+    class Mode(models.TextChoices):
+        IMPORT = "import", _("Importar")
+        PREVIEW = "preview", _("Pré-visualizar (dry-run)")
+        APPLY = "apply", _("Aplicar pré-visualização")
+
+    class Status(models.TextChoices):
+        QUEUED = "queued", _("Na fila")
+        RUNNING = "running", _("Processando")
+        DONE = "done", _("Concluído")
+        FAILED = "failed", _("Falhou")
+
+    kind = models.CharField("Tipo", max_length=20, choices=Kind.choices)
+    mode = models.CharField("Modo", max_length=20, choices=Mode.choices, default=Mode.IMPORT)
+    # job de pré-visualização cujo changeset este job (mode=apply) aplica
+    source = models.ForeignKey("self", null=True, blank=True, on_delete=models.SET_NULL, related_name="applies")
+    status = models.CharField("Status", max_length=20, choices=Status.choices, default=Status.QUEUED)
+    file = models.FileField("Arquivo", upload_to="imports/%Y/%m/")
+    original_name = models.CharField("Nome original", max_length=255, blank=True)
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, null=True, blank=True, on_delete=models.SET_NULL, related_name="import_jobs"
+    )
+
+    # progresso
+    rows_processed = models.PositiveIntegerField("Linhas processadas", default=0)
+    rows_created = models.PositiveIntegerField("Criados", default=0)
+    rows_updated = models.PositiveIntegerField("Atualizados", default=0)
+    rows_unchanged = models.PositiveIntegerField("Sem alteração", default=0)
+    rows_missing = models.PositiveIntegerField("Ausentes na planilha", default=0)
+    error_count = models.PositiveIntegerField("Linhas com erro", default=0)
+    errors = models.JSONField("Erros por linha", default=list, blank=True)
+    rows_per_sec = models.FloatField("Linhas/s", default=0)
+    checkpoint = models.PositiveIntegerField("Checkpoint (linhas commitadas)", default=0)
+    message = models.TextField("Mensagem", blank=True)
+
+    # controle do worker
+    worker = models.CharField("Worker", max_length=100, blank=True)
+    attempts = models.PositiveIntegerField("Tentativas", default=0)
+    heartbeat_at = models.DateTimeField("Último sinal", null=True, blank=True)
+    started_at = models.DateTimeField("Iniciado em", null=True, blank=True)
+    finished_at = models.DateTimeField("Finalizado em", null=True, blank=True)
+    created_at = models.DateTimeField("Criado em", auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "created_at"]),
+        ]
+        constraints = [
+            # uma pré-visualização é aplicada no máximo uma vez (services/import_jobs.enqueue_apply)
+            models.UniqueConstraint(
+                fields=["source"], condition=models.Q(mode="apply"), name="uniq_importjob_apply_per_preview"
+            ),
+        ]
+        ordering = ["-created_at"]
+        verbose_name = "Importação"
+        verbose_name_plural = "Importações"
+
+    def __str__(self):
+        return f"#{self.pk} {self.get_kind_display()} · {self.get_status_display()}"
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in (self.Status.DONE, self.Status.FAILED)
+
+
+class ImportChange(models.Model):
+    """
+    Changeset de uma pré-visualização (ImportJob.mode=preview), paginável na UI.
+
+    - new    : payload = linha completa a criar
+    - changed: diff = {campo: [antes, depois]}; payload = linha completa
+    - missing: SKU cadastrado que não veio na planilha (só informativo)
+    """
+    class Action(models.TextChoices):
+        NEW = "new", _("Novo")
+        CHANGED = "changed", _("Alterado")
+        MISSING = "missing", _("Ausente na planilha")
+
+    job = models.ForeignKey(ImportJob, on_delete=models.CASCADE, related_name="changes")
+    action = models.CharField("Ação", max_length=10, choices=Action.choices)
+    line = models.PositiveIntegerField("Linha", null=True, blank=True)
+    sku = models.CharField("Código", max_length=64)
+    diff = models.JSONField("Diferenças", default=dict, blank=True)
+    payload = models.JSONField("Linha importada", default=dict, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["job", "action", "id"]),
+        ]
+        ordering = ["id"]
+        verbose_name = "Alteração de importação"
+        verbose_name_plural = "Alterações de importação"
+
+    def __str__(self):
+        return f"{self.get_action_display()} · {self.sku}"
@@ -0,0 +1,258 @@
+# -*- coding: utf-8 -*-
+"""
+Índice em memória código de barras -> produto/variante (leitura de coletores).
+
+Um único dict por processo, chave = GTIN canônico de 14 dígitos (GTIN-8/12/13
+com zeros à esquerda), de modo que o mesmo item bipado como UPC-12 ou EAN-13
+cai na mesma entrada. Fontes: Product.gtin e ProductVariant.ean13.
+
+- carga completa no primeiro uso (ou no startup, CATALOG_BARCODE_WARM_ON_START);
+- refresh incremental por updated_at (2 consultas indexadas) no máximo a cada
+  CATALOG_BARCODE_REFRESH_SECONDS, com uma pequena sobreposição de janela para
+  não perder transações que commitaram atrasadas;
+- exclusões: post_delete remove a entrada neste processo; os demais processos
+  pegam na recarga completa a cada CATALOG_BARCODE_FULL_RELOAD_SECONDS, feita
+  numa thread (a requisição que cruza o intervalo não paga a leitura da tabela).
+
+Consultas não usam a trava: a recarga completa monta dicts novos e troca os
+três de uma vez (uma atribuição de tupla), então uma leitura vê o índice
+antigo inteiro ou o novo inteiro, nunca um pela metade.
+
+Preço da variante = price_override (> 0) ou o preço do produto, resolvido na
+consulta — alterar o preço do produto reflete em todas as variantes.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from django.conf import settings
+
+from catalog.models import Product, ProductVariant
+from catalog.utils.gtin import to_gtin14
+
+logger = logging.getLogger(__name__)
+
+# sobreposição da janela incremental (commits atrasados com updated_at antigo)
+REFRESH_OVERLAP = timedelta(seconds=5)
+
+
+def canonical_code(raw: Any) -> Optional[str]:
+    """GTIN-8/12/13/14 com DV válido -> 14 dígitos; qualquer outra coisa -> None."""
+    return to_gtin14(raw)
+
+
+class _ProductEntry(NamedTuple):
+    sku: str
+    name: str
+    price: Decimal
+    stock: Decimal
+    code: Optional[str]
+
+
+class _VariantEntry(NamedTuple):
+    product_id: int
+    sku: str
+    label: str
+    price_override: Decimal
+    stock: Decimal
+    code: Optional[str]
+
+
+_Codes = Dict[str, Tuple[int, Optional[int]]]  # code -> (product_id, variant_id|None)
+
+
+class BarcodeIndex:
+    def __init__(self) -> None:
+        self._lock = threading.RLock()
+        self._maps: Tuple[_Codes, Dict[int, _ProductEntry], Dict[int, _VariantEntry]] = ({}, {}, {})
+        self._product_mark: Optional[datetime] = None
+        self._variant_mark: Optional[datetime] = None
+        self._checked_at = 0.0
+        self._loaded_at = 0.0
+        self._reload_guard = threading.Lock()
+        self._reloading = False
+
+    # escrita incremental (refresh/evict, sob a trava) altera os dicts atuais
+    @property
+    def _codes(self) -> _Codes:
+        return self._maps[0]
+
+    @property
+    def _products(self) -> Dict[int, _ProductEntry]:
+        return self._maps[1]
+
+    @property
+    def _variants(self) -> Dict[int, _VariantEntry]:
+        return self._maps[2]
+
+    # ---------- carga ----------
+
+    @property
+    def warm(self) -> bool:
+        return self._loaded_at > 0
+
+    def __len__(self) -> int:
+        return len(self._codes)
+
+    def load(self) -> "BarcodeIndex":
+        """Carga completa em dicts novos; as consultas seguem no índice atual até a troca."""
+        with self._lock:  # refresh/evict esperam; consultas não
+            maps: Tuple[_Codes, Dict[int, _ProductEntry], Dict[int, _VariantEntry]] = ({}, {}, {})
+            product_mark = self._apply_products(Product.objects.all(), maps, None)
+            variant_mark = self._apply_variants(ProductVariant.objects.all(), maps, None)
+            self._maps = maps
+            self._product_mark, self._variant_mark = product_mark, variant_mark
+            self._loaded_at = self._checked_at = time.monotonic()
+        logger.info("Índice de códigos de barras carregado: %d códigos", len(maps[0]))
+        return self
+
+    def reload_in_background(self) -> bool:
+        """Dispara load() numa thread (uma por vez); False se já houver uma rodando."""
+        with self._reload_guard:
+            if self._reloading:
+                return False
+            self._reloading = True
+        threading.Thread(target=self._background_load, name="barcode-index-reload", daemon=True).start()
+        return True
+
+    def _background_load(self) -> None:
+        from django.db import close_old_connections
+
+        try:
+            self.load()
+        except Exception:  # banco ainda sem tabelas (migrate), etc.
+            logger.exception("Falha ao recarregar o índice de códigos de barras")
+            if self.warm:
+                self._loaded_at = time.monotonic()  # segue no índice atual; tenta no próximo intervalo
+        finally:
+            self._reloading = False
+            close_old_connections()
+
+    def refresh(self, blocking: bool = True) -> None:
+        """
+        Aplica só o que mudou desde a última carga/refresh (por updated_at).
+        blocking=False: com uma carga completa em andamento, não espera (ela já traz tudo).
+        """
+        if not self._lock.acquire(blocking=blocking):
+            return
+        try:
+            products = Product.objects.all()
+            if self._product_mark is not None:
+                products = products.filter(updated_at__gte=self._product_mark - REFRESH_OVERLAP)
+            variants = ProductVariant.objects.all()
+            if self._variant_mark is not None:
+                variants = variants.filter(updated_at__gte=self._variant_mark - REFRESH_OVERLAP)
+            self._product_mark = self._apply_products(products, self._maps, self._product_mark)
+            self._variant_mark = self._apply_variants(variants, self._maps, self._variant_mark)
+            self._checked_at = time.monotonic()
+        finally:
+            self._lock.release()
+
+    def ensure_fresh(self) -> None:
+        now = time.monotonic()
+        full_every = float(getattr(settings, "CATALOG_BARCODE_FULL_RELOAD_SECONDS", 600))
+        every = float(getattr(settings, "CATALOG_BARCODE_REFRESH_SECONDS", 2))
+        if not self.warm:
+            self.load()  # 1º uso sem pré-carga: não há índice antigo para servir
+            return
+        if now - self._loaded_at >= full_every:
+            self.reload_in_background()
+        if now - self._checked_at >= every:
+            self.refresh(blocking=False)
+
+    @staticmethod
+    def _apply_products(qs, maps, mark: Optional[datetime]) -> Optional[datetime]:
+        codes, products, _variants = maps
+        rows = qs.values_list("id", "gtin", "sku", "name", "price", "stock_qty", "updated_at")
+        for pk, gtin, sku, name, price, stock, updated in rows.iterator(chunk_size=5000):
+            old = products.get(pk)
+            if old is not None and old.code and codes.get(old.code) == (pk, None):
+                del codes[old.code]
+            code = canonical_code(gtin) if gtin else None
+            products[pk] = _ProductEntry(sku, name, price, stock, code)
+            if code:
+                codes[code] = (pk, None)
+            if mark is None or updated > mark:
+                mark = updated
+        return mark
+
+    @staticmethod
+    def _apply_variants(qs, maps, mark: Optional[datetime]) -> Optional[datetime]:
+        codes, _products, variants = maps
+        rows = qs.values_list(
+            "id", "product_id", "ean13", "sku", "size_name", "color_name", "price_override", "stock_qty", "updated_at"
+        )
+        for pk, product_id, ean, sku, size, color, override, stock, updated in rows.iterator(chunk_size=5000):
+            old = variants.get(pk)
+            if old is not None and old.code and codes.get(old.code) == (old.product_id, pk):
+                del codes[old.code]
+            code = canonical_code(ean) if ean else None
+            label = "/".join(x for x in (size, color) if x)
+            variants[pk] = _VariantEntry(product_id, sku, label, override, stock, code)
+            if code:
+                codes[code] = (product_id, pk)  # variante tem precedência sobre o GTIN do produto
+            if mark is None or updated > mark:
+                mark = updated
+        return mark
+
+    def evict_product(self, pk: int) -> None:
+        with self._lock:
+            entry = self._products.pop(pk, None)
+            if entry is not None and entry.code and self._codes.get(entry.code) == (pk, None):
+                del self._codes[entry.code]
+
+    def evict_variant(self, pk: int) -> None:
+        with self._lock:
+            entry = self._variants.pop(pk, None)
+            if entry is not None and entry.code and self._codes.get(entry.code) == (entry.product_id, pk):
+                del self._codes[entry.code]
+
+    # ---------- consulta ----------
+
+    def lookup(self, raw: Any) -> Dict[str, Any]:
+        code = canonical_code(raw)
+        out: Dict[str, Any] = {"code": str(raw), "found": False}
+        if code is None:
+            out["error"] = "código inválido"
+            return out
+        codes, products, variants = self._maps  # uma leitura: os três da mesma carga
+        hit = codes.get(code)
+        if hit is None:
+            return out
+        product_id, variant_id = hit
+        product = products.get(product_id)
+        if product is None:
+            return out
+        out.update(found=True, product_id=product_id, variant_id=variant_id, sku=product.sku, name=product.name)
+        if variant_id is None:
+            out.update(price=str(product.price), stock=str(product.stock))
+            return out
+        variant = variants.get(variant_id)
+        if variant is None:  # removida entre as duas leituras (evict)
+            return {"code": str(raw), "found": False}
+        price = variant.price_override if variant.price_override and variant.price_override > 0 else product.price
+        out.update(variant_sku=variant.sku, variant=variant.label, price=str(price), stock=str(variant.stock))
+        return out
+
+    def lookup_many(self, codes: Iterable[Any]) -> List[Dict[str, Any]]:
+        return [self.lookup(c) for c in codes]
+
+
+_index = BarcodeIndex()
+
+
+def get_index() -> BarcodeIndex:
+    """Índice do processo, carregado/atualizado conforme os intervalos configurados."""
+    _index.ensure_fresh()
+    return _index
+
+
+def warm_in_background() -> None:
+    """Carrega o índice numa thread (startup), sem segurar a subida do processo."""
+    _index.reload_in_background()
@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+"""
+Dry-run da importação Bling: "N novos, M alterados (por campo), K ausentes",
+sem gravar nada em Product.
+
+- diff_rows(): lê a planilha em chunks e, para cada chunk, faz UMA consulta
+  (sku__in) e grava o changeset em ImportChange (bulk_create).
+  Ao final, lista os SKUs cadastrados que não vieram na planilha (ausentes).
+- apply_changeset(): aplica exatamente as linhas novas/alteradas do changeset
+  (mesmo write_chunk da importação normal). Ausentes não são apagados.
+"""
+
+from __future__ import annotations
+
+from decimal import Decimal
+from itertools import islice
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from django.conf import settings
+from django.db import transaction
+
+from catalog.models import ImportChange, ImportJob, Product
+from catalog.schema import HEADER_TO_FIELD
+from catalog.services.bling_import import write_chunk
+from catalog.services.bling_rows import ParsedRow, parse_rows_parallel
+from crontex.imports import DEFAULT_CHUNK_SIZE, ChunkCallback, ImportResult, chunked
+
+_SKU_HEADER = next(h for h, spec in HEADER_TO_FIELD.items() if spec.model_field == "sku")
+
+
+def _jsonable(value: Any) -> Any:
+    return str(value) if isinstance(value, Decimal) else value
+
+
+def _as_text(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    return str(value)
+
+
+def _row_payload(row: ParsedRow) -> Dict[str, Any]:
+    return {
+        "fields": {k: _jsonable(v) for k, v in row.fields.items()},
+        "extra": dict(row.extra),
+    }
+
+
+def _field_diff(row: ParsedRow, current: Dict[str, Any]) -> Dict[str, List[Any]]:
+    out: Dict[str, List[Any]] = {}
+    for name, new in row.fields.items():
+        old = current.get(name)
+        if _as_text(old) != _as_text(new):
+            out[name] = [_jsonable(old), _jsonable(new)]
+    extra = current.get("bling_extra") if isinstance(current.get("bling_extra"), dict) else {}
+    for key, new in row.extra.items():
+        old = str(extra.get(key, "") or "")
+        if old != new:
+            out[f"extra:{key}"] = [old, new]
+    return out
+
+
+def _diff_chunk(job: ImportJob, rows: List[ParsedRow], result: ImportResult) -> None:
+    by_sku: Dict[str, ParsedRow] = {}
+    for row in rows:
+        by_sku[row.sku] = row
+    if not by_sku:
+        return
+
+    columns: Set[str] = {"sku", "bling_extra", "content_hash"}
+    for row in by_sku.values():
+        columns.update(row.fields)
+    current = {c["sku"]: c for c in Product.objects.filter(sku__in=list(by_sku)).values(*sorted(columns))}
+
+    changes: List[ImportChange] = []
+    for sku, row in by_sku.items():
+        cur = current.get(sku)
+        if cur is None:
+            changes.append(ImportChange(
+                job=job, action=ImportChange.Action.NEW, line=row.line, sku=sku, payload=_row_payload(row),
+            ))
+            result.created += 1
+            continue
+        diff = {} if cur["content_hash"] == row.content_hash else _field_diff(row, cur)
+        if not diff:
+            result.unchanged += 1
+            continue
+        changes.append(ImportChange(
+            job=job, action=ImportChange.Action.CHANGED, line=row.line, sku=sku, diff=diff, payload=_row_payload(row),
+        ))
+        result.updated += 1
+    ImportChange.objects.bulk_create(changes, batch_size=500)
+
+
+def _record_missing(job: ImportJob, seen: Set[str], result: ImportResult) -> None:
+    batch: List[ImportChange] = []
+    for sku in Product.objects.order_by("pk").values_list("sku", flat=True).iterator(chunk_size=2000):
+        if sku in seen:
+            continue
+        batch.append(ImportChange(job=job, action=ImportChange.Action.MISSING, sku=sku))
+        result.missing += 1
+        if len(batch) >= 1000:
+            ImportChange.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        ImportChange.objects.bulk_create(batch)
+
+
+def diff_rows(
+    raw_rows: Iterable[Dict[str, Any]],
+    job: ImportJob,
+    *,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    start_row: int = 0,
+    result: Optional[ImportResult] = None,
+    on_chunk: Optional[ChunkCallback] = None,
+    workers: Optional[int] = None,
+) -> ImportResult:
+    """
+    Gera o changeset da planilha em ImportChange (job.mode=preview). Não altera Product.
+    Mesma assinatura/checkpoint de bling_import.import_rows.
+    """
+    result = result or ImportResult()
+    if workers is None:
+        workers = getattr(settings, "CATALOG_IMPORT_WORKERS", 1)
+
+    # SKUs vistos na planilha (para os ausentes); na retomada, relê os já processados
+    seen: Set[str] = set()
+    it = iter(raw_rows)
+    for raw in islice(it, start_row):
+        spec = HEADER_TO_FIELD[_SKU_HEADER]
+        sku = spec.normalizer(raw.get(_SKU_HEADER) or "") if spec.normalizer else (raw.get(_SKU_HEADER) or "")
+        if sku:
+            seen.add(sku)
+
+    rows_done = start_row
+    parsed = parse_rows_parallel(it, workers=workers, start_line=2 + start_row)
+    for chunk in chunked(parsed, chunk_size):
+        valid: List[ParsedRow] = []
+        for row in chunk:
+            if row.ok:
+                valid.append(row)
+                seen.add(row.sku)
+            else:
+                result.add_error(row)
+        with transaction.atomic():
+            _diff_chunk(job, valid, result)
+            rows_done += len(chunk)
+            result.rows += len(chunk)
+            if on_chunk is not None:
+                on_chunk(result, rows_done)
+
+    with transaction.atomic():
+        ImportChange.objects.filter(job=job, action=ImportChange.Action.MISSING).delete()
+        result.missing = 0
+        _record_missing(job, seen, result)
+        if on_chunk is not None:
+            on_chunk(result, rows_done)
+    return result
+
+
+def apply_changeset(
+    job: ImportJob,
+    *,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    start_row: int = 0,
+    result: Optional[ImportResult] = None,
+    on_chunk: Optional[ChunkCallback] = None,
+) -> ImportResult:
+    """
+    Aplica o changeset do job de pré-visualização `job.source` (novos + alterados),
+    na ordem em que foi gerado. start_row = nº de ImportChange já aplicados.
+    """
+    if job.source is None:
+        raise ValueError("job de aplicação sem pré-visualização de origem")
+    result = result or ImportResult()
+    changes = (
+        ImportChange.objects.filter(
+            job=job.source, action__in=[ImportChange.Action.NEW, ImportChange.Action.CHANGED]
+        )
+        .order_by("pk")
+        .values_list("line", "payload")
+    )
+    rows_done = start_row
+    for chunk in chunked(changes[start_row:].iterator(chunk_size=chunk_size), chunk_size):
+        rows = [
+            ParsedRow(line=line or 0, fields=dict(p.get("fields") or {}), extra=dict(p.get("extra") or {}))
+            for line, p in chunk
+        ]
+        with transaction.atomic():
+            write_chunk(rows, result)
+            rows_done += len(chunk)
+            result.rows += len(chunk)
+            if on_chunk is not None:
+                on_chunk(result, rows_done)
+    return result
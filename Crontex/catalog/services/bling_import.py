@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+"""
+Importador da planilha Bling -> Product (upsert por SKU).
+
+- Consome um gerador de linhas (bling_rows.iter_sheet_rows), então a memória
+  fica limitada ao tamanho do chunk, não ao tamanho do arquivo.
+- Cada chunk roda numa transação própria:
+  1 SELECT (sku, id, content_hash) + bulk_create (novos) + bulk_update (alterados).
+- Linhas cujo hash de conteúdo bate com Product.content_hash são puladas: a
+  reimportação noturna só grava o delta real.
+- Headers conhecidos -> campos do model; desconhecidos -> bling_extra
+  (merge: não apaga chaves do app como grade/pedido/people).
+- Linhas inválidas são puladas e registradas em ImportResult.errors
+  (ImportResult/chunked: crontex/imports.py, comuns ao importador de contatos).
+- start_row/on_chunk permitem retomar de um checkpoint (ver services/import_jobs.py).
+- workers > 1: parse/validação em processos (settings.CATALOG_IMPORT_WORKERS);
+  a escrita segue serial, em ordem, nesta thread.
+- CATALOG_EAN_AUTO_BLOCKS: produtos novos recebem um bloco ref/base de EAN
+  do alocador do processo (services/ean_blocks.py), sem consulta por produto.
+"""
+
+from __future__ import annotations
+
+from itertools import islice
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from catalog.models import Product
+from catalog.services.bling_rows import ParsedRow, parse_rows_parallel
+from catalog.services.ean_blocks import auto_blocks_enabled, default_allocator
+from catalog.services.product_search import reindex_products
+from crontex import kpis
+from crontex.imports import DEFAULT_CHUNK_SIZE, ChunkCallback, ImportResult, chunked
+from crontex.pagination import invalidate_counts
+
+def apply_extra(current: Any, incoming: Dict[str, str]) -> Dict[str, Any]:
+    """
+    Mescla colunas desconhecidas em bling_extra.
+    Valor vazio remove a chave (célula apagada na planilha).
+    """
+    out = dict(current) if isinstance(current, dict) else {}
+    for key, value in incoming.items():
+        if value:
+            out[key] = value
+        else:
+            out.pop(key, None)
+    return out
+
+
+def write_chunk(rows: List[ParsedRow], result: ImportResult) -> None:
+    """
+    Upsert de um chunk de linhas válidas. Deve rodar dentro de transaction.atomic().
+    Se o mesmo SKU aparecer duas vezes no chunk, vale a última linha.
+    """
+    by_sku: Dict[str, ParsedRow] = {}
+    for row in rows:
+        by_sku[row.sku] = row
+    if not by_sku:
+        return
+
+    # 1ª consulta: só sku/id/hash — não carrega linhas que não mudaram
+    known = {
+        sku: (pk, stored_hash)
+        for sku, pk, stored_hash in Product.objects.filter(sku__in=list(by_sku)).values_list("sku", "id", "content_hash")
+    }
+
+    to_create: List[Product] = []
+    changed: Dict[int, Tuple[ParsedRow, str]] = {}
+    for sku, row in by_sku.items():
+        digest = row.content_hash
+        if sku not in known:
+            obj = Product(**row.fields)
+            obj.bling_extra = apply_extra({}, row.extra)
+            obj.content_hash = digest
+            to_create.append(obj)
+            continue
+        pk, stored_hash = known[sku]
+        if stored_hash == digest:
+            result.unchanged += 1
+            continue
+        changed[pk] = (row, digest)
+
+    if to_create:
+        if auto_blocks_enabled():
+            for obj, block in zip(to_create, default_allocator.take(len(to_create))):
+                obj.ean_block = block
+        Product.objects.bulk_create(to_create, batch_size=500)
+        result.created += len(to_create)
+        # bulk_create não dispara post_save: índice de busca, totais das listas e KPIs atualizados aqui
+        reindex_products(obj.pk for obj in to_create)
+        invalidate_counts("catalog.product")
+        kpis.record_created(Product, to_create)
+    if not changed:
+        return
+
+    # 2ª consulta: bling_extra só dos alterados (merge das colunas extras)
+    now = timezone.now()
+    to_update: List[Product] = []
+    update_fields: set[str] = {"bling_extra", "content_hash", "updated_at"}
+    for obj in Product.objects.filter(pk__in=list(changed)).only("id", "bling_extra"):
+        row, digest = changed[obj.pk]
+        for name, value in row.fields.items():
+            setattr(obj, name, value)
+        obj.bling_extra = apply_extra(obj.bling_extra, row.extra)
+        obj.content_hash = digest
+        obj.updated_at = now
+        update_fields.update(row.fields)
+        to_update.append(obj)
+
+    update_fields.discard("sku")
+    Product.objects.bulk_update(to_update, sorted(update_fields), batch_size=500)
+    result.updated += len(to_update)
+    reindex_products(changed)
+    invalidate_counts("catalog.product")
+    kpis.mark_stale(Product, fields=update_fields)
+
+
+def import_rows(
+    raw_rows: Iterable[Dict[str, Any]],
+    *,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    start_row: int = 0,
+    result: Optional[ImportResult] = None,
+    on_chunk: Optional[ChunkCallback] = None,
+    workers: Optional[int] = None,
+) -> ImportResult:
+    """
+    Importa linhas cruas {header: texto} (ex.: bling_rows.iter_sheet_rows(upload)).
+
+    start_row: nº de linhas de dados a pular (retomada a partir de checkpoint).
+    on_chunk : chamado na mesma transação do chunk, para gravar o checkpoint
+               junto com os dados.
+    workers  : processos de parse (None = settings.CATALOG_IMPORT_WORKERS; 1 = serial).
+    """
+    result = result or ImportResult()
+    if workers is None:
+        workers = getattr(settings, "CATALOG_IMPORT_WORKERS", 1)
+    rows_done = start_row
+    rows = islice(raw_rows, start_row, None)
+    parsed = parse_rows_parallel(rows, workers=workers, start_line=2 + start_row)
+    for chunk in chunked(parsed, chunk_size):
+        valid: List[ParsedRow] = []
+        for row in chunk:
+            if row.ok:
+                valid.append(row)
+            else:
+                result.add_error(row)
+        if auto_blocks_enabled():
+            # blocos EAN dos possíveis produtos novos: reservados antes (e fora) da transação do chunk
+            default_allocator.reserve_ahead(len(valid))
+        with transaction.atomic():
+            write_chunk(valid, result)
+            rows_done += len(chunk)
+            result.rows += len(chunk)
+            if on_chunk is not None:
+                on_chunk(result, rows_done)
+    return result
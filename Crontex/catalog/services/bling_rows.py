@@ -0,0 +1,307 @@
+# -*- coding: utf-8 -*-
+"""
+Leitura e parse (linha a linha) das planilhas exportadas pelo Bling.
+
+Este módulo NÃO toca no banco: só transforma linhas cruas (header -> texto)
+em valores prontos para o model Product. A escrita fica em
+catalog/services/bling_import.py.
+
+Fluxo:
+- iter_sheet_rows(upload) -> gerador de dicts {header: texto} (CSV ou XLSX),
+  sem carregar o arquivo inteiro em memória.
+- parse_row(raw, line) -> ParsedRow com:
+  * fields: campos conhecidos (schema.KNOWN_FIELDS) já convertidos
+  * extra : headers desconhecidos (colunas 16–45) -> bling_extra
+  * errors: mensagens de validação (linha é descartada se houver erro)
+- parse_rows_parallel(rows, workers=N) -> idem, com o parse (Decimal, NCM,
+  GTIN, não-negativos) distribuído num pool de processos.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from decimal import Decimal, InvalidOperation
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from django.core.exceptions import ValidationError
+
+from catalog.schema import HEADER_TO_FIELD, REQUIRED_HEADERS, FieldSpec
+from catalog.validators import validate_gtin, validate_ncm, validate_nonnegative
+from crontex.streaming import open_csv
+
+_TRUE_TOKENS = {"1", "s", "sim", "y", "yes", "true", "t", "x", "verdadeiro"}
+
+
+@dataclass
+class ParsedRow:
+    line: int
+    fields: Dict[str, Any] = field(default_factory=dict)
+    extra: Dict[str, str] = field(default_factory=dict)
+    errors: List[str] = field(default_factory=list)
+
+    @property
+    def sku(self) -> str:
+        return str(self.fields.get("sku") or "")
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+    @property
+    def content_hash(self) -> str:
+        return row_content_hash(self.fields, self.extra)
+
+
+def row_content_hash(fields: Dict[str, Any], extra: Dict[str, str]) -> str:
+    """
+    SHA-1 estável da linha mapeada (campos conhecidos + colunas extras).
+    Valores já convertidos (Decimal quantizado, bool, int) -> str, chaves ordenadas.
+    """
+    payload = {
+        "f": {k: str(v) for k, v in fields.items()},
+        "x": extra,
+    }
+    raw = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+# -----------------------------
+# Leitura (CSV / XLSX)
+# -----------------------------
+
+def iter_csv_rows(binary: Any) -> Iterator[Dict[str, str]]:
+    """
+    Gera dicts {header: valor} de um CSV binário (arquivo/UploadedFile).
+    Encoding (UTF-8/Latin-1) e delimitador (; ou ,) pelo primeiro bloco;
+    decodificação em streaming (crontex/streaming.py).
+    """
+    headers: Optional[List[str]] = None
+    for values in open_csv(binary).reader():
+        if headers is None:
+            headers = [h.strip() for h in values]
+            continue
+        if not any(v.strip() for v in values):
+            continue
+        yield dict(zip(headers, values))
+
+
+def iter_xlsx_rows(binary: Any) -> Iterator[Dict[str, str]]:
+    """
+    Gera dicts {header: valor} da primeira aba de um XLSX (openpyxl read_only).
+    """
+    try:
+        from openpyxl import load_workbook
+    except ImportError:  # pragma: no cover - dependência opcional
+        raise ValidationError("Leitura de XLSX requer o pacote 'openpyxl'. Exporte em CSV ou instale-o.")
+
+    fh = getattr(binary, "file", binary)
+    if hasattr(fh, "seek"):
+        fh.seek(0)
+    wb = load_workbook(fh, read_only=True, data_only=True)
+    try:
+        ws = wb.worksheets[0]
+        headers: Optional[List[str]] = None
+        for values in ws.iter_rows(values_only=True):
+            cells = ["" if v is None else str(v) for v in values]
+            if headers is None:
+                headers = [h.strip() for h in cells]
+                continue
+            if not any(c.strip() for c in cells):
+                continue
+            yield dict(zip(headers, cells))
+    finally:
+        wb.close()
+
+
+def iter_sheet_rows(upload: Any, filename: str = "") -> Iterator[Dict[str, str]]:
+    """Escolhe o leitor pelo nome do arquivo (.xlsx/.xlsm => XLSX; demais => CSV)."""
+    name = filename or getattr(upload, "name", "") or ""
+    ext = os.path.splitext(name)[1].lower()
+    if ext in (".xlsx", ".xlsm"):
+        return iter_xlsx_rows(upload)
+    return iter_csv_rows(upload)
+
+
+# -----------------------------
+# Conversões
+# -----------------------------
+
+_FIELD_META: Optional[Dict[str, Dict[str, Any]]] = None
+
+
+def _field_meta() -> Dict[str, Dict[str, Any]]:
+    """
+    Metadados (tipo, casas decimais, max_length) dos campos mapeados,
+    lidos do model uma única vez (lazy, para não importar models no carregamento).
+    """
+    global _FIELD_META
+    if _FIELD_META is None:
+        from django.apps import apps
+
+        Product = apps.get_model("catalog", "Product")
+        meta: Dict[str, Dict[str, Any]] = {}
+        for spec in HEADER_TO_FIELD.values():
+            f = Product._meta.get_field(spec.model_field)
+            meta[spec.model_field] = {
+                "type": f.get_internal_type(),
+                "decimal_places": getattr(f, "decimal_places", None),
+                "max_length": getattr(f, "max_length", None),
+                "label": str(f.verbose_name),
+            }
+        _FIELD_META = meta
+    return _FIELD_META
+
+
+def parse_decimal(raw: str, places: int) -> Decimal:
+    """
+    Aceita formatos BR ("1.234,56") e ponto decimal ("1234.56").
+    """
+    s = (raw or "").strip().replace("R$", "").replace(" ", "")
+    if not s:
+        return Decimal("0")
+    if "," in s:
+        s = s.replace(".", "").replace(",", ".")
+    try:
+        value = Decimal(s)
+    except InvalidOperation:
+        raise ValidationError(f"valor numérico inválido: {raw!r}")
+    if not value.is_finite():
+        raise ValidationError(f"valor numérico inválido: {raw!r}")
+    return value.quantize(Decimal(1).scaleb(-places))
+
+
+def parse_bool(raw: str) -> bool:
+    return (raw or "").strip().lower() in _TRUE_TOKENS
+
+
+def parse_int(raw: str) -> int:
+    s = (raw or "").strip()
+    if not s:
+        return 0
+    return int(parse_decimal(s, 0))
+
+
+def _convert(spec: FieldSpec, raw: str) -> Any:
+    meta = _field_meta()[spec.model_field]
+    value = spec.normalizer(raw) if spec.normalizer else (raw or "").strip()
+    kind = meta["type"]
+
+    if kind == "DecimalField":
+        dec = parse_decimal(value, meta["decimal_places"])
+        validate_nonnegative(dec)
+        return dec
+    if kind == "IntegerField":
+        return parse_int(value)
+    if kind == "BooleanField":
+        return parse_bool(value)
+
+    # texto
+    if spec.model_field == "ncm" and value:
+        value = re.sub(r"\D", "", value)
+        validate_ncm(value)
+    elif spec.model_field == "gtin" and value:
+        value = re.sub(r"\D", "", value)
+        validate_gtin(value)
+    max_length = meta["max_length"]
+    if max_length and len(value) > max_length:
+        raise ValidationError(f"excede {max_length} caracteres")
+    return value
+
+
+def parse_row(raw: Dict[str, Any], line: int) -> ParsedRow:
+    """
+    Mapeia uma linha crua via FieldSpec. Headers desconhecidos vão para extra.
+    """
+    out = ParsedRow(line=line)
+    for header, value in raw.items():
+        if header is None or not header:
+            continue
+        text = "" if value is None else str(value)
+        spec = HEADER_TO_FIELD.get(header)
+        if spec is None:
+            out.extra[header] = text.strip()
+            continue
+        try:
+            out.fields[spec.model_field] = _convert(spec, text)
+        except ValidationError as exc:
+            out.errors.append(f"{spec.excel_header}: {'; '.join(str(m) for m in exc.messages)}")
+        except (ValueError, ArithmeticError):
+            out.errors.append(f"{spec.excel_header}: valor inválido {text!r}")
+
+    for header in REQUIRED_HEADERS:
+        spec = HEADER_TO_FIELD[header]
+        if not out.fields.get(spec.model_field) and not any(e.startswith(f"{header}:") for e in out.errors):
+            out.errors.append(f"{header}: obrigatório")
+    return out
+
+
+def parse_rows(rows: Iterable[Dict[str, Any]], start_line: int = 2) -> Iterator[ParsedRow]:
+    """Gera ParsedRow a partir das linhas cruas (linha 1 = header)."""
+    for i, raw in enumerate(rows, start=start_line):
+        yield parse_row(raw, i)
+
+
+# -----------------------------
+# Parse paralelo (process pool)
+# -----------------------------
+
+def _init_worker() -> None:
+    """Inicializa o Django no processo filho (necessário com start method 'spawn')."""
+    import django
+    from django.apps import apps
+
+    if not apps.ready:
+        os.environ.setdefault("DJANGO_SETTINGS_MODULE", "crontex.settings")
+        django.setup()
+
+
+def parse_batch(start_line: int, batch: List[Dict[str, Any]]) -> List[ParsedRow]:
+    return [parse_row(raw, line) for line, raw in enumerate(batch, start=start_line)]
+
+
+def _batches(rows: Iterable[Dict[str, Any]], size: int, start_line: int) -> Iterator[Tuple[int, List[Dict[str, Any]]]]:
+    line = start_line
+    buf: List[Dict[str, Any]] = []
+    for raw in rows:
+        buf.append(raw)
+        if len(buf) >= size:
+            yield line, buf
+            line += len(buf)
+            buf = []
+    if buf:
+        yield line, buf
+
+
+def parse_rows_parallel(
+    rows: Iterable[Dict[str, Any]],
+    *,
+    workers: int,
+    batch_size: int = 500,
+    start_line: int = 2,
+) -> Iterator[ParsedRow]:
+    """
+    Mesmo contrato de parse_rows(), mas converte/valida lotes num ProcessPoolExecutor.
+
+    - A leitura do arquivo e a escrita no banco continuam no processo atual
+      (um único escritor, na ordem do arquivo); só o parse é distribuído.
+    - No máx. workers*2 lotes em voo: a memória continua limitada.
+    """
+    if workers <= 1:
+        yield from parse_rows(rows, start_line=start_line)
+        return
+
+    max_in_flight = workers * 2
+    pending: Deque[Future] = deque()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        for line, batch in _batches(rows, batch_size, start_line):
+            pending.append(pool.submit(parse_batch, line, batch))
+            if len(pending) >= max_in_flight:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
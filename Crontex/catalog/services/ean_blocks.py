@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+"""
+Alocador de blocos ref/base para o EAN interno
+[ref(4)][base(4)][tam(2)][cor(2)][dv].
+
+Um "bloco" é um número de 8 dígitos (ref = bloco // 10000, base = bloco % 10000)
+que dá ao produto o espaço inteiro de 100 x 100 códigos tam/cor. Em vez de o
+usuário escolher ref/base à mão (derivados do SKU), os blocos saem de um
+contador atômico no banco (EanCounter):
+
+- reserve_blocks(n)      -> range com n blocos novos (1 UPDATE + 1 SELECT);
+- BlockAllocator         -> cache por processo/worker: reserva em lote
+                            (CATALOG_EAN_BLOCK_BATCH) e entrega sem ida ao banco;
+- assign_blocks(products)-> grava Product.ean_block dos que ainda não têm.
+
+Blocos reservados e não usados viram lacunas — nunca são entregues duas vezes.
+A numeração começa em CATALOG_EAN_BLOCK_START (padrão 9000/0000), longe dos
+ref/base que costumam sair de SKUs digitados à mão.
+
+Reservas feitas dentro de uma transação só valem se ela commitar; por isso o
+cache do BlockAllocator só é reabastecido fora de transação (reserve_ahead()),
+e dentro dela a reserva é exata, sem sobra guardada.
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import Iterable, List, Tuple
+
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.db.models import F
+
+from catalog.models import EanCounter, Product
+
+REFBASE_COUNTER = "ean_refbase"
+MAX_BLOCK = 99_999_999
+DEFAULT_BLOCK_START = 90_000_000
+DEFAULT_BLOCK_BATCH = 100
+
+
+class EanSpaceExhausted(RuntimeError):
+    """Não há mais blocos ref/base livres no contador."""
+
+
+def auto_blocks_enabled() -> bool:
+    return bool(getattr(settings, "CATALOG_EAN_AUTO_BLOCKS", False))
+
+
+def block_ref_base(block: int) -> Tuple[str, str]:
+    """Bloco de 8 dígitos -> (ref4, base4)."""
+    ref, base = divmod(int(block), 10_000)
+    return f"{ref:04d}", f"{base:04d}"
+
+
+def _ensure_counter(name: str) -> None:
+    if EanCounter.objects.filter(name=name).exists():
+        return
+    start = int(getattr(settings, "CATALOG_EAN_BLOCK_START", DEFAULT_BLOCK_START))
+    try:
+        with transaction.atomic():
+            EanCounter.objects.create(name=name, next_value=start)
+    except IntegrityError:
+        pass  # outro worker criou ao mesmo tempo
+
+
+def reserve_blocks(count: int, *, counter: str = REFBASE_COUNTER) -> range:
+    """
+    Reserva `count` blocos consecutivos. O UPDATE com F() é atômico: a linha
+    do contador fica travada até o fim da transação e cada chamador recebe
+    uma faixa disjunta, sem laço de retry.
+    """
+    if count <= 0:
+        return range(0)
+    _ensure_counter(counter)
+    with transaction.atomic():
+        EanCounter.objects.filter(name=counter).update(next_value=F("next_value") + count)
+        end = EanCounter.objects.filter(name=counter).values_list("next_value", flat=True).get()
+    if end - 1 > MAX_BLOCK:
+        raise EanSpaceExhausted(f"contador {counter!r} esgotou os blocos ref/base")
+    return range(end - count, end)
+
+
+class BlockAllocator:
+    """
+    Cache de blocos por processo. Thread-safe; cada worker/processo tem o seu.
+    """
+
+    def __init__(self, batch: int | None = None, counter: str = REFBASE_COUNTER) -> None:
+        self.batch = batch or int(getattr(settings, "CATALOG_EAN_BLOCK_BATCH", DEFAULT_BLOCK_BATCH))
+        self.counter = counter
+        self._pool: List[int] = []
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._pool)
+
+    def reserve_ahead(self, needed: int) -> None:
+        """
+        Garante `needed` blocos no cache. Chame FORA de transação (ex.: antes do
+        atomic de cada chunk da importação) para a reserva ser durável.
+        """
+        with self._lock:
+            self._refill(needed)
+
+    def _refill(self, needed: int) -> None:
+        missing = needed - len(self._pool)
+        if missing <= 0:
+            return
+        got = reserve_blocks(max(missing, self.batch), counter=self.counter)
+        self._pool.extend(got)
+
+    def take(self, count: int) -> List[int]:
+        with self._lock:
+            if len(self._pool) < count:
+                if connection.in_atomic_block:
+                    # dentro de transação: reserva exata (some junto se houver rollback)
+                    have, self._pool = self._pool, []
+                    return have + list(reserve_blocks(count - len(have), counter=self.counter))
+                self._refill(count)
+            out, self._pool = self._pool[:count], self._pool[count:]
+            return out
+
+    def take_one(self) -> int:
+        return self.take(1)[0]
+
+
+# alocador padrão do processo (views / worker de importação)
+default_allocator = BlockAllocator()
+
+
+def assign_blocks(products: Iterable[Product], allocator: BlockAllocator | None = None) -> int:
+    """
+    Atribui ean_block aos produtos (já salvos) que ainda não têm; 1 bulk_update.
+    Retorna quantos foram atribuídos.
+    """
+    pending = [p for p in products if p.ean_block is None]
+    if not pending:
+        return 0
+    blocks = (allocator or default_allocator).take(len(pending))
+    for product, block in zip(pending, blocks):
+        product.ean_block = block
+    Product.objects.bulk_update(pending, ["ean_block"], batch_size=500)
+    return len(pending)
@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+"""
+Unicidade de EAN-13 de variantes em lote.
+
+O pre_save (catalog/signals/ean.py) só normaliza/valida o dígito; bulk_create
+nem passa por ele. Aqui um lote inteiro é checado de uma vez:
+
+- formato/DV de cada EAN (mesmas mensagens do pre_save);
+- repetidos dentro do próprio lote;
+- já cadastrados: UMA consulta ean13__in por lote — ou nenhuma, se houver um
+  EanIndex aquecido (ex.: importação/sync de milhares de variantes);
+- o índice único de ean13 continua sendo a garantia final: IntegrityError no
+  bulk_create vira o mesmo ValidationError({"ean13": ...}).
+
+Uso:
+    eans = check_unique_eans(["789...", ...], ignore_pks={...})
+    bulk_create_variants(variants, index=EanIndex().load())
+"""
+
+from __future__ import annotations
+
+from typing import Collection, Dict, Iterable, List, Optional, Sequence
+
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+
+from catalog.models import ProductVariant
+from catalog.validators.ean import (
+    MSG_EAN_DIGITS,
+    MSG_EAN_REPEATED,
+    MSG_EAN_TAKEN,
+    normalize_n_digits,
+    validate_ean13,
+    variant_integrity_error,
+)
+
+# limite de parâmetros por IN (SQLite antigo: 999)
+IN_BATCH = 900
+
+
+class EanIndex:
+    """
+    Índice em memória ean13 -> pk da variante, carregado com um único SELECT.
+    Mantenha-o atualizado com add()/discard() enquanto estiver em uso.
+    """
+
+    def __init__(self) -> None:
+        self._owner: Dict[str, int] = {}
+        self.warm = False
+
+    def load(self) -> "EanIndex":
+        self._owner = dict(
+            ProductVariant.objects.exclude(ean13="").values_list("ean13", "pk").iterator(chunk_size=5000)
+        )
+        self.warm = True
+        return self
+
+    def owner(self, ean: str) -> Optional[int]:
+        return self._owner.get(ean)
+
+    def add(self, ean: str, pk: int) -> None:
+        if ean:
+            self._owner[ean] = pk
+
+    def discard(self, ean: str) -> None:
+        self._owner.pop(ean, None)
+
+    def __contains__(self, ean: object) -> bool:
+        return ean in self._owner
+
+    def __len__(self) -> int:
+        return len(self._owner)
+
+
+def _normalize(raw: str) -> str:
+    try:
+        s = normalize_n_digits(raw, 13)
+    except ValidationError:
+        raise ValidationError(MSG_EAN_DIGITS, code="invalid", params={"ean13": raw})
+    if len(s) != 13:
+        raise ValidationError(MSG_EAN_DIGITS, code="invalid", params={"ean13": raw})
+    try:
+        validate_ean13(s)
+    except ValidationError as exc:
+        raise ValidationError(exc.messages[0], code="invalid", params={"ean13": s})
+    return s
+
+
+def _owners(eans: Sequence[str], index: Optional[EanIndex]) -> Dict[str, int]:
+    if index is not None and index.warm:
+        return {e: pk for e in eans if (pk := index.owner(e)) is not None}
+    out: Dict[str, int] = {}
+    for i in range(0, len(eans), IN_BATCH):
+        out.update(
+            ProductVariant.objects.filter(ean13__in=eans[i:i + IN_BATCH]).values_list("ean13", "pk")
+        )
+    return out
+
+
+def check_unique_eans(
+    eans: Iterable[Optional[str]],
+    *,
+    ignore_pks: Collection[int] = (),
+    index: Optional[EanIndex] = None,
+) -> List[str]:
+    """
+    Valida um lote de EANs e devolve a lista normalizada (mesma ordem; "" p/ vazios).
+
+    ignore_pks: variantes que estão sendo regravadas no mesmo lote (podem
+    "possuir" qualquer EAN do lote sem conflito).
+    ValidationError({"ean13": [...]}) com um erro por EAN problemático;
+    params["ean13"] identifica o código.
+    """
+    normalized: List[str] = []
+    errors: List[ValidationError] = []
+    seen: set[str] = set()
+    for raw in eans:
+        if not raw:
+            normalized.append("")
+            continue
+        try:
+            s = _normalize(str(raw))
+        except ValidationError as exc:
+            errors.append(exc)
+            normalized.append("")
+            continue
+        if s in seen:
+            errors.append(ValidationError(MSG_EAN_REPEATED, code="repeated", params={"ean13": s}))
+        seen.add(s)
+        normalized.append(s)
+
+    ignore = set(ignore_pks)
+    for ean, pk in sorted(_owners(sorted(seen), index).items()):
+        if pk not in ignore:
+            errors.append(ValidationError(MSG_EAN_TAKEN, code="unique", params={"ean13": ean}))
+
+    if errors:
+        raise ValidationError({"ean13": errors})
+    return normalized
+
+
+def bulk_create_variants(
+    variants: List[ProductVariant],
+    *,
+    index: Optional[EanIndex] = None,
+    batch_size: int = 500,
+) -> List[ProductVariant]:
+    """
+    bulk_create com a mesma validação de EAN do save() individual, em O(1) consultas
+    por lote. Se outro processo gravar o mesmo EAN entre a checagem e o INSERT,
+    o índice único barra e o erro sai como ValidationError({"ean13": ...}).
+    """
+    eans = check_unique_eans((v.ean13 for v in variants), index=index)
+    for v, ean in zip(variants, eans):
+        v.ean13 = ean
+    try:
+        with transaction.atomic():
+            created = ProductVariant.objects.bulk_create(variants, batch_size=batch_size)
+    except IntegrityError as exc:
+        mapped = variant_integrity_error(exc)
+        if mapped is None:
+            raise
+        raise mapped from exc
+    if index is not None and index.warm:
+        for v in created:
+            if v.pk is not None:
+                index.add(v.ean13, v.pk)
+    return created
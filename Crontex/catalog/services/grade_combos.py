@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+"""
+Expansão preguiçosa da grade (produto cartesiano dos valores dos parâmetros).
+
+Uma grade com 4–5 parâmetros pode passar de centenas de milhares de
+combinações; nada aqui materializa a lista inteira:
+
+- grade_value_lists(grade)      -> valores normalizados por parâmetro (code > label)
+- combo_count(value_lists)      -> nº de combinações (produto dos tamanhos, sem expandir)
+- iter_combos(value_lists, a, b)-> combinações [a, b) via itertools.product
+- combo_at(value_lists, i)      -> i-ésima combinação (acesso direto, O(nº de parâmetros))
+- max_combos()                  -> teto configurável (settings.CATALOG_GRADE_MAX_COMBOS)
+
+A ordem é a de itertools.product: o último parâmetro varia mais rápido
+(mesma ordem do laço aninhado que existia antes).
+"""
+
+from __future__ import annotations
+
+import json
+import math
+from itertools import islice, product
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from django.conf import settings
+
+DEFAULT_MAX_COMBOS = 5000
+
+
+def max_combos() -> int:
+    return int(getattr(settings, "CATALOG_GRADE_MAX_COMBOS", DEFAULT_MAX_COMBOS))
+
+
+def _as_grade(grade: Any) -> Dict[str, Any]:
+    if isinstance(grade, dict):
+        return grade
+    if not grade:
+        return {}
+    try:
+        obj = json.loads(grade)
+    except Exception:
+        return {}
+    return obj if isinstance(obj, dict) else {}
+
+
+def normalize_values(values: List[Any]) -> List[str]:
+    """
+    Normaliza os 'valores' de um parâmetro da grade.
+    Aceita itens dicts (label/code) ou strings; prioriza 'code' > 'label' > str(item).
+    """
+    out: List[str] = []
+    for v in values:
+        if isinstance(v, dict):
+            code = str(v.get("code") or "").strip()
+            label = str(v.get("label") or "").strip()
+            out.append(code or label or str(v))
+        else:
+            out.append(str(v))
+    return [s for s in out if s]
+
+
+def grade_params(grade: Any) -> List[Dict[str, Any]]:
+    params = _as_grade(grade).get("parametros") or []
+    return params if isinstance(params, list) else []
+
+
+def grade_value_lists(grade: Any) -> List[List[str]]:
+    """Uma lista de valores por parâmetro (parâmetros sem valores são ignorados)."""
+    out: List[List[str]] = []
+    for prm in grade_params(grade):
+        vals = prm.get("valores") if isinstance(prm, dict) else None
+        if isinstance(vals, list) and vals:
+            norm = normalize_values(vals)
+            if norm:
+                out.append(norm)
+    return out
+
+
+def combo_count(value_lists: List[List[str]]) -> int:
+    if not value_lists:
+        return 0
+    return math.prod(len(v) for v in value_lists)
+
+
+def iter_combos(value_lists: List[List[str]], start: int = 0, stop: Optional[int] = None) -> Iterator[Tuple[str, ...]]:
+    if not value_lists:
+        return iter(())
+    if start <= 0 and stop is None:
+        return product(*value_lists)
+    if start > 0:
+        # posiciona direto no índice inicial em vez de descartar `start` combinações
+        return _iter_from(value_lists, start, stop)
+    return islice(product(*value_lists), 0, stop)
+
+
+def combo_at(value_lists: List[List[str]], index: int) -> Tuple[str, ...]:
+    """i-ésima combinação na ordem de itertools.product (índice misto, último varia mais rápido)."""
+    total = combo_count(value_lists)
+    if not 0 <= index < total:
+        raise IndexError(index)
+    out: List[str] = []
+    for vals in reversed(value_lists):
+        index, pos = divmod(index, len(vals))
+        out.append(vals[pos])
+    out.reverse()
+    return tuple(out)
+
+
+def _iter_from(value_lists: List[List[str]], start: int, stop: Optional[int]) -> Iterator[Tuple[str, ...]]:
+    total = combo_count(value_lists)
+    stop = total if stop is None else min(stop, total)
+    if start >= stop:
+        return
+    # "odômetro": decodifica o índice inicial uma vez e incrementa
+    sizes = [len(v) for v in value_lists]
+    pos: List[int] = []
+    rest = start
+    for n in reversed(sizes):
+        rest, p = divmod(rest, n)
+        pos.append(p)
+    pos.reverse()
+    for _ in range(stop - start):
+        yield tuple(vals[p] for vals, p in zip(value_lists, pos))
+        k = len(pos) - 1
+        while k >= 0:
+            pos[k] += 1
+            if pos[k] < sizes[k]:
+                break
+            pos[k] = 0
+            k -= 1
@@ -12,7 +12,9 @@ Regras:
 - Se só existir 1 parâmetro: cor assume "00".
 - Se existir 3+ parâmetros: só os 2 primeiros entram no EAN. Os demais ainda
   compõem a grade, mas não alteram o EAN (padrão combinado).
-- Valores são autonumerados por ordem de aparição (01, 02, 03…).
+- Valores são autonumerados por ordem de aparição (01, 02, 03…), exceto
+  quando vierem como dict {"label", "code"} (payload da aba Grade) com code
+  de 2 dígitos: aí o código informado é respeitado.
 
 Saídas:
 - Retorna lista de dicts com: {"combo": {chave: valor, ...}, "sku": "xxxxxxxxxxxxx"}
@@ -21,12 +23,16 @@ Saídas:
     "ref": "0000", "base": "0000",
     "param_tamanho": "NomeDoParam1" ou "", "param_cor": "NomeDoParam2" ou "",
     "map_tamanho": {"P": "01", "M": "02", ...},
-    "map_cor": {"Preto": "01", "Branco": "02", ...}
+    "map_cor": {"Preto": "01", "Branco": "02", ...},
+    "count": 6   # nº total de combinações (sem expandir)
   }
 """
 
 from __future__ import annotations
-from typing import Dict, List, Any, Tuple
+from typing import Dict, Iterator, List, Any, Optional, Tuple
+
+from catalog.services.grade_combos import combo_count, iter_combos, max_combos
+from catalog.utils import gtin
 
 
 def _to_2d(n: int) -> str:
@@ -39,15 +45,7 @@ def ean13_check_digit12(code12: str) -> str:
     """Calcula dígito verificador para 12 dígitos (retorna 1 char)."""
     if len(code12) != 12 or not code12.isdigit():
         return "0"
-    soma = 0
-    # índices baseados em 0 da esquerda p/ direita:
-    # posições ímpares (1,3,5,...) -> peso 3; pares -> peso 1 (convenção EAN)
-    for i, ch in enumerate(code12):
-        d = ord(ch) - 48
-        peso = 3 if (i % 2 == 1) else 1
-        soma += d * peso
-    dv = (10 - (soma % 10)) % 10
-    return str(dv)
+    return str(gtin.check_digit(code12))
 
 
 def make_ean13(ref4: str, base4: str, cod_tam2: str, cod_cor2: str) -> str:
@@ -60,21 +58,12 @@ def make_ean13(ref4: str, base4: str, cod_tam2: str, cod_cor2: str) -> str:
     return base12 + dv
 
 
-def _cartesian(values_by_param: List[List[str]]) -> List[List[str]]:
-    combos: List[List[str]] = [[]]
-    for arr in values_by_param:
-        tmp: List[List[str]] = []
-        for prefix in combos:
-            for v in (arr or ["—"]):
-                tmp.append(prefix + [v])
-        combos = tmp
-    return combos
-
-
 def generate_skus_from_grade(
     ref4: str,
     base4: str,
     grade: Dict[str, Any],
+    start: int = 0,
+    stop: Optional[int] = None,
 ) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
     """
     Gera SKUs com fail-safe a partir de bling_extra.grade:
@@ -85,14 +74,52 @@ def generate_skus_from_grade(
             ...  # ignorados no EAN
         ]
     }
+    Materializa só a página [start, stop) das combinações; sem stop, no máximo
+    max_combos() linhas (mesmo teto de grade_skus). summary["count"] é o total,
+    calculado sem expandir; summary["truncated"] indica que sobrou combinação.
+    """
+    if stop is None:
+        stop = start + max_combos()
+    rows, summary = iter_skus_from_grade(ref4, base4, grade, start=start, stop=stop)
+    items = list(rows)
+    summary["truncated"] = start + len(items) < summary["count"]
+    return items, summary
+
+
+def iter_skus_from_grade(
+    ref4: str,
+    base4: str,
+    grade: Dict[str, Any],
+    *,
+    start: int = 0,
+    stop: Optional[int] = None,
+    ean_params_only: bool = False,
+) -> Tuple[Iterator[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Igual a generate_skus_from_grade(), mas as linhas saem de um gerador
+    (grade_combos.iter_combos) — nada é expandido antes de ser consumido.
+    ean_params_only: combina só os 2 primeiros parâmetros (os que entram no
+    EAN); o combo traz só eles. É o que basta para um SKU/EAN por variante.
     """
     params = list(grade.get("parametros") or [])
     # Normaliza estrutura
     norm: List[Dict[str, Any]] = []
     for p in params:
         chave = str((p or {}).get("chave") or "").strip()
-        vals = list((p or {}).get("valores") or [])
-        norm.append({"chave": chave, "valores": [str(x).strip() for x in vals if str(x).strip()]})
+        labels: List[str] = []
+        codes: Dict[str, str] = {}
+        for x in list((p or {}).get("valores") or []):
+            if isinstance(x, dict):
+                label = str(x.get("label") or "").strip()
+                code = str(x.get("code") or "").strip()
+            else:
+                label, code = str(x).strip(), ""
+            if not label:
+                continue
+            labels.append(label)
+            if len(code) == 2 and code.isdigit():
+                codes[label] = code
+        norm.append({"chave": chave, "valores": labels, "codes": codes})
 
     # Mapas (autonumeração) dos 2 primeiros parâmetros (tam/cor)
     param_tam = norm[0]["chave"] if len(norm) >= 1 else ""
@@ -103,27 +130,28 @@ def generate_skus_from_grade(
 
     if len(norm) >= 1:
         for idx, v in enumerate(norm[0]["valores"], start=1):
-            map_tam[v] = _to_2d(idx)
+            map_tam[v] = norm[0]["codes"].get(v) or _to_2d(idx)
     if len(norm) >= 2:
         for idx, v in enumerate(norm[1]["valores"], start=1):
-            map_cor[v] = _to_2d(idx)
+            map_cor[v] = norm[1]["codes"].get(v) or _to_2d(idx)
 
     # Monta combos completos (todos os parâmetros), mas EAN só usa tam/cor
+    if ean_params_only:
+        norm = norm[:2]
     headers = [p["chave"] or f"param_{i+1}" for i, p in enumerate(norm)]
     values_by_param = [p["valores"] or ["—"] for p in norm] or [["Único"]]
-    combos_rows = _cartesian(values_by_param)
 
-    out_rows: List[Dict[str, Any]] = []
-    for row in combos_rows:
-        combo = {h: row[i] for i, h in enumerate(headers)}
-        v_tam = row[0] if len(row) >= 1 else "Único"
-        v_cor = row[1] if len(row) >= 2 else "—"
+    def rows() -> Iterator[Dict[str, Any]]:
+        for row in iter_combos(values_by_param, start, stop):
+            combo = {h: row[i] for i, h in enumerate(headers)}
+            v_tam = row[0] if len(row) >= 1 else "Único"
+            v_cor = row[1] if len(row) >= 2 else "—"
 
-        cod_tam = map_tam.get(v_tam, "00") if map_tam else "00"
-        cod_cor = map_cor.get(v_cor, "00") if map_cor else "00"
+            cod_tam = map_tam.get(v_tam, "00") if map_tam else "00"
+            cod_cor = map_cor.get(v_cor, "00") if map_cor else "00"
 
-        sku = make_ean13(ref4, base4, cod_tam, cod_cor)
-        out_rows.append({"combo": combo, "sku": sku})
+            sku = make_ean13(ref4, base4, cod_tam, cod_cor)
+            yield {"combo": combo, "sku": sku}
 
     summary = {
         "ref": (ref4 or "").zfill(4)[-4:],
@@ -132,8 +160,9 @@ def generate_skus_from_grade(
         "param_cor": param_cor,
         "map_tamanho": map_tam,
         "map_cor": map_cor,
+        "count": combo_count(values_by_param),
     }
-    return out_rows, summary
+    return rows(), summary
 
 
 def validate_ean13(ean: str) -> bool:
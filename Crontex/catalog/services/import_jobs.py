@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+"""
+Fila de importações no banco (ImportJob) + execução fora do request.
+
+- enqueue_import(kind, upload, user) -> grava o arquivo e cria o job "queued"
+                                        (mode=preview => dry-run, ver bling_diff.py).
+- enqueue_apply(preview)             -> aplica o changeset de uma pré-visualização
+                                        (uma única vez: UNIQUE em source para mode=apply).
+- claim_next(worker)                 -> pega o job mais antigo da fila (UPDATE condicional,
+                                        seguro com vários workers).
+- requeue_stale(seconds)             -> jobs "running" sem heartbeat voltam para a fila.
+- run_job(job)                       -> roda o importador do tipo do job a partir do checkpoint.
+
+O progresso (linhas, linhas/s, erros, checkpoint) é gravado dentro da mesma
+transação de cada chunk: se o processo cair, o job continua do último chunk
+commitado em vez de recomeçar do zero.
+
+Worker: python manage.py run_import_jobs
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from datetime import timedelta
+from typing import Any, Callable, Dict, Optional
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from catalog.models import ImportJob
+from crontex.imports import ImportResult
+
+logger = logging.getLogger(__name__)
+
+# Quantos candidatos olhar por tentativa de claim (disputa entre workers)
+CLAIM_BATCH = 5
+
+
+def enqueue_import(kind: str, upload: Any, user: Any = None, *, mode: str = ImportJob.Mode.IMPORT) -> ImportJob:
+    job = ImportJob(
+        kind=kind,
+        mode=mode,
+        original_name=getattr(upload, "name", "") or "",
+        created_by=user if getattr(user, "is_authenticated", False) else None,
+    )
+    job.file.save(job.original_name or f"{kind}.csv", upload, save=False)
+    job.save()
+    return job
+
+
+def enqueue_apply(preview: ImportJob, user: Any = None) -> ImportJob:
+    """
+    Enfileira a aplicação do changeset de uma pré-visualização concluída.
+    ValueError se ela já tiver um job de aplicação (duplo clique, duas abas):
+    a pré-visualização é travada na transação e o UNIQUE parcial de
+    ImportJob.source cobre a disputa que escapar da trava (SQLite).
+    """
+    with transaction.atomic():
+        preview = ImportJob.objects.select_for_update().get(pk=preview.pk)
+        if preview.mode != ImportJob.Mode.PREVIEW or preview.status != ImportJob.Status.DONE:
+            raise ValueError("só é possível aplicar uma pré-visualização concluída")
+        existing = preview.applies.filter(mode=ImportJob.Mode.APPLY).values_list("pk", flat=True).first()
+        if existing is not None:
+            raise ValueError(f"esta pré-visualização já foi aplicada (#{existing})")
+        job = ImportJob(
+            kind=preview.kind,
+            mode=ImportJob.Mode.APPLY,
+            source=preview,
+            original_name=preview.original_name,
+            created_by=user if getattr(user, "is_authenticated", False) else None,
+        )
+        job.file.name = preview.file.name  # mesmo arquivo; não é relido
+        try:
+            with transaction.atomic():
+                job.save()
+        except IntegrityError:
+            raise ValueError("esta pré-visualização já foi aplicada") from None
+    return job
+
+
+def claim_next(worker: str) -> Optional[ImportJob]:
+    """
+    Reserva o próximo job da fila. O UPDATE ... WHERE status='queued' garante
+    que só um worker vence a disputa pelo mesmo job.
+    """
+    now = timezone.now()
+    candidates = list(
+        ImportJob.objects.filter(status=ImportJob.Status.QUEUED)
+        .order_by("created_at", "pk")
+        .values_list("pk", flat=True)[:CLAIM_BATCH]
+    )
+    for pk in candidates:
+        won = ImportJob.objects.filter(pk=pk, status=ImportJob.Status.QUEUED).update(
+            status=ImportJob.Status.RUNNING,
+            worker=worker,
+            heartbeat_at=now,
+            attempts=F("attempts") + 1,
+        )
+        if won:
+            return ImportJob.objects.get(pk=pk)
+    return None
+
+
+def requeue_stale(stale_after: float) -> int:
+    """Devolve à fila jobs 'running' cujo worker parou de dar sinal."""
+    limit = timezone.now() - timedelta(seconds=stale_after)
+    return ImportJob.objects.filter(status=ImportJob.Status.RUNNING, heartbeat_at__lt=limit).update(
+        status=ImportJob.Status.QUEUED, worker=""
+    )
+
+
+def requeue(job: ImportJob) -> None:
+    """Reenfileira (ex.: job que falhou); mantém o checkpoint."""
+    ImportJob.objects.filter(pk=job.pk).update(
+        status=ImportJob.Status.QUEUED, worker="", message="", finished_at=None
+    )
+
+
+def _runner(job: ImportJob) -> Callable[..., ImportResult]:
+    if job.kind == ImportJob.Kind.PRODUCTS:
+        from catalog.services.bling_import import import_rows
+        from catalog.services.bling_rows import iter_sheet_rows
+
+        if job.mode == ImportJob.Mode.PREVIEW:
+            from catalog.services.bling_diff import diff_rows
+
+            return lambda fh, name, **kw: diff_rows(iter_sheet_rows(fh, name), job, **kw)
+        if job.mode == ImportJob.Mode.APPLY:
+            from catalog.services.bling_diff import apply_changeset
+
+            return lambda fh, name, workers=None, **kw: apply_changeset(job, **kw)
+        return lambda fh, name, **kw: import_rows(iter_sheet_rows(fh, name), **kw)
+    if job.kind == ImportJob.Kind.CONTACTS:
+        from people.services.contact_import import import_contacts, iter_contact_rows
+
+        # parse de contatos é leve; não usa pool de processos
+        return lambda fh, name, workers=None, **kw: import_contacts(iter_contact_rows(fh), **kw)
+    raise ValueError(f"tipo de importação desconhecido: {job.kind!r}")
+
+
+def run_job(job: ImportJob, *, chunk_size: Optional[int] = None, workers: Optional[int] = None) -> ImportJob:
+    """
+    Executa (ou retoma) um job já reservado por claim_next().
+    workers: processos de parse (None = settings.CATALOG_IMPORT_WORKERS).
+    """
+    start_row = job.checkpoint
+    started = time.monotonic()
+    result = ImportResult(
+        created=job.rows_created,
+        updated=job.rows_updated,
+        unchanged=job.rows_unchanged,
+        missing=job.rows_missing,
+        rows=job.rows_processed,
+        error_count=job.error_count,
+        errors=list(job.errors or []),
+    )
+
+    def on_chunk(res: ImportResult, rows_done: int) -> None:
+        elapsed = max(time.monotonic() - started, 1e-6)
+        ImportJob.objects.filter(pk=job.pk).update(
+            checkpoint=rows_done,
+            rows_processed=res.rows,
+            rows_created=res.created,
+            rows_updated=res.updated,
+            rows_unchanged=res.unchanged,
+            rows_missing=res.missing,
+            error_count=res.error_count,
+            errors=res.errors,
+            rows_per_sec=round((rows_done - start_row) / elapsed, 1),
+            heartbeat_at=timezone.now(),
+        )
+
+    if job.started_at is None:
+        ImportJob.objects.filter(pk=job.pk).update(started_at=timezone.now())
+
+    kwargs: Dict[str, Any] = {"start_row": start_row, "result": result, "on_chunk": on_chunk}
+    if chunk_size:
+        kwargs["chunk_size"] = chunk_size
+    if workers:
+        kwargs["workers"] = workers
+    try:
+        with job.file.open("rb") as fh:
+            _runner(job)(fh, job.original_name or job.file.name, **kwargs)
+    except Exception as exc:
+        logger.exception("ImportJob #%s falhou", job.pk)
+        msg = "; ".join(getattr(exc, "messages", None) or [str(exc)])
+        ImportJob.objects.filter(pk=job.pk).update(
+            status=ImportJob.Status.FAILED, message=msg, finished_at=timezone.now()
+        )
+    else:
+        ImportJob.objects.filter(pk=job.pk).update(
+            status=ImportJob.Status.DONE, finished_at=timezone.now(), heartbeat_at=timezone.now()
+        )
+    job.refresh_from_db()
+    return job
+
+
+def process_next(worker: str = "inline") -> Optional[ImportJob]:
+    """Reserva e executa um job (útil em testes e no modo --once do worker)."""
+    job = claim_next(worker)
+    if job is None:
+        return None
+    return run_job(job)
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+"""
+Etiquetas de uma grade de produto (folha SVG/PDF para a produção).
+
+Fonte dos códigos: ProductVariant.ean13 (1 SELECT); se o produto ainda não tem
+variantes materializadas, os EANs saem da grade salva (variant_sync.desired_variants),
+sem gravar nada. Cada etiqueta leva o SKU da variante, tamanho/cor e a tag de
+acabamento (bling_extra["avi_acabamento"]["tag"], campo avacab_tag do form).
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, List
+
+from django.conf import settings
+
+from catalog.models import Product
+from catalog.services.variant_sync import desired_variants
+from catalog.utils.barcode_render import Label
+
+DEFAULT_LABELS_MAX = 5000
+
+
+def labels_max() -> int:
+    return int(getattr(settings, "CATALOG_LABELS_MAX", DEFAULT_LABELS_MAX))
+
+
+def _finishing_tag(product: Product) -> str:
+    extra: Dict[str, Any] = product.bling_extra if isinstance(product.bling_extra, dict) else {}
+    acab = extra.get("avi_acabamento")
+    return str(acab.get("tag") or "").strip() if isinstance(acab, dict) else ""
+
+
+def _label(code: str, sku: str, size: str, color: str, tag: str) -> Label:
+    variant = " / ".join(x for x in (size, color) if x)
+    lines = [x for x in (sku, variant, tag) if x]
+    return Label(code=code, lines=tuple(lines))
+
+
+def product_labels(product: Product, *, copies: int = 1) -> List[Label]:
+    """
+    Etiquetas da grade, na ordem tamanho/cor, cada uma repetida `copies` vezes.
+    ValueError se passar de CATALOG_LABELS_MAX.
+    """
+    copies = max(int(copies), 1)
+    tag = _finishing_tag(product)
+    rows = list(
+        product.variants.exclude(ean13="")
+        .order_by("size_code", "color_code", "pk")
+        .values_list("ean13", "sku", "size_name", "color_name")
+    )
+    if not rows:
+        rows = [
+            (v["ean13"], v["sku"], v["size_name"], v["color_name"])
+            for v in sorted(desired_variants(product).values(), key=lambda v: v["ean13"])
+        ]
+
+    total = len(rows) * copies
+    if total > labels_max():
+        raise ValueError(f"{total} etiquetas pedidas; o máximo por folha é {labels_max()}.")
+    labels: List[Label] = []
+    for ean, sku, size, color in rows:
+        labels.extend([_label(ean, sku, size, color, tag)] * copies)
+    return labels
@@ -109,3 +109,34 @@ def merge_people_links(product, cleaned_data: Dict[str, Any]) -> None:
 
     extra["people"] = people
     product.bling_extra = extra
+
+
+def repoint_people_links(mapping: Dict[int, int]) -> int:
+    """
+    Troca IDs de contato em bling_extra["people"] de todos os produtos
+    (mescla de duplicados: {id antigo: id novo}). 1 SELECT só dos produtos
+    que citam algum ID antigo + bulk_update. Devolve quantos produtos mudaram.
+    """
+    from django.db.models import Q
+
+    from catalog.models import Product
+
+    if not mapping:
+        return 0
+    old_ids = list(mapping)
+    query = Q()
+    for section, key_json, _field in PEOPLE_FIELDS:
+        query |= Q(**{f"bling_extra__people__{section}__{key_json}__in": old_ids})
+
+    changed = []
+    for product in Product.objects.filter(query).only("id", "bling_extra"):
+        people = _ensure_dict(_ensure_dict(product.bling_extra).get("people"))
+        for section, key_json, _field in PEOPLE_FIELDS:
+            block = people.get(section)
+            if isinstance(block, dict):
+                new_id = mapping.get(_norm_int_or_none(block.get(key_json)))
+                if new_id:
+                    block[key_json] = new_id
+        changed.append(product)
+    Product.objects.bulk_update(changed, ["bling_extra"], batch_size=500)
+    return len(changed)
@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+"""
+Busca textual de produtos (lista de produtos e busca do admin).
+
+Índice sombra SQLite FTS5 `catalog_product_fts` (rowid = Product.id) sobre
+sku / nome / marca / categoria / fornecedor (nome + código) / GTIN:
+- tokenizer unicode61 sem acentos ("acao" acha "Ação"), índices de prefixo 2/3/4;
+- cada termo digitado vira prefixo ("cam azu" -> "cam"* "azu"*, todos obrigatórios);
+- ordenação por bm25 com pesos por coluna (SKU/GTIN > nome > marca/categoria > fornecedor),
+  configurada na própria tabela (coluna oculta `rank`).
+
+Sincronização:
+- save()/delete() de Product -> signals/search.py;
+- importação em lote (bulk_create/bulk_update) -> bling_import.write_chunk chama reindex_products();
+- `python manage.py rebuild_product_search` reconstrói tudo.
+
+Sem FTS5 (outro banco ou SQLite compilado sem a extensão) a busca volta ao
+icontains em sku/nome, como antes.
+"""
+
+from __future__ import annotations
+
+import re
+import time
+from typing import Dict, Iterable, List
+
+from django.db import connections
+from django.db.models import Q, QuerySet
+
+FTS_TABLE = "catalog_product_fts"
+_COLUMNS = "sku, name, brand, category, supplier, gtin"
+_SOURCE = (
+    "SELECT id, sku, name, brand, product_category, "
+    "trim(supplier_name || ' ' || supplier_code), gtin FROM catalog_product"
+)
+_ID_CHUNK = 500
+# sem a tabela (ex. worker que subiu antes da migração 0010): nova checagem após isso (s)
+FTS_RECHECK_SECONDS = 60
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+_available: Dict[str, bool] = {}      # só True: a tabela não some depois de criada
+_missing_until: Dict[str, float] = {}  # "não tem" vale até este instante (time.monotonic)
+
+
+def fts_enabled(using: str = "default") -> bool:
+    """
+    O banco tem a tabela FTS5? Sim fica guardado por processo; não é
+    reconsultado a cada FTS_RECHECK_SECONDS, para a busca e o reindex passarem
+    a usar o índice assim que a migração roda, sem reiniciar o processo.
+    """
+    if _available.get(using):
+        return True
+    if time.monotonic() < _missing_until.get(using, 0.0):
+        return False
+    conn = connections[using]
+    ok = False
+    if conn.vendor == "sqlite":
+        with conn.cursor() as cur:
+            cur.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [FTS_TABLE])
+            ok = cur.fetchone() is not None
+    if ok:
+        _available[using] = True
+        _missing_until.pop(using, None)
+    else:
+        _missing_until[using] = time.monotonic() + FTS_RECHECK_SECONDS
+    return ok
+
+
+def match_expression(q: str) -> str:
+    """Texto livre -> expressão FTS5 só com termos entre aspas e prefixo (sem sintaxe do usuário)."""
+    return " ".join(f'"{tok}"*' for tok in _TOKEN_RE.findall(q.lower()))
+
+
+def search_products(qs: QuerySet, q: str) -> QuerySet:
+    """
+    Filtra `qs` (de Product) pelo texto `q`, mais relevantes primeiro.
+    A ordenação por relevância substitui a ordenação atual do queryset.
+    """
+    q = (q or "").strip()
+    if not q:
+        return qs
+    if not fts_enabled(qs.db):
+        return qs.filter(Q(name__icontains=q) | Q(sku__icontains=q))
+    expr = match_expression(q)
+    if not expr:
+        return qs.none()
+    return qs.filter(search_document__document__match=expr).order_by("search_document__rank", "-id")
+
+
+def _chunks(ids: List[int]) -> Iterable[List[int]]:
+    for i in range(0, len(ids), _ID_CHUNK):
+        yield ids[i:i + _ID_CHUNK]
+
+
+def reindex_products(pks: Iterable[int], using: str = "default") -> int:
+    """
+    Regrava as linhas do índice destes produtos a partir da tabela (SQL puro,
+    sem carregar instâncias). Produtos que não existem mais saem do índice.
+    """
+    ids = sorted({int(pk) for pk in pks if pk is not None})
+    if not ids or not fts_enabled(using):
+        return 0
+    with connections[using].cursor() as cur:
+        for part in _chunks(ids):
+            marks = ", ".join(["%s"] * len(part))
+            cur.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid IN ({marks})", part)
+            cur.execute(f"INSERT INTO {FTS_TABLE} (rowid, {_COLUMNS}) {_SOURCE} WHERE id IN ({marks})", part)
+    return len(ids)
+
+
+def unindex_products(pks: Iterable[int], using: str = "default") -> None:
+    ids = sorted({int(pk) for pk in pks if pk is not None})
+    if not ids or not fts_enabled(using):
+        return
+    with connections[using].cursor() as cur:
+        for part in _chunks(ids):
+            cur.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid IN ({', '.join(['%s'] * len(part))})", part)
+
+
+def rebuild_index(using: str = "default") -> int:
+    """Reconstrói o índice inteiro a partir de catalog_product. Retorna o nº de produtos."""
+    if not fts_enabled(using):
+        return 0
+    with connections[using].cursor() as cur:
+        cur.execute(f"DELETE FROM {FTS_TABLE}")
+        cur.execute(f"INSERT INTO {FTS_TABLE} (rowid, {_COLUMNS}) {_SOURCE}")
+        cur.execute(f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('optimize')")
+        cur.execute(f"SELECT count(*) FROM {FTS_TABLE}")
+        return int(cur.fetchone()[0])
@@ -0,0 +1,232 @@
+# -*- coding: utf-8 -*-
+"""
+Materializa a grade do produto (bling_extra["grade"]) em linhas de ProductVariant.
+
+Uma variante por par de códigos (tamanho, cor) — só os 2 parâmetros do EAN
+identificam a variante; os demais (3º em diante) não mudam o EAN (ver
+grade_skus.py). Os nomes são só rótulo: renomear "P" para "Pequeno" atualiza a
+mesma linha (mesmo EAN, mesmo estoque).
+
+sync_variants(product) faz tudo numa transação:
+- 1 SELECT das variantes atuais do produto;
+- bulk_create das novas, bulk_update das que mudaram de nome/SKU,
+  DELETE em lote das que saíram da grade.
+Estoque e preço override das variantes mantidas são preservados. Variante com
+estoque diferente de zero nunca é apagada: se a grade nova a deixa de fora, o
+sync inteiro é recusado (ValidationError listando as variantes).
+
+ref/base do EAN vêm do bloco reservado para o produto (Product.ean_block, ver
+ean_blocks.py). Produto sem bloco não tem variantes materializadas: o ref/base
+derivado do SKU (deriveRefBase() no JS da aba Grade: 4 primeiros / 4 últimos
+caracteres, não-dígitos viram "0") colide entre SKUs diferentes ("CAM-A-0001" e
+"CAL-B-0001" dão o mesmo EAN) e só serve para pré-visualização/etiquetas.
+"""
+
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from catalog.models import Product, ProductVariant
+from catalog.services.ean_blocks import block_ref_base
+from catalog.services.ean_unique import EanIndex, check_unique_eans
+from catalog.services.grade_skus import iter_skus_from_grade
+from catalog.validators.ean import variant_integrity_error
+
+_ROLE_ORDER = {"size": 0, "color": 1}
+
+
+@dataclass
+class VariantSyncResult:
+    created: int = 0
+    updated: int = 0
+    deleted: int = 0
+    unchanged: int = 0
+
+
+def derive_ref_base(sku: str) -> Tuple[str, str]:
+    """Mesma regra de deriveRefBase() (produto_form_full.js)."""
+    sku = (sku or "").strip()
+    ref_raw = (sku[:4] or "0000").ljust(4, "0")[:4]
+    base_raw = (sku[-4:] or "0000").rjust(4, "0")[-4:]
+    ref = "".join(ch if ch.isdigit() else "0" for ch in ref_raw)
+    base = "".join(ch if ch.isdigit() else "0" for ch in base_raw)
+    return ref, base
+
+
+def _grade_of(product: Product) -> Dict[str, Any]:
+    extra = product.bling_extra
+    if isinstance(extra, str):
+        try:
+            extra = json.loads(extra)
+        except Exception:
+            extra = {}
+    grade = (extra or {}).get("grade") if isinstance(extra, dict) else None
+    if isinstance(grade, str):
+        try:
+            grade = json.loads(grade)
+        except Exception:
+            grade = None
+    if not isinstance(grade, dict):
+        return {}
+    # payload da aba Grade traz role; o gerador usa a posição (1º = tam, 2º = cor)
+    params = [p for p in (grade.get("parametros") or []) if isinstance(p, dict)]
+    if any(p.get("role") in _ROLE_ORDER for p in params):
+        params = sorted(params, key=lambda p: _ROLE_ORDER.get(p.get("role"), 2))
+    return {"parametros": params}
+
+
+def desired_variants(product: Product) -> Dict[Tuple[str, str], Dict[str, str]]:
+    """(size_code, color_code) -> campos da variante, a partir da grade do produto."""
+    grade = _grade_of(product)
+    if not any((p.get("valores") or []) for p in grade.get("parametros", [])):
+        return {}
+    if product.ean_block is not None:
+        ref, base = block_ref_base(product.ean_block)
+    else:
+        ref, base = derive_ref_base(product.sku)
+    # só tam x cor: os demais parâmetros não mudam o EAN, nem entram na expansão
+    rows, _summary = iter_skus_from_grade(ref, base, grade, ean_params_only=True)
+
+    out: Dict[Tuple[str, str], Dict[str, str]] = {}
+    for row in rows:
+        ean = row["sku"]
+        key = (ean[8:10], ean[10:12])
+        if key in out:
+            continue  # código repetido na grade: fica a 1ª ocorrência
+        values = [v if v != "—" else "" for v in row["combo"].values()]
+        out[key] = {
+            "size_name": values[0][:50] if values else "",
+            "color_name": values[1][:50] if len(values) > 1 else "",
+            "ean13": ean,
+            "sku": f"{product.sku}-{ean[8:12]}"[:80],
+        }
+    return out
+
+
+_SYNC_FIELDS = ("size_name", "color_name", "ean13", "sku")
+
+
+def _check_sku_conflicts(product: Product, desired: Dict[Tuple[str, str], Dict[str, str]]) -> None:
+    skus = [d["sku"] for d in desired.values()]
+    taken_skus = sorted(
+        ProductVariant.objects.filter(sku__in=skus).exclude(product=product).values_list("sku", flat=True)
+    )
+    if taken_skus:
+        raise ValidationError({"sku": f"SKU de variante já usado por outro produto: {', '.join(taken_skus[:10])}"})
+
+
+def sync_variants(
+    product: Product,
+    *,
+    desired: Optional[Dict[Tuple[str, str], Dict[str, str]]] = None,
+    index: Optional[EanIndex] = None,
+) -> VariantSyncResult:
+    """
+    Sincroniza ProductVariant com a grade do produto (uma transação, operações em lote).
+    ValidationError se algum EAN/SKU gerado já pertencer a variante de outro produto
+    ou se a grade deixar de fora variante com estoque.
+    index: EanIndex aquecido (sync de muitos produtos) dispensa a consulta de EANs.
+    Sem desired explícito, produto sem ean_block não é tocado (EAN do SKU não é único).
+    """
+    result = VariantSyncResult()
+    if desired is None:
+        if product.ean_block is None:
+            return result
+        desired = desired_variants(product)
+
+    try:
+        with transaction.atomic():
+            _sync(product, desired, result, index)
+    except IntegrityError as exc:
+        mapped = variant_integrity_error(exc)
+        if mapped is None:
+            raise
+        raise mapped from exc
+    return result
+
+
+def _sync(
+    product: Product,
+    desired: Dict[Tuple[str, str], Dict[str, str]],
+    result: VariantSyncResult,
+    index: Optional[EanIndex],
+) -> None:
+    current = {
+        (v.size_code, v.color_code): v
+        for v in ProductVariant.objects.filter(product=product).only(
+            "id", "product_id", "size_code", "color_code", "stock_qty", *_SYNC_FIELDS
+        )
+    }
+    if desired:
+        # EANs podem trocar de dono entre variantes do próprio produto
+        check_unique_eans(
+            [d["ean13"] for d in desired.values()],
+            ignore_pks={v.pk for v in current.values()},
+            index=index,
+        )
+        _check_sku_conflicts(product, desired)
+
+    old_eans = {v.pk: v.ean13 for v in current.values()}
+    stale = [v for key, v in current.items() if key not in desired]
+    stocked = [v for v in stale if v.stock_qty]
+    if stocked:
+        names = ", ".join(
+            f"{' / '.join(n for n in (v.size_name, v.color_name) if n) or v.ean13} ({v.stock_qty.normalize()})"
+            for v in stocked[:10]
+        )
+        raise ValidationError(
+            f"Variantes com estoque não podem sair da grade (zere o estoque antes): {names}"
+        )
+    stale = [v.pk for v in stale]
+    if stale:
+        result.deleted, _ = ProductVariant.objects.filter(pk__in=stale).delete()
+
+    held = set(old_eans.values()) | {v.sku for v in current.values()}
+    held_names = {(v.size_name, v.color_name) for v in current.values()}
+    now = timezone.now()
+    to_update: List[ProductVariant] = []
+    to_create: List[ProductVariant] = []
+    for key, fields in desired.items():
+        v = current.get(key)
+        if v is None:
+            to_create.append(ProductVariant(product=product, size_code=key[0], color_code=key[1], **fields))
+            continue
+        if all(getattr(v, f) == fields[f] for f in _SYNC_FIELDS):
+            result.unchanged += 1
+            continue
+        for f, value in fields.items():
+            setattr(v, f, value)
+        v.updated_at = now
+        to_update.append(v)
+
+    if to_update:
+        # nomes/SKUs trocados entre variantes (ex.: reordenar tamanhos) violariam
+        # os UNIQUE no meio do UPDATE: libera os valores antigos antes
+        if any(v.ean13 in held or v.sku in held or (v.size_name, v.color_name) in held_names for v in to_update):
+            placeholders = [
+                ProductVariant(pk=v.pk, ean13=f"~{v.pk}"[:13], sku=f"~{v.pk}", size_name=f"~{v.pk}", color_name="")
+                for v in to_update
+            ]
+            ProductVariant.objects.bulk_update(
+                placeholders, ["ean13", "sku", "size_name", "color_name"], batch_size=500
+            )
+        ProductVariant.objects.bulk_update(to_update, [*_SYNC_FIELDS, "updated_at"], batch_size=500)
+        result.updated = len(to_update)
+    if to_create:
+        ProductVariant.objects.bulk_create(to_create, batch_size=500)
+        result.created = len(to_create)
+
+    if index is not None and index.warm:
+        for pk, ean in old_eans.items():
+            if index.owner(ean) == pk:
+                index.discard(ean)
+        removed = set(stale)
+        for v in [*current.values(), *to_create]:
+            if v.pk is not None and v.pk not in removed:
+                index.add(v.ean13, v.pk)
@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from catalog.models import Product, ProductVariant
+from catalog.services import barcode_index
+
+
+@receiver(post_delete, sender=Product)
+def evict_product_barcode(sender, instance: Product, **kwargs):
+    # refresh incremental (updated_at) não enxerga exclusões
+    barcode_index._index.evict_product(instance.pk)
+
+
+@receiver(post_delete, sender=ProductVariant)
+def evict_variant_barcode(sender, instance: ProductVariant, **kwargs):
+    barcode_index._index.evict_variant(instance.pk)
@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from catalog.models import Product
+from catalog.services.product_search import reindex_products, unindex_products
+
+# colunas de Product que alimentam o índice FTS
+_INDEXED_FIELDS = frozenset({"sku", "name", "brand", "product_category", "supplier_name", "supplier_code", "gtin"})
+
+
+@receiver(post_save, sender=Product)
+def index_product(sender, instance: Product, created: bool, update_fields=None, raw=False, using="default", **kwargs):
+    if raw:
+        return
+    if update_fields is not None and not _INDEXED_FIELDS.intersection(update_fields):
+        return  # ex.: save(update_fields=["bling_extra"]) não mexe no texto buscável
+    reindex_products([instance.pk], using=using)
+
+
+@receiver(post_delete, sender=Product)
+def unindex_product(sender, instance: Product, using="default", **kwargs):
+    unindex_products([instance.pk], using=using)
@@ -7,8 +7,12 @@ from catalog.views.web import (
     ProdutoUpdateView,
     ProdutoDeleteView,
     ProdutoImportView,
+    produto_grade_combos,
 )
-from catalog.views.ean_api import generate_ean_bulk
+from catalog.views.barcode_api import barcode_lookup, barcode_lookup_batch
+from catalog.views.ean_api import generate_ean_batch, generate_ean_bulk
+from catalog.views.labels import produto_labels
+from catalog.views.imports import ImportJobDetailView, import_job_apply, import_job_status
 
 app_name = "catalog"
 
@@ -18,8 +22,16 @@ urlpatterns = [
     path("produtos/<int:pk>/", ProdutoDetailView.as_view(), name="produto_detail"),
     path("produtos/<int:pk>/editar/", ProdutoUpdateView.as_view(), name="produto_update"),
     path("produtos/<int:pk>/excluir/", ProdutoDeleteView.as_view(), name="produto_delete"),
+    path("produtos/<int:pk>/grade/combos", produto_grade_combos, name="produto_grade_combos"),
+    path("produtos/<int:pk>/etiquetas", produto_labels, name="produto_labels"),
     path("produtos/importar/", ProdutoImportView.as_view(), name="produto_import"),
+    path("importacoes/<int:pk>/", ImportJobDetailView.as_view(), name="import_job_detail"),
+    path("importacoes/<int:pk>/status", import_job_status, name="import_job_status"),
+    path("importacoes/<int:pk>/aplicar", import_job_apply, name="import_job_apply"),
 
     # API utilitária
     path("catalog/api/ean/generate", generate_ean_bulk, name="ean_generate"),
+    path("catalog/api/ean/batch", generate_ean_batch, name="ean_batch"),
+    path("catalog/api/barcode/", barcode_lookup_batch, name="barcode_lookup_batch"),
+    path("catalog/api/barcode/<str:code>", barcode_lookup, name="barcode_lookup"),
 ]
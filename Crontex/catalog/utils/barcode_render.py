@@ -0,0 +1,406 @@
+# -*- coding: utf-8 -*-
+"""
+Renderização de EAN-13 em SVG e PDF, em Python puro (sem reportlab/Pillow).
+
+- ean13_modules(code)            -> 95 módulos "0"/"1" (guardas + L/G/R por paridade)
+- SymbolStyle                     -> tamanho do módulo, altura das barras, fonte, zonas de silêncio
+- render_svg(code, style)         -> SVG avulso de um código
+- SheetLayout / Label             -> folha de etiquetas (padrão: A4 3x7, 63,5 x 38,1 mm)
+- render_sheet_svg(labels, ...)   -> uma folha SVG (páginas empilhadas)
+- render_sheet_pdf(labels, ...)   -> PDF multipágina (vetorial, Helvetica padrão)
+
+Cache endereçado por conteúdo: a geometria de um símbolo depende só do código
+e do estilo, então o fragmento SVG/PDF já posicionado na origem é guardado sob
+sha1(formato, código, estilo) num LRU por processo (CATALOG_BARCODE_RENDER_CACHE).
+Numa reimpressão a folha é só a concatenação dos fragmentos com translate/cm.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+import zlib
+from collections import OrderedDict
+from dataclasses import astuple, dataclass
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from django.conf import settings
+
+from catalog.utils import gtin
+
+# ---------- codificação EAN-13 ----------
+
+_L = ("0001101", "0011001", "0010011", "0111101", "0100011",
+      "0110001", "0101111", "0111011", "0110111", "0001011")
+_R = tuple("".join("1" if b == "0" else "0" for b in code) for code in _L)
+_G = tuple(code[::-1] for code in _R)
+# paridade dos 6 dígitos da esquerda conforme o 1º dígito (que não é barrado)
+_PARITY = ("LLLLLL", "LLGLGG", "LLGGLG", "LLGGGL", "LGLLGG",
+           "LGGLLG", "LGGGLL", "LGLGLG", "LGLGGL", "LGGLGL")
+_GUARD_MODULES = frozenset((0, 1, 2, 45, 46, 47, 48, 49, 92, 93, 94))
+
+MM_TO_PT = 72 / 25.4
+DEFAULT_RENDER_CACHE = 4096
+
+
+def _checked_ean13(code: str) -> str:
+    s = gtin.only_digits(code)
+    if len(s) != 13 or not gtin.is_valid(s):
+        raise ValueError(f"EAN-13 inválido: {code!r}")
+    return s
+
+
+def ean13_modules(code: str) -> str:
+    """95 módulos (1 = barra) do EAN-13; ValueError se o código não for válido."""
+    s = _checked_ean13(code)
+    parity = _PARITY[ord(s[0]) - 48]
+    left = "".join((_L if p == "L" else _G)[ord(ch) - 48] for p, ch in zip(parity, s[1:7]))
+    right = "".join(_R[ord(ch) - 48] for ch in s[7:])
+    return f"101{left}01010{right}101"
+
+
+def _bars(modules: str) -> List[Tuple[int, int, bool]]:
+    """Sequências de barras: (módulo inicial, largura em módulos, é guarda)."""
+    out: List[Tuple[int, int, bool]] = []
+    i, n = 0, len(modules)
+    while i < n:
+        if modules[i] == "1":
+            j = i
+            while j < n and modules[j] == "1":
+                j += 1
+            out.append((i, j - i, i in _GUARD_MODULES))
+            i = j
+        else:
+            i += 1
+    return out
+
+
+# ---------- estilo / layout ----------
+
+@dataclass(frozen=True)
+class SymbolStyle:
+    module_mm: float = 0.264      # ~80% de magnificação (0,33 mm nominal)
+    bar_height_mm: float = 14.0
+    font_mm: float = 2.4
+    quiet_left: int = 11          # módulos
+    quiet_right: int = 7
+
+    @property
+    def width_mm(self) -> float:
+        return (self.quiet_left + 95 + self.quiet_right) * self.module_mm
+
+    @property
+    def height_mm(self) -> float:
+        return self.bar_height_mm + self.font_mm * 1.2
+
+
+@dataclass(frozen=True)
+class SheetLayout:
+    page_w_mm: float = 210.0
+    page_h_mm: float = 297.0
+    columns: int = 3
+    rows: int = 7
+    label_w_mm: float = 63.5
+    label_h_mm: float = 38.1
+    margin_left_mm: float = 7.2
+    margin_top_mm: float = 15.1
+    gap_x_mm: float = 2.5
+    gap_y_mm: float = 0.0
+    caption_mm: float = 2.6       # fonte das linhas de texto acima do código
+
+    @property
+    def per_page(self) -> int:
+        return self.columns * self.rows
+
+    def slot(self, index: int) -> Tuple[int, float, float]:
+        """índice da etiqueta -> (página, x, y) do canto superior esquerdo, em mm."""
+        page, pos = divmod(index, self.per_page)
+        row, col = divmod(pos, self.columns)
+        x = self.margin_left_mm + col * (self.label_w_mm + self.gap_x_mm)
+        y = self.margin_top_mm + row * (self.label_h_mm + self.gap_y_mm)
+        return page, x, y
+
+
+class Label(NamedTuple):
+    code: str
+    lines: Tuple[str, ...] = ()
+
+
+# ---------- cache endereçado por conteúdo ----------
+
+class RenderCache:
+    """LRU thread-safe: sha1(formato, código, estilo) -> fragmento renderizado."""
+
+    def __init__(self, maxsize: Optional[int] = None) -> None:
+        self._maxsize = maxsize
+        self._data: "OrderedDict[str, object]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def maxsize(self) -> int:
+        if self._maxsize is not None:
+            return self._maxsize
+        return int(getattr(settings, "CATALOG_BARCODE_RENDER_CACHE", DEFAULT_RENDER_CACHE))
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    @staticmethod
+    def key(kind: str, code: str, style: SymbolStyle) -> str:
+        return hashlib.sha1(repr((kind, code, astuple(style))).encode("ascii")).hexdigest()
+
+    def get(self, key: str):
+        with self._lock:
+            value = self._data.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: str, value) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = 0
+
+
+_cache = RenderCache()
+
+
+def render_cache() -> RenderCache:
+    return _cache
+
+
+def _cached(kind: str, code: str, style: SymbolStyle, build):
+    key = RenderCache.key(kind, code, style)
+    value = _cache.get(key)
+    if value is None:
+        value = build(code, style)
+        _cache.put(key, value)
+    return value
+
+
+def sheet_digest(
+    labels: Sequence[Label],
+    layout: Optional[SheetLayout],
+    style: Optional[SymbolStyle],
+    kind: str,
+) -> str:
+    """Hash de conteúdo da folha inteira (ETag de reimpressões)."""
+    layout, style = layout or SheetLayout(), style or SymbolStyle()
+    h = hashlib.sha1(repr((kind, astuple(layout), astuple(style))).encode("ascii"))
+    for label in labels:
+        h.update(label.code.encode("ascii", "replace"))
+        h.update("\x1f".join(label.lines).encode("utf-8"))
+        h.update(b"\x1e")
+    return h.hexdigest()
+
+
+# ---------- texto legível (posições em módulos) ----------
+
+def _human_digits(s: str, style: SymbolStyle) -> List[Tuple[float, str]]:
+    """(x central em mm, dígito) dos 13 dígitos impressos sob o código."""
+    m, q = style.module_mm, style.quiet_left
+    out = [((q - 4) * m, s[0])]
+    out += [((q + 3 + 7 * i + 3.5) * m, ch) for i, ch in enumerate(s[1:7])]
+    out += [((q + 50 + 7 * i + 3.5) * m, ch) for i, ch in enumerate(s[7:])]
+    return out
+
+
+def _fmt(v: float) -> str:
+    return f"{v:.3f}".rstrip("0").rstrip(".") or "0"
+
+
+# ---------- SVG ----------
+
+def _build_svg_fragment(s: str, style: SymbolStyle) -> str:
+    m, q = style.module_mm, style.quiet_left
+    bar_h = style.bar_height_mm
+    guard_h = bar_h + style.font_mm * 0.6
+    path = "".join(
+        f"M{_fmt((q + start) * m)} 0h{_fmt(width * m)}v{_fmt(guard_h if guard else bar_h)}h{_fmt(-width * m)}z"
+        for start, width, guard in _bars(ean13_modules(s))
+    )
+    baseline = _fmt(bar_h + style.font_mm)
+    text = "".join(
+        f'<text x="{_fmt(x)}" y="{baseline}">{ch}</text>' for x, ch in _human_digits(s, style)
+    )
+    return (
+        f'<path d="{path}"/>'
+        f'<g font-family="OCR-B, monospace" font-size="{_fmt(style.font_mm)}" text-anchor="middle">{text}</g>'
+    )
+
+
+def svg_symbol_fragment(code: str, style: Optional[SymbolStyle] = None) -> str:
+    """Fragmento SVG (mm, origem no canto superior esquerdo da zona de silêncio)."""
+    return _cached("svg", _checked_ean13(code), style or SymbolStyle(), _build_svg_fragment)
+
+
+def render_svg(code: str, style: Optional[SymbolStyle] = None) -> str:
+    style = style or SymbolStyle()
+    w, h = _fmt(style.width_mm), _fmt(style.height_mm)
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{w}mm" height="{h}mm" viewBox="0 0 {w} {h}">'
+        f'<rect width="{w}" height="{h}" fill="#fff"/>{svg_symbol_fragment(code, style)}</svg>'
+    )
+
+
+def _escape_xml(text: str) -> str:
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;").replace('"', "&quot;")
+
+
+def _fit(text: str, width_mm: float, font_mm: float) -> str:
+    # Helvetica/sans: ~0,55 em por caractere em média
+    max_chars = max(int(width_mm / (font_mm * 0.55)), 1)
+    return text if len(text) <= max_chars else text[: max_chars - 1] + "…"
+
+
+def _label_origin(layout: SheetLayout, style: SymbolStyle, x: float, y: float, n_lines: int) -> Tuple[float, float]:
+    """Canto superior esquerdo do símbolo dentro da etiqueta (centralizado na horizontal)."""
+    sx = x + max((layout.label_w_mm - style.width_mm) / 2, 0)
+    sy = y + 1.5 + n_lines * layout.caption_mm * 1.2 + 0.8
+    return sx, sy
+
+
+def render_sheet_svg(
+    labels: Sequence[Label],
+    layout: Optional[SheetLayout] = None,
+    style: Optional[SymbolStyle] = None,
+) -> str:
+    """Todas as etiquetas num SVG; páginas empilhadas na vertical."""
+    layout, style = layout or SheetLayout(), style or SymbolStyle()
+    pages = max((len(labels) + layout.per_page - 1) // layout.per_page, 1)
+    w, h = layout.page_w_mm, layout.page_h_mm * pages
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{_fmt(w)}mm" height="{_fmt(h)}mm" '
+        f'viewBox="0 0 {_fmt(w)} {_fmt(h)}"><rect width="{_fmt(w)}" height="{_fmt(h)}" fill="#fff"/>'
+    ]
+    for i, label in enumerate(labels):
+        page, x, y = layout.slot(i)
+        y += page * layout.page_h_mm
+        fragment = svg_symbol_fragment(label.code, style)
+        for n, line in enumerate(label.lines):
+            parts.append(
+                f'<text x="{_fmt(x + layout.label_w_mm / 2)}" y="{_fmt(y + 1.5 + (n + 1) * layout.caption_mm * 1.2)}" '
+                f'font-family="Helvetica, Arial, sans-serif" font-size="{_fmt(layout.caption_mm)}" '
+                f'text-anchor="middle">{_escape_xml(_fit(line, layout.label_w_mm - 2, layout.caption_mm))}</text>'
+            )
+        sx, sy = _label_origin(layout, style, x, y, len(label.lines))
+        parts.append(f'<g transform="translate({_fmt(sx)} {_fmt(sy)})">{fragment}</g>')
+    parts.append("</svg>")
+    return "".join(parts)
+
+
+# ---------- PDF ----------
+
+def _pt(mm: float) -> str:
+    return _fmt(mm * MM_TO_PT)
+
+
+def _pdf_text(text: str) -> bytes:
+    raw = text.encode("cp1252", "replace")
+    return raw.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)")
+
+
+def _text_width_mm(text: str, font_mm: float) -> float:
+    return len(text) * font_mm * 0.55
+
+
+def _build_pdf_fragment(s: str, style: SymbolStyle) -> bytes:
+    """Operadores PDF em pt, origem no canto INFERIOR esquerdo do símbolo (y para cima)."""
+    m, q = style.module_mm, style.quiet_left
+    top = style.height_mm
+    bar_h = style.bar_height_mm
+    guard_h = bar_h + style.font_mm * 0.6
+    rects = " ".join(
+        f"{_pt((q + start) * m)} {_pt(top - (guard_h if guard else bar_h))} {_pt(width * m)} "
+        f"{_pt(guard_h if guard else bar_h)} re"
+        for start, width, guard in _bars(ean13_modules(s))
+    )
+    baseline = top - bar_h - style.font_mm
+    digit_w = style.font_mm * 0.556  # largura dos dígitos na Helvetica
+    text = " ".join(
+        f"BT /F1 {_pt(style.font_mm)} Tf {_pt(x - digit_w / 2)} {_pt(baseline)} Td ({ch}) Tj ET"
+        for x, ch in _human_digits(s, style)
+    )
+    return f"{rects} f {text}".encode("ascii")
+
+
+def pdf_symbol_fragment(code: str, style: Optional[SymbolStyle] = None) -> bytes:
+    return _cached("pdf", _checked_ean13(code), style or SymbolStyle(), _build_pdf_fragment)
+
+
+def _pdf_page_stream(
+    labels: Iterable[Tuple[int, Label]], layout: SheetLayout, style: SymbolStyle
+) -> bytes:
+    out: List[bytes] = [b"0 g"]
+    page_h = layout.page_h_mm
+    for i, label in labels:
+        _page, x, y = layout.slot(i)
+        for n, line in enumerate(label.lines):
+            line = _fit(line, layout.label_w_mm - 2, layout.caption_mm)
+            lx = x + (layout.label_w_mm - _text_width_mm(line, layout.caption_mm)) / 2
+            ly = page_h - (y + 1.5 + (n + 1) * layout.caption_mm * 1.2)
+            out.append(
+                b"BT /F1 " + _pt(layout.caption_mm).encode() + b" Tf "
+                + f"{_pt(lx)} {_pt(ly)}".encode() + b" Td (" + _pdf_text(line) + b") Tj ET"
+            )
+        sx, sy = _label_origin(layout, style, x, y, len(label.lines))
+        bottom = page_h - sy - style.height_mm
+        out.append(f"q 1 0 0 1 {_pt(sx)} {_pt(bottom)} cm ".encode() + pdf_symbol_fragment(label.code, style) + b" Q")
+    return b"\n".join(out)
+
+
+def render_sheet_pdf(
+    labels: Sequence[Label],
+    layout: Optional[SheetLayout] = None,
+    style: Optional[SymbolStyle] = None,
+) -> bytes:
+    """PDF 1.4 multipágina; conteúdo comprimido (FlateDecode), fonte Helvetica padrão."""
+    layout, style = layout or SheetLayout(), style or SymbolStyle()
+    per_page = layout.per_page
+    indexed = list(enumerate(labels))
+    pages = [indexed[i:i + per_page] for i in range(0, len(indexed), per_page)] or [[]]
+
+    # 1 catálogo, 2 árvore de páginas, 3 fonte; depois (página, conteúdo) por página
+    objects: Dict[int, bytes] = {
+        1: b"<< /Type /Catalog /Pages 2 0 R >>",
+        3: b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+    }
+    media = f"[0 0 {_pt(layout.page_w_mm)} {_pt(layout.page_h_mm)}]".encode()
+    kids: List[bytes] = []
+    for n, page_labels in enumerate(pages):
+        page_id, content_id = 4 + 2 * n, 5 + 2 * n
+        stream = zlib.compress(_pdf_page_stream(page_labels, layout, style))
+        objects[content_id] = (
+            f"<< /Length {len(stream)} /Filter /FlateDecode >>\nstream\n".encode() + stream + b"\nendstream"
+        )
+        objects[page_id] = (
+            b"<< /Type /Page /Parent 2 0 R /MediaBox " + media
+            + b" /Resources << /Font << /F1 3 0 R >> >> /Contents " + f"{content_id} 0 R >>".encode()
+        )
+        kids.append(f"{page_id} 0 R".encode())
+    objects[2] = b"<< /Type /Pages /Kids [" + b" ".join(kids) + f"] /Count {len(kids)} >>".encode()
+
+    buf = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+    offsets: Dict[int, int] = {}
+    for obj_id in sorted(objects):
+        offsets[obj_id] = len(buf)
+        buf += f"{obj_id} 0 obj\n".encode() + objects[obj_id] + b"\nendobj\n"
+    xref_at = len(buf)
+    size = max(objects) + 1
+    buf += f"xref\n0 {size}\n0000000000 65535 f \n".encode()
+    for obj_id in range(1, size):
+        buf += f"{offsets[obj_id]:010d} 00000 n \n".encode()
+    buf += f"trailer\n<< /Size {size} /Root 1 0 R >>\nstartxref\n{xref_at}\n%%EOF\n".encode()
+    return bytes(buf)
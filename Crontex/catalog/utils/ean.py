@@ -17,6 +17,8 @@ APIs expostas:
 import re
 from typing import Callable, Dict, Iterable, List
 
+from catalog.utils import gtin
+
 
 _DIGIT_RE = re.compile(r"\D+")
 
@@ -47,20 +49,9 @@ def ean12_compose(refer4: str | int, base4: str | int, tam2: str | int, cor2: st
 def ean13_check_digit(ean12: str | int) -> int:
     """
     Calcula o dígito verificador do EAN-13 dado os 12 dígitos base.
-    Regra GS1: soma ímpares + 3*soma pares (posições 1..12), dv = (10 - (total % 10)) % 10.
+    Regra GS1 (ver catalog.utils.gtin): pesos 1,3,1,3... da esquerda p/ direita.
     """
-    s = normalize_n_digits(ean12, 12)
-    # posições humanas 1..12
-    odd = 0
-    even = 0
-    for i, ch in enumerate(s, start=1):
-        d = ord(ch) - 48  # int rápido
-        if i % 2 == 0:
-            even += d
-        else:
-            odd += d
-    total = odd + 3 * even
-    return (10 - (total % 10)) % 10
+    return gtin.check_digit(normalize_n_digits(ean12, 12))
 
 
 def ean13_compose(refer4: str | int, base4: str | int, tam2: str | int, cor2: str | int) -> str:
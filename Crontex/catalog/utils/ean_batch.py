@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+"""
+Geração de EAN-13 em lote (vetorizada).
+
+Mesmo padrão de catalog/utils/ean.py:
+[refer(4d)][base(4d)][tam(2d)][cor(2d)] + dígito verificador
+
+Em vez de montar um código por vez (normalize_n_digits com regex por grupo +
+loop por dígito), recebe vetores de ref/base/tam/cor e calcula todos os corpos
+de 12 dígitos e DVs de uma vez:
+
+- com NumPy (se instalado): aritmética inteira sobre arrays int64;
+- sem NumPy: tabelas pré-calculadas com a soma ponderada GS1 de cada bloco
+  (10.000 entradas p/ 4 dígitos, 100 p/ 2 dígitos) -> 4 lookups + 1 módulo por código.
+
+Os pesos GS1 das posições 1..12 são 1,3,1,3,... — como os blocos têm tamanho par,
+refer e base usam a mesma tabela de 4 dígitos e tam/cor a mesma de 2 dígitos.
+
+APIs expostas:
+- ean13_batch(refs, bases, sizes, colors) -> list[str]
+- check_digits_batch(bodies12) -> list[int]
+- BACKEND: "numpy" ou "python"
+
+Meta de throughput (1 núcleo, CPython 3.11, entradas inteiras): >= 200 mil
+códigos/s no fallback puro Python e >= 400 mil/s com NumPy (formatar as strings
+de saída passa a dominar), ou seja, um lote de EAN_BATCH_MAX em < 0,5 s —
+2–4x o laço com ean13_compose. Entradas texto pagam a limpeza de dígitos por
+item. O endpoint /catalog/api/ean/batch aceita até EAN_BATCH_MAX códigos por chamada.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Any, Iterable, List, Sequence, Tuple, Union
+
+try:  # dependência opcional
+    import numpy as np
+except ImportError:  # pragma: no cover - depende do ambiente
+    np = None
+
+BACKEND = "numpy" if np is not None else "python"
+
+# limite por chamada da API
+EAN_BATCH_MAX = 100_000
+
+# abaixo disso o overhead de montar arrays não compensa
+_NUMPY_MIN = 256
+
+_NON_DIGIT = re.compile(r"\D+")
+
+Code = Union[str, int, None]
+Codes = Union[Code, Sequence[Code]]
+
+
+def _weighted(n: int, width: int) -> int:
+    """Soma ponderada GS1 (pesos 1,3,1,3,... da esquerda) de n com `width` dígitos."""
+    s = str(n).zfill(width)
+    return sum((3 if i % 2 else 1) * (ord(ch) - 48) for i, ch in enumerate(s))
+
+
+_W4: Tuple[int, ...] = tuple(_weighted(n, 4) for n in range(10_000))
+_W2: Tuple[int, ...] = tuple(_weighted(n, 2) for n in range(100))
+
+
+def _as_int(value: Code, width: int) -> int:
+    """Mesmo saneamento de normalize_n_digits, mas devolvendo int (rápido p/ int)."""
+    if isinstance(value, int) and not isinstance(value, bool):
+        n = value
+    else:
+        s = _NON_DIGIT.sub("", "" if value is None else str(value))
+        if len(s) > width:
+            raise ValueError(f"valor com mais de {width} dígitos: {s!r}")
+        n = int(s) if s else 0
+    if n < 0 or n >= 10 ** width:
+        raise ValueError(f"valor com mais de {width} dígitos: {value!r}")
+    return n
+
+
+def _column(values: Codes, width: int, size: int) -> List[int]:
+    if isinstance(values, (str, int)) or values is None:
+        return [_as_int(values, width)] * size
+    out = list(values)
+    if all(type(v) is int for v in out):
+        # caminho rápido: vetor já inteiro, só confere a faixa
+        if out and (min(out) < 0 or max(out) >= 10 ** width):
+            raise ValueError(f"valor com mais de {width} dígitos no lote")
+    else:
+        out = [_as_int(v, width) for v in out]
+    if len(out) != size:
+        raise ValueError(f"vetores de tamanhos diferentes: {len(out)} != {size}")
+    return out
+
+
+def _batch_size(*columns: Codes) -> int:
+    sizes = {
+        len(c) for c in columns
+        if not (isinstance(c, (str, int)) or c is None)
+    }
+    if len(sizes) > 1:
+        raise ValueError(f"vetores de tamanhos diferentes: {sorted(sizes)}")
+    return sizes.pop() if sizes else 1
+
+
+def _compose_python(r: List[int], b: List[int], t: List[int], c: List[int]) -> List[str]:
+    w4, w2 = _W4, _W2
+    out: List[str] = []
+    append = out.append
+    for ri, bi, ti, ci in zip(r, b, t, c):
+        dv = (10 - (w4[ri] + w4[bi] + w2[ti] + w2[ci]) % 10) % 10
+        append(f"{ri:04d}{bi:04d}{ti:02d}{ci:02d}{dv}")
+    return out
+
+
+def _compose_numpy(r: List[int], b: List[int], t: List[int], c: List[int]) -> List[str]:
+    ra, ba = np.asarray(r, dtype=np.int64), np.asarray(b, dtype=np.int64)
+    ta, ca = np.asarray(t, dtype=np.int64), np.asarray(c, dtype=np.int64)
+    body = ((ra * 10_000 + ba) * 100 + ta) * 100 + ca
+    codes = body * 10 + _check_digits_numpy(body)
+    return [f"{v:013d}" for v in codes.tolist()]
+
+
+def _check_digits_numpy(body: Any) -> Any:
+    # dígitos da direita p/ esquerda: posição 12 (peso 3), 11 (peso 1), ...
+    total = np.zeros_like(body)
+    rest = body.copy()
+    for k in range(12):
+        total += (rest % 10) * (3 if k % 2 == 0 else 1)
+        rest //= 10
+    return (10 - total % 10) % 10
+
+
+def ean13_batch(refs: Codes, bases: Codes, sizes: Codes, colors: Codes) -> List[str]:
+    """
+    EAN-13 para cada posição i de (refs[i], bases[i], sizes[i], colors[i]).
+
+    Cada argumento pode ser um vetor ou um valor único (repetido para todo o lote).
+    Valores são saneados como em normalize_n_digits (só dígitos, zero à esquerda);
+    ValueError se algum exceder a largura do bloco ou os vetores diferirem de tamanho.
+    Resultado idêntico a [ean13_compose(r, b, t, c) ...].
+    """
+    n = _batch_size(refs, bases, sizes, colors)
+    r = _column(refs, 4, n)
+    b = _column(bases, 4, n)
+    t = _column(sizes, 2, n)
+    c = _column(colors, 2, n)
+    if np is not None and n >= _NUMPY_MIN:
+        return _compose_numpy(r, b, t, c)
+    return _compose_python(r, b, t, c)
+
+
+def check_digits_batch(bodies12: Iterable[Code]) -> List[int]:
+    """DV EAN-13 de cada corpo de 12 dígitos (mesma regra de ean13_check_digit)."""
+    split = [_as_int(v, 12) for v in bodies12]
+    if np is not None and len(split) >= _NUMPY_MIN:
+        return _check_digits_numpy(np.asarray(split, dtype=np.int64)).tolist()
+    w4, w2 = _W4, _W2
+    out: List[int] = []
+    for v in split:
+        head, tail = divmod(v, 10_000)
+        total = w4[head // 10_000] + w4[head % 10_000] + w2[tail // 100] + w2[tail % 100]
+        out.append((10 - total % 10) % 10)
+    return out
@@ -2,6 +2,8 @@
 import re
 from django.core.exceptions import ValidationError
 
+from catalog.utils import gtin
+
 def validate_ncm(value: str):
     """
     NCM deve ter exatamente 8 dígitos numéricos.
@@ -16,20 +18,7 @@ def _gtin_checksum_ok(gtin_digits: str) -> bool:
     """
     Valida GTIN-8/12/13/14 pelo dígito verificador (módulo 10).
     """
-    digits = [int(c) for c in gtin_digits if c.isdigit()]
-    n = len(digits)
-    if n not in (8, 12, 13, 14):
-        return False
-    base = digits[:-1]
-    check = digits[-1]
-    # Peso 3 e 1 alternados da direita para a esquerda
-    s = 0
-    weight = 3
-    for d in reversed(base):
-        s += d * weight
-        weight = 1 if weight == 3 else 3
-    dv = (10 - (s % 10)) % 10
-    return dv == check
+    return gtin.is_valid("".join(c for c in gtin_digits if c.isdigit()))
 
 def validate_gtin(value: str):
     """
@@ -10,6 +10,8 @@ from decimal import Decimal
 from django.core.exceptions import ValidationError
 from django.utils.translation import gettext_lazy as _
 
+from catalog.utils import gtin
+
 # ====== legacy validators (mantidos aqui para evitar .base) ======
 
 _GTIN_RE = re.compile(r"^\d{8}$|^\d{12}$|^\d{13}$|^\d{14}$")
@@ -17,17 +19,10 @@ _ONLY_DIGITS = re.compile(r"\D+")
 
 def _check_digit_mod10(body: str) -> int:
     """
-    Calcula DV para GTIN/EAN (mod-10 Luhn-like GS1).
+    Calcula DV para GTIN/EAN (mod-10 GS1) — delega a catalog.utils.gtin.
     body: string numérica SEM o dígito final.
     """
-    s = _ONLY_DIGITS.sub("", body)
-    total = 0
-    # pesos 3 e 1 alternados da direita para a esquerda (padrão GS1)
-    for i, ch in enumerate(reversed(s), start=1):
-        d = ord(ch) - 48
-        weight = 3 if (i % 2 == 1) else 1
-        total += d * weight
-    return (10 - (total % 10)) % 10
+    return gtin.check_digit(_ONLY_DIGITS.sub("", body) or "0")
 
 def validate_gtin(value):
     """
@@ -36,9 +31,7 @@ def validate_gtin(value):
     s = _ONLY_DIGITS.sub("", str(value) if value is not None else "")
     if not _GTIN_RE.match(s):
         raise ValidationError(_("GTIN deve ter 8, 12, 13 ou 14 dígitos."))
-    body, dv = s[:-1], int(s[-1])
-    exp = _check_digit_mod10(body)
-    if dv != exp:
+    if not gtin.is_valid(s):
         raise ValidationError(_("Dígito verificador inválido para GTIN."))
 
 def validate_ncm(value):
@@ -7,6 +7,8 @@ from typing import Callable, Iterable, List
 from django.core.exceptions import ValidationError
 from django.utils.translation import gettext_lazy as _
 
+from catalog.utils import gtin
+
 _DIGIT_RE = re.compile(r"\D+")
 
 
@@ -19,17 +21,7 @@ def normalize_n_digits(value: str | int | None, n: int) -> str:
 
 
 def ean13_check_digit(ean12: str | int) -> int:
-    s = normalize_n_digits(ean12, 12)
-    odd = 0
-    even = 0
-    for i, ch in enumerate(s, start=1):
-        d = ord(ch) - 48
-        if i % 2 == 0:
-            even += d
-        else:
-            odd += d
-    total = odd + 3 * even
-    return (10 - (total % 10)) % 10
+    return gtin.check_digit(normalize_n_digits(ean12, 12))
 
 
 def validate_ean13(value: str | int) -> None:
@@ -78,3 +70,29 @@ def validate_unique_eans(
             # Não derruba a validação por erro de IO
             pass
     return dupes
+
+
+# Mensagens de campo usadas pelo pre_save de ProductVariant e pelo checador em lote
+# (catalog/services/ean_unique.py) — manter iguais nos dois caminhos.
+MSG_EAN_DIGITS = "EAN-13 deve ter 13 dígitos numéricos."
+MSG_EAN_TAKEN = "EAN-13 já cadastrado em outra variante."
+MSG_EAN_REPEATED = "EAN-13 repetido no lote."
+
+
+def variant_integrity_error(exc: Exception) -> ValidationError | None:
+    """
+    Traduz o IntegrityError dos índices únicos de ProductVariant no mesmo
+    ValidationError por campo do pre_save. None se não for um deles.
+    SQLite: "UNIQUE constraint failed: catalog_productvariant.ean13";
+    Postgres: 'duplicate key ... "catalog_productvariant_ean13_key"'.
+    """
+    text = str(exc).lower()
+    if "productvariant" not in text and "uniq_variant" not in text:
+        return None
+    if "ean13" in text:
+        return ValidationError({"ean13": MSG_EAN_TAKEN})
+    if "uniq_variant_by_names_per_product" in text or "size_name" in text:
+        return ValidationError("Já existe variante com este tamanho/cor para o produto.")
+    if "sku" in text:
+        return ValidationError({"sku": "SKU de variante já cadastrado."})
+    return None
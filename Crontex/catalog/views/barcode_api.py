@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+
+import json
+from typing import Any, List
+
+from django.contrib.auth.decorators import login_required, permission_required
+from django.http import HttpRequest, HttpResponseBadRequest, JsonResponse
+from django.views.decorators.http import require_GET, require_http_methods
+
+from catalog.services.barcode_index import get_index
+
+# máx. de códigos por chamada em lote (multi-scan)
+BARCODE_BATCH_MAX = 500
+
+
+@login_required
+@permission_required("catalog.view_product", raise_exception=True)
+@require_GET
+def barcode_lookup(request: HttpRequest, code: str):
+    """
+    GET /catalog/api/barcode/<code>
+    -> {"code", "found": true, "product_id", "variant_id", "sku", "name", "price", "stock", ...}
+       404 com {"found": false} se o código não estiver cadastrado.
+    Aceita GTIN-8/12/13/14 (com ou sem máscara); resolvido no índice em memória.
+    """
+    item = get_index().lookup(code)
+    return JsonResponse(item, status=200 if item["found"] else 404)
+
+
+@login_required
+@permission_required("catalog.view_product", raise_exception=True)
+@require_http_methods(["GET", "POST"])
+def barcode_lookup_batch(request: HttpRequest):
+    """
+    Multi-scan:
+      GET  /catalog/api/barcode/?codes=789...,789...
+      POST /catalog/api/barcode/  {"codes": ["789...", "789..."]}
+           (sessão: envie o cookie csrftoken no header X-CSRFToken)
+    -> {"items": [ {...mesmo formato do lookup unitário...}, ... ]} (na ordem enviada)
+    """
+    codes: List[Any]
+    if request.method == "POST":
+        try:
+            data = json.loads(request.body.decode(request.encoding or "utf-8") or "{}")
+        except Exception:
+            return HttpResponseBadRequest("JSON inválido")
+        codes = data.get("codes") if isinstance(data, dict) else None
+        if not isinstance(codes, list):
+            return HttpResponseBadRequest("codes deve ser lista")
+    else:
+        codes = [c for c in (request.GET.get("codes") or "").split(",") if c.strip()]
+    if len(codes) > BARCODE_BATCH_MAX:
+        return HttpResponseBadRequest(f"máximo de {BARCODE_BATCH_MAX} códigos por chamada")
+    return JsonResponse({"items": get_index().lookup_many(codes)})
@@ -4,6 +4,7 @@ from __future__ import annotations
 import json
 from typing import Any, Dict, List
 
+from django.contrib.auth.decorators import login_required, permission_required
 from django.http import JsonResponse, HttpRequest, HttpResponseBadRequest
 from django.views.decorators.http import require_POST
 from django.views.decorators.csrf import csrf_exempt  # troque para ensure_csrf_cookie se preferir
@@ -11,9 +12,9 @@ from django.utils.encoding import force_str
 
 from catalog.utils.ean import (
     parse_code_map,
-    ean13_compose,
     normalize_n_digits,
 )
+from catalog.utils.ean_batch import BACKEND, EAN_BATCH_MAX, ean13_batch
 
 
 def _json_body(request: HttpRequest) -> Dict[str, Any]:
@@ -57,6 +58,9 @@ def generate_ean_bulk(request: HttpRequest):
         return HttpResponseBadRequest("sizes/colors devem ser lista")
 
     items: List[Dict[str, Any]] = []
+    pending: List[Dict[str, Any]] = []  # itens válidos; EANs calculados juntos no final
+    tams: List[str] = []
+    cors: List[str] = []
     for tam_name in sizes:
         tn = force_str(tam_name).strip()
         tt = size_map.get(tn.lower())
@@ -66,15 +70,65 @@ def generate_ean_bulk(request: HttpRequest):
         for cor_name in colors:
             cn = force_str(cor_name).strip()
             cc = color_map.get(cn.lower())
-            if not cc:
-                items.append({"tamName": tn, "corName": cn, "ean13": None, "dv": None})
-                continue
-            e13 = ean13_compose(ref, base, tt, cc)
-            items.append({
-                "tamName": tn,
-                "corName": cn,
-                "ean13": e13,
-                "dv": int(e13[-1]),
-            })
+            item: Dict[str, Any] = {"tamName": tn, "corName": cn, "ean13": None, "dv": None}
+            items.append(item)
+            if cc:
+                pending.append(item)
+                tams.append(tt)
+                cors.append(cc)
+
+    for item, e13 in zip(pending, ean13_batch(ref, base, tams, cors)):
+        item["ean13"] = e13
+        item["dv"] = int(e13[-1])
 
     return JsonResponse({"items": items})
+
+
+@login_required
+@permission_required("catalog.add_product", raise_exception=True)
+@require_POST
+def generate_ean_batch(request: HttpRequest):
+    """
+    POST /catalog/api/ean/batch
+    Content-Type: application/json
+    X-CSRFToken: <cookie csrftoken>
+
+    Geração em massa (até EAN_BATCH_MAX códigos por chamada, ver catalog/utils/ean_batch.py).
+    Cada campo aceita um valor único ou uma lista (listas com o mesmo tamanho):
+    {
+      "refs":   ["1234", "1235"] | "1234",
+      "bases":  ["0456", "0457"] | "0456",
+      "sizes":  ["01", "02"],
+      "colors": ["01", "01"]
+    }
+    Com "cartesian": true, gera todas as combinações sizes x colors
+    (refs/bases devem ser valores únicos).
+    -> { "count": N, "backend": "numpy"|"python", "eans": ["1234045601011", ...] }
+    """
+    data = _json_body(request)
+    refs, bases = data.get("refs"), data.get("bases")
+    sizes, colors = data.get("sizes"), data.get("colors")
+    if any(v is None for v in (refs, bases, sizes, colors)):
+        return HttpResponseBadRequest("refs, bases, sizes e colors são obrigatórios")
+    if any(isinstance(v, (dict, bool, float)) for v in (refs, bases, sizes, colors)):
+        return HttpResponseBadRequest("refs/bases/sizes/colors devem ser texto, número ou lista")
+
+    if data.get("cartesian"):
+        if isinstance(refs, list) or isinstance(bases, list):
+            return HttpResponseBadRequest("cartesian exige refs/bases únicos")
+        sizes = sizes if isinstance(sizes, list) else [sizes]
+        colors = colors if isinstance(colors, list) else [colors]
+        total = len(sizes) * len(colors)
+        if total > EAN_BATCH_MAX:
+            return HttpResponseBadRequest(f"máximo de {EAN_BATCH_MAX} códigos por chamada")
+        sizes, colors = [t for t in sizes for _ in colors], list(colors) * len(sizes)
+    else:
+        total = max((len(v) for v in (refs, bases, sizes, colors) if isinstance(v, list)), default=1)
+        if total > EAN_BATCH_MAX:
+            return HttpResponseBadRequest(f"máximo de {EAN_BATCH_MAX} códigos por chamada")
+
+    try:
+        eans = ean13_batch(refs, bases, sizes, colors)
+    except ValueError as exc:
+        return HttpResponseBadRequest(str(exc))
+    return JsonResponse({"count": len(eans), "backend": BACKEND, "eans": eans})
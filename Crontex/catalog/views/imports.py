@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required, permission_required
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.core.paginator import Paginator
+from django.http import HttpRequest, HttpResponse, JsonResponse
+from django.shortcuts import get_object_or_404, redirect
+from django.views.decorators.http import require_GET, require_POST
+from django.views.generic import DetailView
+
+from catalog.models import ImportChange, ImportJob
+from catalog.services.import_jobs import enqueue_apply
+
+CHANGES_PER_PAGE = 50
+
+
+def _visible_jobs(request: HttpRequest):
+    """Staff vê todos os jobs; demais usuários só os próprios."""
+    qs = ImportJob.objects.all()
+    u = request.user
+    if not (u.is_staff or u.is_superuser):
+        qs = qs.filter(created_by=u)
+    return qs
+
+
+class ImportJobDetailView(LoginRequiredMixin, DetailView):
+    model = ImportJob
+    template_name = "catalog/import_job_detail.html"
+    context_object_name = "job"
+
+    def get_queryset(self):
+        return _visible_jobs(self.request)
+
+    def get_context_data(self, **kwargs):
+        ctx = super().get_context_data(**kwargs)
+        job: ImportJob = self.object
+        if job.mode != ImportJob.Mode.PREVIEW:
+            return ctx
+
+        # changeset paginado (?action=new|changed|missing&page=N)
+        action = self.request.GET.get("action") or ""
+        qs = ImportChange.objects.filter(job=job).order_by("pk")
+        if action in ImportChange.Action.values:
+            qs = qs.filter(action=action)
+        page = Paginator(qs, CHANGES_PER_PAGE).get_page(self.request.GET.get("page"))
+        ctx.update({
+            "changes_page": page,
+            "action": action,
+            "action_choices": ImportChange.Action.choices,
+            "can_apply": job.status == ImportJob.Status.DONE and not job.applies.exists(),
+        })
+        return ctx
+
+
+@login_required
+@require_GET
+def import_job_status(request: HttpRequest, pk: int) -> JsonResponse:
+    """
+    GET /importacoes/<pk>/status
+    -> {"status": "running", "rows_processed": 12000, "rows_per_sec": 3500.0, ...}
+    """
+    job = get_object_or_404(_visible_jobs(request), pk=pk)
+    return JsonResponse({
+        "id": job.pk,
+        "kind": job.kind,
+        "mode": job.mode,
+        "status": job.status,
+        "rows_processed": job.rows_processed,
+        "rows_created": job.rows_created,
+        "rows_updated": job.rows_updated,
+        "rows_unchanged": job.rows_unchanged,
+        "rows_missing": job.rows_missing,
+        "error_count": job.error_count,
+        "rows_per_sec": job.rows_per_sec,
+        "checkpoint": job.checkpoint,
+        "message": job.message,
+        "finished": job.is_finished,
+    })
+
+
+@login_required
+@permission_required("catalog.add_product", raise_exception=True)
+@require_POST
+def import_job_apply(request: HttpRequest, pk: int) -> HttpResponse:
+    """
+    POST /importacoes/<pk>/aplicar
+    Enfileira a aplicação do changeset exatamente como pré-visualizado.
+    """
+    preview = get_object_or_404(_visible_jobs(request), pk=pk)
+    try:
+        job = enqueue_apply(preview, request.user)
+    except ValueError as exc:
+        messages.error(request, str(exc))
+        return redirect("catalog:import_job_detail", pk=preview.pk)
+    messages.info(request, f"Aplicação da pré-visualização #{preview.pk} enfileirada (#{job.pk}).")
+    return redirect("catalog:import_job_detail", pk=job.pk)
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+
+from django.contrib.auth.decorators import login_required, permission_required
+from django.http import HttpRequest, HttpResponse, HttpResponseBadRequest, HttpResponseNotModified
+from django.shortcuts import get_object_or_404
+from django.views.decorators.http import require_GET
+
+from catalog.models import Product
+from catalog.services.labels import product_labels
+from catalog.utils.barcode_render import render_sheet_pdf, render_sheet_svg, sheet_digest
+
+LABEL_COPIES_MAX = 100
+_FORMATS = {
+    "pdf": ("application/pdf", render_sheet_pdf),
+    "svg": ("image/svg+xml", render_sheet_svg),
+}
+
+
+@login_required
+@permission_required("catalog.view_product", raise_exception=True)
+@require_GET
+def produto_labels(request: HttpRequest, pk: int) -> HttpResponse:
+    """
+    GET /produtos/<pk>/etiquetas?format=pdf|svg&copies=1
+
+    Folha com uma etiqueta EAN-13 por variante da grade (x copies), A4 3x7.
+    Símbolos vêm do cache de renderização; a folha responde com ETag de
+    conteúdo, então reimpressões idênticas voltam 304.
+    """
+    fmt = (request.GET.get("format") or "pdf").lower()
+    if fmt not in _FORMATS:
+        return HttpResponseBadRequest("format deve ser pdf ou svg")
+    try:
+        copies = min(max(int(request.GET.get("copies") or 1), 1), LABEL_COPIES_MAX)
+    except ValueError:
+        return HttpResponseBadRequest("copies inválido")
+
+    product = get_object_or_404(Product.objects.only("id", "sku", "bling_extra", "ean_block"), pk=pk)
+    try:
+        labels = product_labels(product, copies=copies)
+    except ValueError as exc:
+        return HttpResponseBadRequest(str(exc))
+    if not labels:
+        return HttpResponseBadRequest("Produto sem grade/variantes com EAN-13.")
+
+    content_type, render = _FORMATS[fmt]
+    etag = f'"{sheet_digest(labels, None, None, fmt)}"'
+    if request.headers.get("If-None-Match") == etag:
+        return HttpResponseNotModified(headers={"ETag": etag})
+
+    response = HttpResponse(render(labels), content_type=content_type)
+    response["ETag"] = etag
+    response["Content-Disposition"] = f'inline; filename="etiquetas-{product.sku or product.pk}.{fmt}"'
+    return response
@@ -4,25 +4,37 @@ from __future__ import annotations
 import json
 from typing import Any, Dict, List, Optional, Tuple, cast
 
+from django.contrib.auth.decorators import login_required, permission_required
 from django.contrib.auth.mixins import LoginRequiredMixin, PermissionRequiredMixin
 from django.contrib import messages
 from django.core.exceptions import ValidationError
 from django.db import transaction
-from django.db.models import Q
-from django.http import HttpRequest, HttpResponse, JsonResponse
-from django.shortcuts import redirect
+from django.http import HttpRequest, HttpResponse, HttpResponseRedirect, JsonResponse
+from django.shortcuts import get_object_or_404, redirect
 from django.urls import reverse_lazy
 from django.utils.translation import gettext_lazy as _
 from django.views.decorators.http import require_GET
 from django.views.generic import DetailView, ListView
 from django.views.generic.edit import CreateView, UpdateView, DeleteView, FormMixin
 
-from catalog.models import Product
-from catalog.forms import ProductForm
+from catalog.models import ImportJob, Product
+from crontex.pagination import KeysetPaginationMixin
+from catalog.forms import ProductForm, ProdutoImportForm
 from django.forms import BaseModelForm
 
 # NOVO: merge idempotente dos vínculos de pessoas em bling_extra["people"]
 from catalog.services.people_links import merge_people_links
+from catalog.services.import_jobs import enqueue_import
+from catalog.services.product_search import search_products
+from catalog.services.ean_blocks import auto_blocks_enabled, default_allocator
+from catalog.services.variant_sync import sync_variants
+from catalog.services.grade_combos import (
+    combo_count,
+    grade_params,
+    grade_value_lists,
+    iter_combos,
+    max_combos,
+)
 
 
 # -----------------------------
@@ -147,130 +159,148 @@ def _merge_extras(base: Dict[str, Any], inc: Dict[str, Any]) -> Dict[str, Any]:
     return out
 
 
-def _normalize_grade_values(values: List[Any]) -> List[str]:
-    """
-    Normaliza cada item da lista de 'valores' de um parâmetro da grade.
-    Aceita itens dicts (label/code) ou strings já normalizadas.
-    Retorna lista de sufixos legíveis, priorizando 'code' > 'label' > str(item).
-    """
-    out: List[str] = []
-    for v in values:
-        if isinstance(v, dict):
-            code = str(v.get("code") or "").strip()
-            label = str(v.get("label") or "").strip()
-            out.append(code or label or str(v))
-        else:
-            out.append(str(v))
-    return [s for s in out if s]
+def _grade_sku(product_sku: str, combo: Tuple[str, ...]) -> Dict[str, Any]:
+    suffix = "-".join(combo)
+    return {"sku": f"{product_sku}-{suffix}" if product_sku else suffix, "attrs": list(combo)}
 
 
 def _generate_grade_skus(product: Product, form: ProductForm) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
     """
     Gera grade_skus/grade_skus_meta a partir de bling_extra.grade (string JSON).
     Reaproveita payload já salvo pelo form (ProductForm.save()).
+
+    A expansão é preguiçosa (grade_combos.iter_combos); meta["count"] é o total
+    calculado sem expandir e só as primeiras max_combos() combinações são gravadas
+    (meta["truncated"]). O restante é servido por índice em produto_grade_combos.
     """
     extras = _loads_json_safe(product.bling_extra)
-    grade_raw = extras.get("grade") or "{}"
-    try:
-        grade = json.loads(grade_raw) if isinstance(grade_raw, str) else (grade_raw or {})
-    except Exception:
-        grade = {}
-
-    params = (grade.get("parametros") or []) if isinstance(grade, dict) else []
-    if not isinstance(params, list) or not params:
+    grade = extras.get("grade") or "{}"
+    params = grade_params(grade)
+    if not params:
         return [], {"params": [], "count": 0}
 
-    # Normaliza lista de listas (uma por parâmetro com valores)
-    values_lists: List[List[str]] = []
-    for prm in params:
-        vals = prm.get("valores") or []
-        if isinstance(vals, list) and vals:
-            values_lists.append(_normalize_grade_values(vals))
-
-    if not values_lists:
+    value_lists = grade_value_lists(grade)
+    total = combo_count(value_lists)
+    if not total:
         return [], {"params": params, "count": 0}
 
-    # Produto cartesiano simples
-    combos: List[List[str]] = [[]]
-    for lst in values_lists:
-        combos = [c + [v] for c in combos for v in lst]
+    cap = max_combos()
+    items = [_grade_sku(product.sku, c) for c in iter_combos(value_lists, 0, cap)]
+    meta = {"params": params, "count": total, "stored": len(items), "truncated": total > cap}
+    return items, meta
 
-    items: List[Dict[str, Any]] = []
-    for c in combos:
-        suffix = "-".join(c)
-        items.append({
-            "sku": f"{product.sku}-{suffix}" if product.sku else suffix,
-            "attrs": c,
-        })
 
-    meta = {"params": params, "count": len(items)}
-    return items, meta
+def _inject_executante(product: Product, request: HttpRequest) -> None:
+    """
+    Injeta dados do executante atual (request.user) dentro de bling_extra["pedido"].
+    Só em memória; quem grava é _save_product().
+    """
+    current = _loads_json_safe(getattr(product, "bling_extra", {}))
+    pedido = _loads_json_safe(current.get("pedido"))
+
+    u = getattr(request, "user", None)
+    if u is not None:
+        pedido["executante_id"] = getattr(u, "id", None)
+        pedido["executante_username"] = getattr(u, "username", "") or getattr(u, "email", "")
+        try:
+            pedido["executante_fullname"] = u.get_full_name() or ""
+        except Exception:
+            pedido["executante_fullname"] = ""
+
+    current["pedido"] = pedido
+    product.bling_extra = current
 
 
-def _merge_and_generate_skus(product: Product, form: ProductForm) -> None:
+def _build_product(form: ProductForm, request: HttpRequest) -> Product:
     """
-    Atualiza bling_extra com tabs do form, mescla vínculos de pessoas
-    e preenche grade_skus/grade_skus_meta.
+    Monta o produto inteiro em memória, sem gravar: campos e grade do form
+    (form.save(commit=False)), abas, vínculos de pessoas, executante,
+    grade_skus/grade_skus_meta e o bloco de EAN (se habilitado).
     """
-    current = _loads_json_safe(product.bling_extra)
-    inc = _collect_extras_from_form(form)
+    product: Product = form.save(commit=False)
 
     # Mescla abas (texto/valores simples)
-    merged = _merge_extras(current, inc)
+    product.bling_extra = _merge_extras(_loads_json_safe(product.bling_extra), _collect_extras_from_form(form))
 
-    # Mescla IDs de pessoas em merged["people"] de forma idempotente
-    product.bling_extra = merged  # passa estado atual para o service operar
+    # Mescla IDs de pessoas em bling_extra["people"] de forma idempotente
     merge_people_links(product, form.cleaned_data)
 
+    # Executante depois das abas: a aba "pedido" do form não o apaga
+    _inject_executante(product, request)
+
     # Gera grade_skus com base no que ficou em bling_extra["grade"]
     grade_items, meta = _generate_grade_skus(product, form)
-
-    # Grava de volta
     extra = _loads_json_safe(product.bling_extra)
     extra["grade_skus"] = grade_items
     extra["grade_skus_meta"] = meta
     product.bling_extra = extra
-    product.save(update_fields=["bling_extra"])
 
+    # Bloco ref/base de EAN reservado (em vez de derivar do SKU), se habilitado
+    if auto_blocks_enabled() and product.ean_block is None and grade_items:
+        product.ean_block = default_allocator.take_one()
+    return product
 
-def _inject_executante(product: Product, request: HttpRequest) -> None:
+
+def _save_product(form: ProductForm, request: HttpRequest) -> Product:
     """
-    Injeta dados do executante atual (request.user) dentro de bling_extra["pedido"].
+    Pipeline de gravação do form de produto: um único INSERT/UPDATE da linha
+    do produto (bling_extra serializado uma vez), depois M2M e variantes.
+    Rode dentro de transaction.atomic(); ValidationError de variantes sobe.
     """
-    current = _loads_json_safe(getattr(product, "bling_extra", {}))
-    pedido = _loads_json_safe(current.get("pedido"))
+    product = _build_product(form, request)
+    product.save()
+    form.save_m2m()
 
-    u = getattr(request, "user", None)
-    if u is not None:
-        pedido["executante_id"] = getattr(u, "id", None)
-        pedido["executante_username"] = getattr(u, "username", "") or getattr(u, "email", "")
-        try:
-            pedido["executante_fullname"] = u.get_full_name() or ""
-        except Exception:
-            pedido["executante_fullname"] = ""
+    # Variantes indexadas (tamanho/cor/EAN) para estoque e leitura de código de barras;
+    # só com bloco EAN reservado (sem bloco, sync_variants não faz nada)
+    sync_variants(product)
+    return product
 
-    current["pedido"] = pedido
-    product.bling_extra = current
-    product.save(update_fields=["bling_extra"])
+
+class _ProductSubmitMixin:
+    """form_valid comum de criar/editar produto (ver _save_product)."""
+
+    def form_valid(self, form: BaseModelForm) -> HttpResponse:
+        if auto_blocks_enabled():
+            # Reserva FORA da transação: o take_one() em _build_product sai do cache
+            # e o UPDATE do EanCounter não fica travado até o commit do produto
+            default_allocator.reserve_ahead(1)
+        return self._save_form(form)
+
+    @transaction.atomic
+    def _save_form(self, form: BaseModelForm) -> HttpResponse:
+        try:
+            self.object = _save_product(cast(ProductForm, form), self.request)
+        except ValidationError as exc:
+            # EAN/SKU de variante em conflito com outro produto: desfaz o salvamento
+            transaction.set_rollback(True)
+            form.add_error(None, exc.messages)
+            return self.form_invalid(form)
+        messages.success(self.request, _("Produto salvo com sucesso."))
+        return HttpResponseRedirect(self.get_success_url())
 
 
 # -----------------------------
 # Views
 # -----------------------------
 
-class ProdutoListView(LoginRequiredMixin, PermissionRequiredMixin, ListView):
+class ProdutoListView(LoginRequiredMixin, PermissionRequiredMixin, KeysetPaginationMixin, ListView):
     model = Product
     permission_required = "catalog.view_product"
     template_name = "catalog/produto_list.html"
     context_object_name = "produtos"
     paginate_by = 25
+    # cursor ?after= na listagem por id; busca (ordenada por relevância) segue em ?page=
+    keyset_ordering = ("-id",)
+    count_namespace = "catalog.product"
 
     def get_queryset(self):
-        qs = super().get_queryset().order_by("-id")
+        # só as colunas da tabela: bling_extra/notes/extra_info não são lidos nem decodificados
+        qs = Product.objects.list_rows().order_by("-id")
         q = (self.request.GET.get("q") or "").strip()
         if q:
-            # MAIS ROBUSTO: usa Q combinando name|sku e preserva ordenação
-            qs = qs.filter(Q(name__icontains=q) | Q(sku__icontains=q))
+            # índice FTS (prefixo em sku/nome/marca/categoria/fornecedor/GTIN), mais relevantes primeiro
+            qs = search_products(qs, q)
         return qs
 
 
@@ -300,39 +330,21 @@ class ProdutoDetailView(LoginRequiredMixin, PermissionRequiredMixin, DetailView)
         return ctx
 
 
-class ProdutoCreateView(LoginRequiredMixin, PermissionRequiredMixin, CreateView):
+class ProdutoCreateView(LoginRequiredMixin, PermissionRequiredMixin, _ProductSubmitMixin, CreateView):
     model = Product
     form_class = ProductForm
     permission_required = "catalog.add_product"
     success_url = reverse_lazy("catalog:produto_list")
     template_name = "catalog/produto_form.html"
 
-    @transaction.atomic
-    def form_valid(self, form: BaseModelForm) -> HttpResponse:
-        resp = super().form_valid(form)
-        obj: Product = cast(Product, form.instance)
-        _inject_executante(obj, self.request)
-        _merge_and_generate_skus(obj, cast(ProductForm, form))
-        messages.success(self.request, _("Produto salvo com sucesso."))
-        return resp
 
-
-class ProdutoUpdateView(LoginRequiredMixin, PermissionRequiredMixin, UpdateView):
+class ProdutoUpdateView(LoginRequiredMixin, PermissionRequiredMixin, _ProductSubmitMixin, UpdateView):
     model = Product
     form_class = ProductForm
     permission_required = "catalog.change_product"
     success_url = reverse_lazy("catalog:produto_list")
     template_name = "catalog/produto_form.html"
 
-    @transaction.atomic
-    def form_valid(self, form: BaseModelForm) -> HttpResponse:
-        resp = super().form_valid(form)
-        obj: Product = cast(Product, form.instance)
-        _inject_executante(obj, self.request)
-        _merge_and_generate_skus(obj, cast(ProductForm, form))
-        messages.success(self.request, _("Produto salvo com sucesso."))
-        return resp
-
 
 class ProdutoDeleteView(LoginRequiredMixin, PermissionRequiredMixin, DeleteView):
     model = Product
@@ -346,11 +358,53 @@ class ProdutoImportView(LoginRequiredMixin, PermissionRequiredMixin, FormMixin,
     permission_required = "catalog.add_product"
     template_name = "catalog/produto_import.html"
     success_url = reverse_lazy("catalog:produto_list")
-    form_class = ProductForm  # placeholder para manter layout
+    form_class = ProdutoImportForm
+
+    def get_queryset(self):
+        # a página de importação não lista produtos
+        return Product.objects.none()
 
     def post(self, request: HttpRequest, *args, **kwargs) -> HttpResponse:
-        messages.info(request, _("Importação não implementada no MVP."))
-        return redirect(self.success_url)
+        self.object_list = self.get_queryset()
+        form = self.get_form()
+        if not form.is_valid():
+            return self.form_invalid(form)
+
+        # roda fora do request (worker: manage.py run_import_jobs)
+        mode = ImportJob.Mode.PREVIEW if form.cleaned_data.get("dry_run") else ImportJob.Mode.IMPORT
+        job = enqueue_import(ImportJob.Kind.PRODUCTS, form.cleaned_data["file"], request.user, mode=mode)
+        messages.info(request, _("Importação #%(pk)d enfileirada.") % {"pk": job.pk})
+        return redirect("catalog:import_job_detail", pk=job.pk)
+
+
+GRADE_PAGE_MAX = 500
+
+
+@login_required
+@permission_required("catalog.view_product", raise_exception=True)
+@require_GET
+def produto_grade_combos(request: HttpRequest, pk: int) -> JsonResponse:
+    """
+    GET /produtos/<pk>/grade/combos?offset=0&limit=100
+
+    Fatia [offset, offset+limit) das combinações da grade, calculada sob demanda
+    (não depende de bling_extra["grade_skus"], que é limitado a max_combos()).
+    -> {"count": N, "offset": 0, "limit": 100, "items": [{"index", "sku", "attrs"}, ...]}
+    """
+    product = get_object_or_404(Product.objects.only("id", "sku", "bling_extra"), pk=pk)
+    try:
+        offset = max(int(request.GET.get("offset") or 0), 0)
+        limit = min(max(int(request.GET.get("limit") or 100), 1), GRADE_PAGE_MAX)
+    except ValueError:
+        return JsonResponse({"error": "offset/limit inválidos"}, status=400)
+
+    value_lists = grade_value_lists(_loads_json_safe(product.bling_extra).get("grade"))
+    total = combo_count(value_lists)
+    items = [
+        {"index": i, **_grade_sku(product.sku, combo)}
+        for i, combo in enumerate(iter_combos(value_lists, offset, offset + limit), start=offset)
+    ]
+    return JsonResponse({"count": total, "offset": offset, "limit": limit, "items": items})
 
 
 @require_GET
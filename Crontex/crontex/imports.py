@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+"""
+Peças comuns aos importadores em chunks (catalog: planilha Bling; people: CSV
+de contatos) e às rotinas em lote que percorrem tabelas grandes.
+
+- ImportResult   -> contadores + erros por linha (os primeiros MAX_ERRORS_KEPT);
+- ChunkCallback  -> chamado dentro da transação de cada chunk, para gravar o
+                    checkpoint do job (ver catalog/services/import_jobs.py);
+- chunked(items) -> listas de até `size` itens, sem materializar o iterável.
+
+Todo importador segue a mesma assinatura:
+
+    import_x(raw_rows, *, chunk_size=DEFAULT_CHUNK_SIZE, start_row=0,
+             result=None, on_chunk=None) -> ImportResult
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, Iterator, List
+
+DEFAULT_CHUNK_SIZE = 1000
+# Limite de erros guardados (o contador continua somando além disso)
+MAX_ERRORS_KEPT = 200
+
+
+@dataclass
+class ImportResult:
+    created: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    missing: int = 0
+    rows: int = 0
+    error_count: int = 0
+    errors: List[Dict[str, Any]] = field(default_factory=list)
+
+    def add_error(self, row: Any) -> None:
+        """Linha já validada com .line, .sku e .errors (ex. bling_rows.ParsedRow)."""
+        self.record_error(row.line, row.sku, row.errors)
+
+    def record_error(self, line: int, key: str, errors: List[str]) -> None:
+        self.error_count += 1
+        if len(self.errors) < MAX_ERRORS_KEPT:
+            self.errors.append({"line": line, "sku": key, "errors": list(errors)})
+
+
+# Callback chamado DENTRO da transação do chunk: (resultado acumulado, linhas commitadas)
+ChunkCallback = Callable[[ImportResult, int], None]
+
+
+def chunked(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    buf: List[Any] = []
+    for it in items:
+        buf.append(it)
+        if len(buf) >= size:
+            yield buf
+            buf = []
+    if buf:
+        yield buf
@@ -0,0 +1,316 @@
+# -*- coding: utf-8 -*-
+"""
+KPIs dos dashboards (crontex_ui e dashboard global) sem COUNT(*) a cada acesso.
+
+- Cada KPI é uma linha de accounts.KpiCounter, mantida por deltas (+1/-1) nos
+  sinais post_save/post_delete dos modelos registrados (register) e pelas
+  operações em lote (record_created / mark_stale).
+- Deltas exatos só onde a linha inteira é conhecida: insert (+1) e delete (-1),
+  para contadores simples (filtro por igualdade, ex. is_active=True) e por
+  grupo (ex. contas por plano).
+- Update que grava algum campo lido por um contador marca esse contador stale
+  (recontado na próxima leitura). O valor anterior em memória não serve de
+  base: duas requisições que carregaram a mesma linha aplicariam o mesmo -1
+  duas vezes e o contador ficaria errado para sempre. Totais sem filtro não
+  mudam em update.
+- Também stale quando o delta não é conhecido (campo adiado, contagem de
+  distintos, bulk update).
+- Na frente da tabela: cache curto (KPI_CACHE_SECONDS), com versão trocada a
+  cada escrita nos modelos registrados. Leituras concorrentes com o cache vazio
+  colapsam numa só recomputação (cached: trava via cache.add); os demais
+  recebem o último valor calculado na hora, sem esperar.
+
+Registro (no AppConfig.ready()):
+
+    register("catalog.product.total", Product)
+    register("catalog.product.active", Product, match={"is_active": True})
+    register("accounts.account.plan", Account, group_by="plan")
+    register("accounts.membership.users", Membership, distinct="user_id")
+"""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, connections, transaction
+from django.db.models import Count, F, Model
+from django.db.models.signals import post_delete, post_save
+from django.utils import timezone
+
+VERSION_KEY = "kpi:v"
+DEFAULT_TTL = 15
+LOCK_SECONDS = 30      # validade da trava de recomputação (processo que morreu no meio)
+LAST_SECONDS = 300     # último valor calculado, servido enquanto outro recalcula
+WAIT_SECONDS = 0.5     # sem valor anterior (1ª leitura): espera curta antes de calcular por conta própria
+POLL_SECONDS = 0.05
+
+_MISSING = object()
+
+
+@dataclass(frozen=True)
+class Counter:
+    name: str
+    model: type[Model]
+    match: Dict[str, Any] = field(default_factory=dict)  # filtro por igualdade (attname -> valor)
+    group_by: str = ""    # uma linha por valor: "<name>:<valor>"
+    distinct: str = ""    # nº de valores distintos (sem delta: stale a cada escrita)
+
+    @property
+    def fields(self) -> Tuple[str, ...]:
+        return tuple(self.match) + ((self.group_by,) if self.group_by else ()) + ((self.distinct,) if self.distinct else ())
+
+    def keys(self, values: Dict[str, Any]) -> Optional[List[str]]:
+        """Linhas em que uma instância com esses valores conta; None = desconhecido."""
+        if self.distinct or any(values.get(f, _MISSING) is _MISSING for f in self.fields):
+            return None
+        if any(values[f] != v for f, v in self.match.items()):
+            return []
+        if self.group_by:
+            return [f"{self.name}:{values[self.group_by]}"]
+        return [self.name]
+
+    def recount(self, using: str) -> Dict[str, int]:
+        qs = self.model._default_manager.using(using).filter(**self.match)
+        if self.distinct:
+            return {self.name: qs.values(self.distinct).distinct().count()}
+        if self.group_by:
+            rows = {
+                f"{self.name}:{value}": qty
+                for value, qty in qs.order_by().values_list(self.group_by).annotate(qty=Count("pk"))
+            }
+            rows[self.name] = sum(rows.values())
+            return rows
+        return {self.name: qs.count()}
+
+
+_registry: Dict[str, Counter] = {}
+_by_model: Dict[type[Model], List[Counter]] = {}
+_tracked: Dict[type[Model], Tuple[str, ...]] = {}  # campos lidos pelos contadores do modelo
+
+
+def _counter_model():
+    from accounts.models import KpiCounter
+
+    return KpiCounter
+
+
+# ---------- versão do cache ----------
+
+def _bump() -> None:
+    cache.set(VERSION_KEY, time.time_ns(), None)
+
+
+def invalidate(using: str = "default") -> None:
+    """Descarta os KPIs em cache (nova versão); de novo após o commit, se houver transação."""
+    _bump()
+    if connections[using].in_atomic_block:
+        transaction.on_commit(_bump, using=using)
+
+
+# ---------- escrita dos contadores ----------
+
+def _apply(deltas: Dict[str, int], using: str) -> None:
+    KpiCounter = _counter_model()
+    now = timezone.now()
+    for name, delta in deltas.items():
+        if not delta:
+            continue
+        done = KpiCounter.objects.using(using).filter(name=name).update(value=F("value") + delta, updated_at=now)
+        if not done and ":" in name:
+            # valor novo num grupo (ex. plano recém-criado): recontagem do grupo inteiro
+            _stale([name.split(":", 1)[0]], using)
+        # linha simples inexistente: ainda não foi contada; a 1ª leitura conta (já com esta escrita)
+
+
+def _stale(names: Iterable[str], using: str) -> None:
+    _counter_model().objects.using(using).filter(name__in=list(names), stale=False).update(stale=True)
+
+
+def _values(instance: Model, fields: Sequence[str]) -> Dict[str, Any]:
+    data = instance.__dict__
+    return {f: data[f] for f in fields if f in data}  # campos adiados (only/defer) ficam de fora
+
+
+def _deltas(counter: Counter, old: Optional[Dict[str, Any]], new: Optional[Dict[str, Any]],
+            deltas: Dict[str, int], stale: List[str]) -> None:
+    before = [] if old is None else counter.keys(old)
+    after = [] if new is None else counter.keys(new)
+    if before is None or after is None:
+        stale.append(counter.name)
+        return
+    for key in before:
+        deltas[key] = deltas.get(key, 0) - 1
+    for key in after:
+        deltas[key] = deltas.get(key, 0) + 1
+
+
+def _commit(deltas: Dict[str, int], stale: List[str], using: str) -> None:
+    if stale:
+        _stale(stale, using)
+    _apply(deltas, using)
+    invalidate(using)
+
+
+def _on_save(sender, instance, created, raw=False, using="default", update_fields=None, **kwargs):
+    if raw:  # loaddata: sem estado anterior confiável
+        mark_stale(sender, using=using)
+        return
+    if not created:
+        # valor anterior no banco desconhecido: recontagem dos contadores com campo gravado
+        # (update_fields sem campo lido, ex. last_login: só troca a versão do cache)
+        mark_stale(sender, fields=update_fields if update_fields is not None else _tracked.get(sender, ()), using=using)
+        return
+    deltas: Dict[str, int] = {}
+    stale: List[str] = []
+    current = _values(instance, _tracked.get(sender, ()))
+    for counter in _by_model.get(sender, ()):
+        _deltas(counter, None, current, deltas, stale)
+    _commit(deltas, stale, using)
+
+
+def _on_delete(sender, instance, using="default", **kwargs):
+    deltas: Dict[str, int] = {}
+    stale: List[str] = []
+    current = _values(instance, _tracked.get(sender, ()))
+    for counter in _by_model.get(sender, ()):
+        _deltas(counter, current, None, deltas, stale)
+    _commit(deltas, stale, using)
+
+
+def register(name: str, model: type[Model], *, match: Optional[Dict[str, Any]] = None,
+             group_by: str = "", distinct: str = "") -> Counter:
+    """Registra um KPI e liga os sinais do modelo (uma vez por modelo). Chame no AppConfig.ready()."""
+    counter = Counter(name, model, dict(match or {}), group_by, distinct)
+    _registry[name] = counter
+    counters = _by_model.setdefault(model, [])
+    counters[:] = [c for c in counters if c.name != name] + [counter]
+    _tracked[model] = tuple(sorted({f for c in counters for f in c.fields}))
+    uid = f"kpi:{model._meta.label}"
+    post_save.connect(_on_save, sender=model, weak=False, dispatch_uid=f"{uid}:save")
+    post_delete.connect(_on_delete, sender=model, weak=False, dispatch_uid=f"{uid}:delete")
+    return counter
+
+
+def registered() -> List[str]:
+    return sorted(_registry)
+
+
+def record_created(model: type[Model], objs: Iterable[Model], using: str = "default") -> None:
+    """bulk_create não dispara post_save: aplica os deltas das instâncias criadas."""
+    counters = _by_model.get(model, ())
+    deltas: Dict[str, int] = {}
+    stale: List[str] = []
+    tracked = _tracked.get(model, ())
+    for obj in objs:
+        current = _values(obj, tracked)
+        for counter in counters:
+            _deltas(counter, None, current, deltas, stale)
+    _commit(deltas, sorted(set(stale)), using)
+
+
+def mark_stale(model: type[Model], fields: Optional[Iterable[str]] = None, using: str = "default") -> None:
+    """
+    Escrita sem delta conhecido (bulk_update, queryset.update/delete): marca para
+    recontagem os KPIs do modelo que leem algum dos campos (None = todos).
+    """
+    wanted = None if fields is None else set(fields)
+    # com campos informados, um total sem filtro não muda (só insert/delete mudam)
+    names = [c.name for c in _by_model.get(model, ()) if wanted is None or wanted & set(c.fields)]
+    _commit({}, names, using)
+
+
+# ---------- leitura ----------
+
+def recount(names: Optional[Iterable[str]] = None, using: str = "default") -> Dict[str, int]:
+    """Reconta do zero (todos ou os informados) e grava na tabela."""
+    KpiCounter = _counter_model()
+    result: Dict[str, int] = {}
+    for name in (list(_registry) if names is None else list(names)):
+        counter = _registry[name]
+        with transaction.atomic(using=using):
+            rows = counter.recount(using)
+            if counter.group_by:
+                # valores que sumiram do grupo (ex. nenhum conta no plano) voltam a 0
+                KpiCounter.objects.using(using).filter(name__startswith=f"{name}:").exclude(name__in=rows).update(value=0)
+            for key, value in rows.items():
+                updated = KpiCounter.objects.using(using).filter(name=key).update(
+                    value=value, stale=False, updated_at=timezone.now()
+                )
+                if not updated:
+                    try:
+                        with transaction.atomic(using=using):
+                            KpiCounter.objects.using(using).create(name=key, value=value)
+                    except IntegrityError:  # criada em paralelo
+                        pass
+        result.update(rows)
+    invalidate(using)
+    return result
+
+
+def _read(using: str = "default") -> Dict[str, int]:
+    """Tabela de contadores; KPIs stale ou ainda não contados são recontados antes."""
+    KpiCounter = _counter_model()
+    rows = dict(KpiCounter.objects.using(using).values_list("name", "value"))
+    pending = list(KpiCounter.objects.using(using).filter(stale=True).values_list("name", flat=True))
+    pending += [name for name in _registry if name not in rows]
+    pending = [name for name in dict.fromkeys(pending) if name in _registry]
+    if pending:
+        # grupos recontados: valores que sumiram (ex. plano sem contas) foram zerados
+        prefixes = tuple(f"{name}:" for name in pending if _registry[name].group_by)
+        if prefixes:
+            rows = {key: value for key, value in rows.items() if not key.startswith(prefixes)}
+        rows.update(recount(pending, using=using))
+    return rows
+
+
+def cached(name: str, builder: Callable[[], Any], ttl: Optional[int] = None) -> Any:
+    """
+    Valor em cache até a próxima escrita nos modelos registrados (ou o TTL).
+    Com o cache vazio, só quem obtém a trava (cache.add, atômico) chama builder;
+    os demais recebem o último valor calculado (até LAST_SECONDS) sem esperar, ou,
+    na 1ª leitura, esperam no máximo WAIT_SECONDS.
+    """
+    if ttl is None:
+        ttl = int(getattr(settings, "KPI_CACHE_SECONDS", DEFAULT_TTL))
+    version = cache.get_or_set(VERSION_KEY, time.time_ns, None)
+    key = f"kpi:{version}:{name}"
+    value = cache.get(key)
+    if value is not None:
+        return value
+
+    lock = f"{key}:lock"
+    last = f"kpi:last:{name}"
+    if cache.add(lock, 1, LOCK_SECONDS):
+        try:
+            value = builder()
+            cache.set(key, value, ttl)
+            cache.set(last, value, LAST_SECONDS)
+        finally:
+            cache.delete(lock)
+        return value
+
+    value = cache.get(last)
+    if value is not None:
+        return value  # recomputação em andamento: valor anterior, sem segurar a requisição
+    deadline = time.monotonic() + WAIT_SECONDS
+    while time.monotonic() < deadline:
+        time.sleep(POLL_SECONDS)
+        value = cache.get(key)
+        if value is not None:
+            return value
+    return builder()  # quem tinha a trava demorou demais: calcula sem gravar
+
+
+def get_kpis(using: str = "default") -> Dict[str, int]:
+    """Todos os contadores {nome: valor}, via cache curto (uma recomputação por vez)."""
+    return cached(f"counters:{using}", lambda: _read(using))
+
+
+def group(kpis: Dict[str, int], name: str) -> List[Tuple[str, int]]:
+    """Linhas de um KPI por grupo, ordenadas pelo valor: [(valor, qtd), ...] (qtd > 0)."""
+    prefix = f"{name}:"
+    return sorted((key[len(prefix):], qty) for key, qty in kpis.items() if key.startswith(prefix) and qty > 0)
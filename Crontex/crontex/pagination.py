@@ -0,0 +1,247 @@
+# -*- coding: utf-8 -*-
+"""
+Paginação por cursor (keyset) e contagens em cache para as listas grandes
+(produtos, contatos).
+
+- OFFSET/LIMIT fica mais lento a cada página (o banco percorre e descarta as
+  linhas anteriores); o keyset filtra pela chave de ordenação da última linha
+  vista (`WHERE (created_at, id) < (...)`) e usa o índice, então a página 2000
+  custa o mesmo que a página 1.
+- O cursor é opaco: valores da chave da última/primeira linha, assinados
+  (django.core.signing) e passados em ?after= / ?before=.
+- O total (COUNT(*)) sai do cache, por consulta (hash do SQL) e por "namespace"
+  do modelo; cada escrita no modelo troca a versão do namespace
+  (connect_count_invalidation / invalidate_counts), invalidando todas as
+  contagens dele de uma vez. LIST_COUNT_CACHE_SECONDS limita a defasagem de
+  escritas que não passam por sinais (queryset.update, SQL direto).
+
+Uso numa ListView:
+
+    class ProdutoListView(KeysetPaginationMixin, ListView):
+        paginate_by = 25
+        keyset_ordering = ("-id",)
+        count_namespace = "catalog.product"
+
+?page=N continua funcionando (offset, com a contagem em cache); sem ?page e
+com a ordenação do queryset igual a keyset_ordering, a lista vira keyset.
+"""
+
+from __future__ import annotations
+
+import datetime
+import hashlib
+import operator
+import time
+from decimal import Decimal
+from functools import reduce
+from typing import Any, List, Optional, Sequence, Tuple
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import connections, transaction
+from django.db.models import Model, Q, QuerySet
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.http import Http404
+from django.utils.functional import cached_property
+
+CURSOR_SALT = "crontex.pagination.cursor"
+DEFAULT_COUNT_TTL = 60
+
+
+# ---------- contagens em cache ----------
+
+def _version_key(namespace: str) -> str:
+    return f"listcount:v:{namespace}"
+
+
+def _bump(namespace: str) -> None:
+    cache.set(_version_key(namespace), time.time_ns(), None)
+
+
+def invalidate_counts(namespace: str, using: str = "default") -> None:
+    """Descarta todas as contagens em cache do namespace (nova versão)."""
+    _bump(namespace)
+    if connections[using].in_atomic_block:
+        # leitores concorrentes podem recontar antes do commit: troca de novo depois dele
+        transaction.on_commit(lambda: _bump(namespace), using=using)
+
+
+def namespace_version(namespace: str) -> int:
+    """Versão atual do namespace; troca a cada escrita (para compor chaves de outros caches)."""
+    return cache.get_or_set(_version_key(namespace), time.time_ns, None)
+
+
+def cached_count(qs: QuerySet, namespace: str) -> int:
+    """COUNT(*) do queryset, em cache até a próxima escrita no namespace (ou o TTL)."""
+    version = namespace_version(namespace)
+    sql, params = qs.query.sql_with_params()
+    digest = hashlib.sha1(repr((qs.db, sql, params)).encode("utf-8")).hexdigest()
+    key = f"listcount:{namespace}:{version}:{digest}"
+    count = cache.get(key)
+    if count is None:
+        count = qs.count()
+        cache.set(key, count, int(getattr(settings, "LIST_COUNT_CACHE_SECONDS", DEFAULT_COUNT_TTL)))
+    return count
+
+
+def connect_count_invalidation(model: type[Model], namespace: str, *, m2m: Sequence[Any] = ()) -> None:
+    """
+    Liga post_save/post_delete do modelo (e m2m_changed dos through informados)
+    à invalidação das contagens. Chame no AppConfig.ready().
+    """
+    def _invalidate(sender, using="default", **kwargs):
+        invalidate_counts(namespace, using=using)
+
+    uid = f"listcount:{namespace}"
+    post_save.connect(_invalidate, sender=model, weak=False, dispatch_uid=f"{uid}:save")
+    post_delete.connect(_invalidate, sender=model, weak=False, dispatch_uid=f"{uid}:delete")
+    for through in m2m:
+        m2m_changed.connect(_invalidate, sender=through, weak=False, dispatch_uid=f"{uid}:m2m:{through._meta.label}")
+
+
+# ---------- cursor ----------
+
+def _plain(value: Any) -> Any:
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    return signing.dumps([_plain(v) for v in values], salt=CURSOR_SALT, compress=True)
+
+
+def decode_cursor(token: str, model: type[Model], fields: Sequence[str]) -> Tuple[Any, ...]:
+    """Token -> valores da chave (já convertidos pelo campo); Http404 se inválido/adulterado."""
+    try:
+        raw = signing.loads(token, salt=CURSOR_SALT)
+        if not isinstance(raw, list) or len(raw) != len(fields):
+            raise ValueError(raw)
+        return tuple(model._meta.get_field(name).to_python(v) for name, v in zip(fields, raw))
+    except Exception:
+        raise Http404("Cursor de paginação inválido.")
+
+
+def _split(ordering: Sequence[str]) -> List[Tuple[str, bool]]:
+    """("-created_at", "-id") -> [("created_at", True), ("id", True)] (True = desc)."""
+    return [(f[1:], True) if f.startswith("-") else (f, False) for f in ordering]
+
+
+def _seek(keys: List[Tuple[str, bool]], values: Sequence[Any], forward: bool) -> Q:
+    """(k1, k2, ...) depois (forward) / antes de values na ordenação dada."""
+    terms = []
+    for i, (name, desc) in enumerate(keys):
+        op = "lt" if desc == forward else "gt"
+        term = Q(**{f"{name}__{op}": values[i]})
+        for j in range(i):
+            term &= Q(**{keys[j][0]: values[j]})
+        terms.append(term)
+    return reduce(operator.or_, terms)
+
+
+class KeysetPage:
+    """Interface compatível com Page nos templates (has_next, paginator...), sem número de página."""
+
+    is_keyset = True
+    number = None
+
+    def __init__(self, object_list: List[Any], paginator: "CachedCountPaginator",
+                 next_token: Optional[str], previous_token: Optional[str]) -> None:
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_token = next_token
+        self.previous_token = previous_token
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self) -> int:
+        return len(self.object_list)
+
+    def has_next(self) -> bool:
+        return self.next_token is not None
+
+    def has_previous(self) -> bool:
+        return self.previous_token is not None
+
+    def has_other_pages(self) -> bool:
+        return self.has_next() or self.has_previous()
+
+
+class CachedCountPaginator(Paginator):
+    """Paginator cujo count vem de cached_count(); keyset_page() para navegação por cursor."""
+
+    def __init__(self, object_list, per_page, *args, namespace: str = "", **kwargs) -> None:
+        super().__init__(object_list, per_page, *args, **kwargs)
+        self.namespace = namespace
+
+    @cached_property
+    def count(self) -> int:
+        if self.namespace and isinstance(self.object_list, QuerySet):
+            return cached_count(self.object_list, self.namespace)
+        return super().count
+
+    def keyset_page(self, ordering: Sequence[str], *, after: str = "", before: str = "") -> KeysetPage:
+        qs: QuerySet = self.object_list
+        keys = _split(ordering)
+        names = [name for name, _desc in keys]
+        size = self.per_page
+
+        if before:
+            values = decode_cursor(before, qs.model, names)
+            reverse = [f"{name}" if desc else f"-{name}" for name, desc in keys]
+            rows = list(qs.filter(_seek(keys, values, forward=False)).order_by(*reverse)[: size + 1])
+            has_more_before = len(rows) > size
+            rows = rows[:size][::-1]
+            has_prev, has_next = has_more_before, True
+        else:
+            if after:
+                values = decode_cursor(after, qs.model, names)
+                qs = qs.filter(_seek(keys, values, forward=True))
+            rows = list(qs.order_by(*ordering)[: size + 1])
+            has_next = len(rows) > size
+            rows = rows[:size]
+            has_prev = bool(after)
+
+        def token(obj) -> str:
+            return encode_cursor([getattr(obj, name) for name in names])
+
+        next_token = token(rows[-1]) if rows and has_next else None
+        previous_token = token(rows[0]) if rows and has_prev else None
+        return KeysetPage(rows, self, next_token, previous_token)
+
+
+class KeysetPaginationMixin:
+    """ListView: keyset por ?after=/?before= (padrão) ou offset por ?page=, ambos com total em cache."""
+
+    paginator_class = CachedCountPaginator
+    keyset_ordering: Sequence[str] = ("-id",)
+    count_namespace = ""
+
+    def get_paginator(self, queryset, per_page, orphans=0, allow_empty_first_page=True, **kwargs):
+        return self.paginator_class(
+            queryset, per_page, orphans=orphans, allow_empty_first_page=allow_empty_first_page,
+            namespace=self.count_namespace, **kwargs,
+        )
+
+    def keyset_enabled(self, queryset) -> bool:
+        return (
+            "page" not in self.request.GET
+            and isinstance(queryset, QuerySet)
+            and tuple(queryset.query.order_by) == tuple(self.keyset_ordering)
+        )
+
+    def paginate_queryset(self, queryset, page_size):
+        if not self.keyset_enabled(queryset):
+            return super().paginate_queryset(queryset, page_size)
+        paginator = self.get_paginator(queryset, page_size)
+        page = paginator.keyset_page(
+            self.keyset_ordering,
+            after=self.request.GET.get("after") or "",
+            before=self.request.GET.get("before") or "",
+        )
+        return paginator, page, page.object_list, page.has_other_pages()
@@ -118,6 +118,31 @@ MEDIA_ROOT = BASE_DIR / "media"
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# Importação Bling: processos para parse/validação das linhas (1 = serial)
+CATALOG_IMPORT_WORKERS = config("CATALOG_IMPORT_WORKERS", default=1, cast=int)
+# Grade: teto de combinações (produto cartesiano) aceitas/gravadas por produto
+CATALOG_GRADE_MAX_COMBOS = config("CATALOG_GRADE_MAX_COMBOS", default=5000, cast=int)
+# EAN: blocos ref/base automáticos (contador atômico) p/ produtos novos; ver catalog/services/ean_blocks.py.
+# Variantes (ProductVariant) só são criadas para produtos com bloco: desligado, reserve com
+# `manage.py sync_product_variants --assign-blocks`.
+CATALOG_EAN_AUTO_BLOCKS = config("CATALOG_EAN_AUTO_BLOCKS", default=False, cast=bool)
+CATALOG_EAN_BLOCK_START = config("CATALOG_EAN_BLOCK_START", default=90000000, cast=int)
+CATALOG_EAN_BLOCK_BATCH = config("CATALOG_EAN_BLOCK_BATCH", default=100, cast=int)
+# Índice em memória de códigos de barras (/catalog/api/barcode/); ver catalog/services/barcode_index.py
+CATALOG_BARCODE_WARM_ON_START = config("CATALOG_BARCODE_WARM_ON_START", default=False, cast=bool)
+CATALOG_BARCODE_REFRESH_SECONDS = config("CATALOG_BARCODE_REFRESH_SECONDS", default=2.0, cast=float)
+CATALOG_BARCODE_FULL_RELOAD_SECONDS = config("CATALOG_BARCODE_FULL_RELOAD_SECONDS", default=600.0, cast=float)
+# Etiquetas (SVG/PDF): símbolos renderizados em cache por processo e teto de etiquetas por folha
+CATALOG_BARCODE_RENDER_CACHE = config("CATALOG_BARCODE_RENDER_CACHE", default=4096, cast=int)
+CATALOG_LABELS_MAX = config("CATALOG_LABELS_MAX", default=5000, cast=int)
+# Listas paginadas por cursor (crontex/pagination.py): validade máx. dos totais em cache (s)
+LIST_COUNT_CACHE_SECONDS = config("LIST_COUNT_CACHE_SECONDS", default=60, cast=int)
+# Autocomplete de contatos (people/services/contact_search.py): linhas guardadas por prefixo e validade (s)
+CONTACT_SEARCH_CACHE_ROWS = config("CONTACT_SEARCH_CACHE_ROWS", default=200, cast=int)
+CONTACT_SEARCH_CACHE_SECONDS = config("CONTACT_SEARCH_CACHE_SECONDS", default=300, cast=int)
+# KPIs dos dashboards (crontex/kpis.py): validade máx. do cache na frente da tabela de contadores (s)
+KPI_CACHE_SECONDS = config("KPI_CACHE_SECONDS", default=15, cast=int)
 EMAIL_BACKEND = "django.core.mail.backends.console.EmailBackend"
 DEFAULT_FROM_EMAIL = "no-reply@crontex.local"  # opcional, mas útil
 
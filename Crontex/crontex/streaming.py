@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+"""
+CSV em streaming: leitura de uploads e escrita de respostas.
+
+O arquivo nunca é lido nem decodificado inteiro: o primeiro bloco
+(SNIFF_BYTES) define encoding e delimitador; depois os bytes são lidos em
+blocos (como File.chunks()), passam por um decoder incremental e são
+entregues ao csv linha a linha. Memória ~ um bloco, qualquer que seja o
+tamanho do arquivo.
+
+- Encoding: BOM -> utf-8-sig; UTF-8 válido no 1º bloco -> UTF-8; senão Latin-1.
+  Em UTF-8, bytes inválidos mais adiante são lidos como Latin-1 (mesmo
+  resultado do antigo decode inteiro com fallback, só que por trecho).
+- Delimitador: ";" ou "," pela 1ª linha (";" em empate, padrão dos modelos).
+
+    rows = csv_dict_rows(upload)          # csv.DictReader
+    for row in rows: ...
+
+Escrita (exportações): iter_csv_bytes(rows) gera o CSV em blocos de
+WRITE_BUFFER_BYTES para um StreamingHttpResponse; gzip_chunks() comprime no
+caminho. O 1º bloco sai assim que as primeiras linhas existem.
+
+    StreamingHttpResponse(gzip_chunks(iter_csv_bytes(rows)), content_type="application/gzip")
+"""
+
+from __future__ import annotations
+
+import codecs
+import csv
+import io
+import zlib
+from dataclasses import dataclass
+from typing import Any, Iterable, Iterator, List, Optional, Sequence
+
+from django.core.exceptions import ValidationError
+
+# Bloco usado para detectar encoding/delimitador no início do CSV
+SNIFF_BYTES = 64 * 1024
+# Tamanho dos blocos lidos depois do sniff
+CHUNK_BYTES = 256 * 1024
+# Escrita: linhas acumuladas até este tamanho antes de virar um bloco da resposta
+WRITE_BUFFER_BYTES = 64 * 1024
+
+_FALLBACK_ERRORS = "crontex-latin1"
+
+
+def _latin1_fallback(exc: UnicodeError):
+    if not isinstance(exc, UnicodeDecodeError):
+        raise exc
+    return exc.object[exc.start: exc.end].decode("latin-1"), exc.end
+
+
+codecs.register_error(_FALLBACK_ERRORS, _latin1_fallback)
+
+
+def detect_encoding(sample: bytes) -> str:
+    if sample.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig"
+    try:
+        # bloco pode terminar no meio de um caractere multibyte
+        sample.decode("utf-8", errors="strict")
+        return "utf-8"
+    except UnicodeDecodeError as exc:
+        if exc.start >= len(sample) - 3:
+            return "utf-8"
+        return "latin-1"
+
+
+def detect_delimiter(sample: str) -> str:
+    first = sample.splitlines()[0] if sample else ""
+    return ";" if first.count(";") >= first.count(",") else ","
+
+
+def _file(binary: Any) -> Any:
+    # UploadedFile/FieldFile -> arquivo de baixo; o chunks() do InMemoryUploadedFile
+    # ignora o tamanho pedido e entrega tudo num bloco só
+    return getattr(binary, "file", binary)
+
+
+def _iter_bytes(binary: Any, chunk_size: int) -> Iterator[bytes]:
+    """Mesmo laço de File.chunks(): volta ao início e lê blocos de chunk_size."""
+    fh = _file(binary)
+    if hasattr(fh, "seek"):
+        fh.seek(0)
+    while block := fh.read(chunk_size):
+        yield block
+
+
+def _read_sample(binary: Any, size: int) -> bytes:
+    fh = _file(binary)
+    if hasattr(fh, "seek"):
+        fh.seek(0)
+    return fh.read(size)
+
+
+def iter_text_lines(binary: Any, encoding: str, chunk_size: int = CHUNK_BYTES) -> Iterator[str]:
+    """
+    Linhas do arquivo (com o "\\n" final), decodificadas bloco a bloco.
+    Quebra só em "\\n": \\r e separadores Unicode dentro de campos entre aspas
+    ficam para o csv tratar.
+    """
+    errors = _FALLBACK_ERRORS if encoding.startswith("utf-8") else "strict"
+    decoder = codecs.getincrementaldecoder(encoding)(errors=errors)
+    tail = ""
+    for block in _iter_bytes(binary, chunk_size):
+        text = tail + decoder.decode(block)
+        lines = text.split("\n")
+        tail = lines.pop()
+        for line in lines:
+            yield line + "\n"
+    tail += decoder.decode(b"", final=True)
+    if tail:
+        yield tail
+
+
+@dataclass
+class CsvStream:
+    encoding: str
+    delimiter: str
+    lines: Iterator[str]
+
+    def reader(self) -> Iterator[List[str]]:
+        return csv.reader(self.lines, delimiter=self.delimiter)
+
+    def dict_reader(self, fieldnames: Optional[List[str]] = None) -> csv.DictReader:
+        return csv.DictReader(self.lines, fieldnames=fieldnames, delimiter=self.delimiter)
+
+
+def open_csv(binary: Any, *, chunk_size: int = CHUNK_BYTES, allow_empty: bool = True) -> CsvStream:
+    """
+    Detecta encoding/delimitador pelo primeiro bloco e devolve o fluxo de linhas.
+    allow_empty=False: arquivo vazio (ou só espaços) -> ValidationError.
+    """
+    sample = _read_sample(binary, SNIFF_BYTES)
+    encoding = detect_encoding(sample)
+    text = sample.decode(encoding, errors="replace")
+    if not allow_empty and not text.strip():
+        raise ValidationError("Arquivo vazio.")
+    return CsvStream(encoding, detect_delimiter(text), iter_text_lines(binary, encoding, chunk_size))
+
+
+def csv_dict_rows(binary: Any, **kwargs: Any) -> csv.DictReader:
+    """csv.DictReader sobre o upload, em streaming (kwargs: ver open_csv)."""
+    return open_csv(binary, **kwargs).dict_reader()
+
+
+# ---------- escrita ----------
+
+def iter_csv_bytes(
+    rows: Iterable[Sequence[Any]], *, delimiter: str = ";", bom: bool = False,
+    encoding: str = "utf-8", buffer_size: int = WRITE_BUFFER_BYTES,
+) -> Iterator[bytes]:
+    """CSV codificado em blocos de ~buffer_size (uma linha por vez na memória, fora o buffer)."""
+    buf = io.StringIO()
+    writer = csv.writer(buf, delimiter=delimiter)
+    if bom:
+        buf.write("\ufeff")
+    for row in rows:
+        writer.writerow(row)
+        if buf.tell() >= buffer_size:
+            yield buf.getvalue().encode(encoding)
+            buf.seek(0)
+            buf.truncate()
+    if buf.tell():
+        yield buf.getvalue().encode(encoding)
+
+
+def gzip_chunks(chunks: Iterable[bytes], level: int = 6) -> Iterator[bytes]:
+    """Comprime um fluxo de blocos no formato gzip (arquivo .gz), sem juntar o conteúdo."""
+    z = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        out = z.compress(chunk)
+        if out:
+            yield out
+    yield z.flush()
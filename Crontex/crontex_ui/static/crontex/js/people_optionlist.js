@@ -98,14 +98,34 @@
   }
 
   // Hidratação: quando há ID no hidden, busca o nome em:
-  //   GET /people/api/get/?id=<pk> -> {id, text, subtitle}
-  function fetchPersonById(id, signal){
-    if (!id) return Promise.resolve(null);
+  //   GET /people/api/get/?ids=<pk>,<pk>,... -> {results: [{id, text, subtitle}]}
+  // Os pedidos do mesmo ciclo (todas as combos da página) viram uma chamada só.
+  const pendingById = new Map();   // id -> [resolve, ...]
+  let flushTimer = null;
+
+  function flushPersonBatch(){
+    flushTimer = null;
+    const batch = new Map(pendingById);
+    pendingById.clear();
     const u = new URL("/people/api/get/", window.location.origin);
-    u.searchParams.set("id", String(id));
-    return fetch(u.toString(), { credentials:"same-origin", signal, headers: {"X-Requested-With":"XMLHttpRequest"} })
-      .then(r => r.ok ? r.json() : null)
-      .catch(() => null);
+    u.searchParams.set("ids", Array.from(batch.keys()).join(","));
+    fetch(u.toString(), { credentials:"same-origin", headers: {"X-Requested-With":"XMLHttpRequest"} })
+      .then(r => r.ok ? r.json() : {results: []})
+      .catch(() => ({results: []}))
+      .then(d => {
+        const byId = new Map((Array.isArray(d.results) ? d.results : []).map(it => [String(it.id), it]));
+        batch.forEach((resolvers, id) => resolvers.forEach(fn => fn(byId.get(id) || null)));
+      });
+  }
+
+  function fetchPersonById(id){
+    if (!id) return Promise.resolve(null);
+    return new Promise(resolve => {
+      const key = String(id);
+      if (!pendingById.has(key)) pendingById.set(key, []);
+      pendingById.get(key).push(resolve);
+      if (!flushTimer) flushTimer = setTimeout(flushPersonBatch, 0);
+    });
   }
 
   // ======= Componente Combobox =======
@@ -197,8 +217,7 @@
 
     // Hidrata nome no input quando já houver ID (edição)
     if (hid && hid.value && !txt.value){
-      const ctrl = new AbortController();
-      fetchPersonById(hid.value, ctrl.signal).then(data => {
+      fetchPersonById(hid.value).then(data => {
         if (data && data.text) {
           txt.value = data.text;
         }
@@ -11,6 +11,7 @@ from django.views.generic import CreateView, TemplateView
 from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth.mixins import LoginRequiredMixin
 from catalog.models import Product
+from crontex.kpis import cached, get_kpis
 
 # URLs tipadas p/ Pylance
 URL_LOGIN = cast(str, reverse_lazy("crontex_ui:login"))
@@ -58,13 +59,13 @@ class DashboardView(LoginRequiredMixin, TemplateView):
 
     def get_context_data(self, **kwargs):
         ctx = super().get_context_data(**kwargs)
-        ctx["kpi_produtos_ativos"] = Product.objects.filter(is_active=True).count()
-        ctx["kpi_produtos_total"] = Product.objects.count()
-        try:
-            qs = Product.objects.order_by("-updated_at", "-created_at")[:6]
-            if not qs:
-                raise AttributeError
-        except Exception:
-            qs = Product.objects.order_by("-id")[:6]
-        ctx["produtos_recentes"] = qs
+        # contadores mantidos por sinais (crontex/kpis.py), sem COUNT(*) por acesso
+        kpis = get_kpis()
+        ctx["kpi_produtos_ativos"] = kpis["catalog.product.active"]
+        ctx["kpi_produtos_total"] = kpis["catalog.product.total"]
+        # cards: só id/sku/nome/preço/estoque/ativo (sem o JSON de bling_extra); em cache até a próxima escrita
+        ctx["produtos_recentes"] = cached(
+            "dashboard:produtos_recentes",
+            lambda: list(Product.objects.cards().order_by("-updated_at", "-id")[:6]),
+        )
         return ctx
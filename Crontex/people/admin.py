@@ -1,6 +1,14 @@
 # people/admin.py
-from django.contrib import admin
+from django.contrib import admin, messages
+from django.core.exceptions import PermissionDenied
+from django.shortcuts import redirect
+from django.template.response import TemplateResponse
+from django.urls import path
+
 from .models import Contact, Address, Category
+from .services.contact_dedup import DEFAULT_THRESHOLD, find_duplicates, merge_clusters, verify_clusters
+
+DEDUP_MAX_SHOWN = 200
 
 class AddressInline(admin.TabularInline):
     model = Address
@@ -27,6 +35,68 @@ class ContactAdmin(admin.ModelAdmin):
     )
     readonly_fields = ("created_at","updated_at")
 
+    # --- Duplicados (people/services/contact_dedup.py; também manage.py dedup_contacts) ---
+    def get_urls(self):
+        urls = [
+            path("duplicados/", self.admin_site.admin_view(self.dedup_view), name="people_contact_dedup"),
+        ]
+        return urls + super().get_urls()
+
+    def _threshold(self, raw):
+        try:
+            value = float(raw)
+        except (TypeError, ValueError):
+            return DEFAULT_THRESHOLD
+        return value if 0 < value <= 1 else DEFAULT_THRESHOLD
+
+    def _posted_groups(self, values):
+        """ "survivor:dup,dup" de cada grupo marcado -> [(survivor, [duplicados])]."""
+        groups = []
+        for value in values:
+            keep, _sep, dups = value.partition(":")
+            ids = [pk for pk in dups.split(",") if pk.isdigit()]
+            if keep.isdigit() and ids:
+                groups.append((int(keep), [int(pk) for pk in ids]))
+        return groups
+
+    def dedup_view(self, request):
+        if not (self.has_change_permission(request) and self.has_delete_permission(request)):
+            raise PermissionDenied
+        if request.method == "POST":
+            threshold = self._threshold(request.POST.get("threshold"))
+            groups = self._posted_groups(request.POST.getlist("group"))
+            if groups:
+                # só os IDs exibidos, e só se ainda forem duplicados (nada que o admin não viu)
+                clusters = verify_clusters(groups, threshold=threshold)
+                result = merge_clusters(clusters)
+                self.message_user(
+                    request,
+                    f"{result.merged} contatos mesclados em {result.clusters} grupos "
+                    f"({result.addresses} endereços, {result.links} categorias, {result.products} produtos).",
+                    messages.SUCCESS,
+                )
+                skipped = sum(len(dups) for _keep, dups in groups) - result.merged
+                if skipped > 0:
+                    self.message_user(
+                        request,
+                        f"{skipped} contatos não mesclados: mudaram desde a listagem ou ficaram abaixo do score.",
+                        messages.WARNING,
+                    )
+            return redirect(f"{request.path}?threshold={threshold}")
+
+        threshold = self._threshold(request.GET.get("threshold"))
+        clusters = find_duplicates(threshold=threshold)
+        context = {
+            **self.admin_site.each_context(request),
+            "opts": self.model._meta,
+            "title": "Contatos duplicados",
+            "threshold": threshold,
+            "clusters": clusters[:DEDUP_MAX_SHOWN],
+            "total_clusters": len(clusters),
+            "total_duplicates": sum(len(c.duplicates) for c in clusters),
+        }
+        return TemplateResponse(request, "admin/people/contact/dedup.html", context)
+
 @admin.register(Category)
 class CategoryAdmin(admin.ModelAdmin):
     list_display = ("name", "slug", "created_at")
@@ -4,3 +4,14 @@ from django.apps import AppConfig
 class PeopleConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'people'
+
+    def ready(self):
+        # palavras do autocomplete (ContactSearchKey) acompanham save()
+        import people.signals  # noqa: F401
+
+        # totais da lista de contatos (crontex/pagination.py) invalidados a cada escrita
+        from crontex.pagination import connect_count_invalidation
+
+        from .models import Contact
+
+        connect_count_invalidation(Contact, "people.contact", m2m=[Contact.categories.through])
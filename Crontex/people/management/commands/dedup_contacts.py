@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+"""
+Encontra (e, com --apply, mescla) contatos duplicados.
+
+Uso:
+    python manage.py dedup_contacts                    # só lista os grupos
+    python manage.py dedup_contacts --apply
+    python manage.py dedup_contacts --threshold 0.5 --max-block 100 --apply
+
+Critérios e o que a mescla faz: people/services/contact_dedup.py. O mesmo
+fluxo existe no admin (Contatos > Duplicados), com escolha por grupo.
+"""
+
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand, CommandError
+
+from people.services.contact_dedup import (
+    DEFAULT_BATCH_SIZE,
+    DEFAULT_MAX_BLOCK,
+    DEFAULT_THRESHOLD,
+    find_duplicates,
+    merge_clusters,
+)
+
+
+class Command(BaseCommand):
+    help = "Agrupa contatos duplicados por chaves de bloco (documento, telefone, e-mail, nome) e os mescla."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="score mínimo do par (0..1)")
+        parser.add_argument("--max-block", type=int, default=DEFAULT_MAX_BLOCK, help="ignora blocos maiores que isso")
+        parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="grupos por transação")
+        parser.add_argument("--apply", action="store_true", help="mescla (sem isso, só lista)")
+        parser.add_argument("--limit", type=int, default=50, help="grupos listados (0 = todos)")
+
+    def handle(self, *args, **opts):
+        if not 0 < opts["threshold"] <= 1:
+            raise CommandError("--threshold deve estar entre 0 e 1.")
+        clusters = find_duplicates(threshold=opts["threshold"], max_block=opts["max_block"])
+        shown = clusters if not opts["limit"] else clusters[: opts["limit"]]
+        for cluster in shown:
+            names = " | ".join(f"#{pk} {name}" for pk, name in cluster.names.items())
+            self.stdout.write(f"[{cluster.score:.2f}] {names}")
+        duplicates = sum(len(c.duplicates) for c in clusters)
+        self.stdout.write(f"{len(clusters)} grupos, {duplicates} duplicados.")
+        if not opts["apply"] or not clusters:
+            return
+
+        result = merge_clusters(clusters, batch_size=opts["batch_size"])
+        self.stdout.write(self.style.SUCCESS(
+            f"{result.merged} contatos mesclados em {result.clusters} grupos "
+            f"({result.addresses} endereços, {result.links} categorias, {result.products} produtos atualizados)."
+        ))
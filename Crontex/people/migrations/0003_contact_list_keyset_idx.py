@@ -0,0 +1,17 @@
+# Generated by Django 5.2.6 on 2026-10-17 01:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('people', '0002_category_contact_address_delete_collaborator_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='contact',
+            index=models.Index(fields=['is_deleted', '-created_at', '-id'], name='contact_list_keyset_idx'),
+        ),
+    ]
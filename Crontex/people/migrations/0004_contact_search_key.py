@@ -0,0 +1,72 @@
+# Generated by Django 5.2.6 on 2026-10-17 01:23
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from people.utils import contact_search_key
+
+CHUNK = 1000
+
+
+def fill_search_keys(apps, schema_editor):
+    """Preenche Contact.search_key e ContactSearchKey dos contatos existentes (em blocos)."""
+    Contact = apps.get_model("people", "Contact")
+    ContactSearchKey = apps.get_model("people", "ContactSearchKey")
+    fields = ("id", "name", "fantasy_name", "email", "phone", "phone_alt", "cpf", "cnpj")
+    last = 0
+    while True:
+        batch = list(Contact.objects.filter(pk__gt=last).order_by("pk").only(*fields)[:CHUNK])
+        if not batch:
+            return
+        rows, keys = [], []
+        for c in batch:
+            search_key = contact_search_key(
+                name=c.name, fantasy_name=c.fantasy_name, email=c.email,
+                phones=(c.phone, c.phone_alt), documents=(c.cpf, c.cnpj),
+            )
+            rows.append((search_key, c.pk))
+            keys += [ContactSearchKey(contact_id=c.pk, key=k) for k in search_key.split()]
+        with schema_editor.connection.cursor() as cur:
+            cur.executemany("UPDATE people_contact SET search_key = %s WHERE id = %s", rows)
+        ContactSearchKey.objects.bulk_create(keys, ignore_conflicts=True)
+        last = batch[-1].pk
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('people', '0003_contact_list_keyset_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContactSearchKey',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=64)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='contact',
+            name='search_key',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='contact',
+            index=models.Index(fields=['name', 'id'], name='contact_name_idx'),
+        ),
+        migrations.AddField(
+            model_name='contactsearchkey',
+            name='contact',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_keys', to='people.contact'),
+        ),
+        migrations.AddIndex(
+            model_name='contactsearchkey',
+            index=models.Index(fields=['key', 'contact'], name='contact_search_key_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='contactsearchkey',
+            constraint=models.UniqueConstraint(fields=('contact', 'key'), name='uix_contact_search_key'),
+        ),
+        migrations.RunPython(fill_search_keys, migrations.RunPython.noop),
+    ]
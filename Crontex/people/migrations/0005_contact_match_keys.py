@@ -0,0 +1,61 @@
+# Generated by Django 5.2.6 on 2026-10-17 01:56
+
+from django.db import migrations, models
+
+from people.utils import normalize_cnpj, normalize_cpf, normalize_email
+
+CHUNK = 1000
+
+
+def fill_match_keys(apps, schema_editor):
+    """Preenche cpf_digits/cnpj_digits/email_lower dos contatos existentes (em blocos)."""
+    Contact = apps.get_model("people", "Contact")
+    last = 0
+    while True:
+        batch = list(Contact.objects.filter(pk__gt=last).order_by("pk").values_list("id", "cpf", "cnpj", "email")[:CHUNK])
+        if not batch:
+            return
+        rows = [(normalize_cpf(cpf), normalize_cnpj(cnpj), normalize_email(email), pk) for pk, cpf, cnpj, email in batch]
+        with schema_editor.connection.cursor() as cur:
+            cur.executemany(
+                "UPDATE people_contact SET cpf_digits = %s, cnpj_digits = %s, email_lower = %s WHERE id = %s", rows
+            )
+        last = batch[-1][0]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('people', '0004_contact_search_key'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='contact',
+            name='cnpj_digits',
+            field=models.CharField(blank=True, default='', editable=False, max_length=14),
+        ),
+        migrations.AddField(
+            model_name='contact',
+            name='cpf_digits',
+            field=models.CharField(blank=True, default='', editable=False, max_length=11),
+        ),
+        migrations.AddField(
+            model_name='contact',
+            name='email_lower',
+            field=models.CharField(blank=True, default='', editable=False, max_length=254),
+        ),
+        migrations.AddIndex(
+            model_name='contact',
+            index=models.Index(fields=['cnpj_digits'], name='contact_cnpj_digits_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='contact',
+            index=models.Index(fields=['cpf_digits'], name='contact_cpf_digits_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='contact',
+            index=models.Index(fields=['email_lower'], name='contact_email_lower_idx'),
+        ),
+        migrations.RunPython(fill_match_keys, migrations.RunPython.noop),
+    ]
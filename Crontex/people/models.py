@@ -4,6 +4,8 @@ from django.utils.translation import gettext_lazy as _
 from django.utils import timezone
 from django.core.exceptions import ValidationError
 
+from .utils import contact_search_key, normalize_cnpj, normalize_cpf, normalize_email
+
 # --- Helpers/validators ---
 def only_digits(value: str) -> str:
     return ''.join(ch for ch in (value or '') if ch.isdigit())
@@ -112,14 +114,84 @@ class Contact(models.Model):
     created_at = models.DateTimeField(default=timezone.now, editable=False)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # autocomplete: chave normalizada (sem acento, minúsculas, dígitos de telefone/CPF/CNPJ);
+    # cada palavra também vai para ContactSearchKey (índice de prefixo)
+    search_key = models.TextField(blank=True, default="", editable=False)
+
+    # deduplicação (importação): documentos só com dígitos e e-mail em minúsculas, indexados
+    cpf_digits = models.CharField(max_length=11, blank=True, default="", editable=False)
+    cnpj_digits = models.CharField(max_length=14, blank=True, default="", editable=False)
+    email_lower = models.CharField(max_length=254, blank=True, default="", editable=False)
+
+    # campos que alimentam search_key
+    SEARCH_FIELDS = ("name", "fantasy_name", "email", "phone", "phone_alt", "cpf", "cnpj")
+    # campos que alimentam cpf_digits/cnpj_digits/email_lower
+    MATCH_FIELDS = ("cpf", "cnpj", "email")
+    MATCH_KEY_FIELDS = ("cpf_digits", "cnpj_digits", "email_lower")
+
     class Meta:
         verbose_name = _("Contato")
         verbose_name_plural = _("Contatos")
         ordering = ["-created_at", "name"]
+        indexes = [
+            # lista paginada por cursor (created_at, id) só dos não excluídos
+            models.Index(fields=["is_deleted", "-created_at", "-id"], name="contact_list_keyset_idx"),
+            # autocomplete sem termo: primeiros por nome
+            models.Index(fields=["name", "id"], name="contact_name_idx"),
+            # importação: contato existente pelo documento/e-mail
+            models.Index(fields=["cnpj_digits"], name="contact_cnpj_digits_idx"),
+            models.Index(fields=["cpf_digits"], name="contact_cpf_digits_idx"),
+            models.Index(fields=["email_lower"], name="contact_email_lower_idx"),
+        ]
 
     def __str__(self):
         return self.name or (self.cnpj or self.cpf) or str(self.pk)
 
+    def build_search_key(self) -> str:
+        return contact_search_key(
+            name=self.name, fantasy_name=self.fantasy_name, email=self.email,
+            phones=(self.phone, self.phone_alt), documents=(self.cpf, self.cnpj),
+        )
+
+    def set_match_keys(self) -> None:
+        self.cpf_digits = normalize_cpf(self.cpf)
+        self.cnpj_digits = normalize_cnpj(self.cnpj)
+        self.email_lower = normalize_email(self.email)
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None or set(update_fields) & set(self.SEARCH_FIELDS):
+            self.search_key = self.build_search_key()
+            if update_fields is not None:
+                kwargs["update_fields"] = {*kwargs["update_fields"], "search_key"}
+        if update_fields is None or set(update_fields) & set(self.MATCH_FIELDS):
+            self.set_match_keys()
+            if update_fields is not None:
+                kwargs["update_fields"] = {*kwargs["update_fields"], *self.MATCH_KEY_FIELDS}
+        super().save(*args, **kwargs)
+
+
+class ContactSearchKey(models.Model):
+    """
+    Uma palavra de Contact.search_key por linha: o índice (key, contact) atende
+    "palavra começa com" por faixa (key >= 'mar' AND key < 'mar\uffff') e já
+    devolve na ordem, parando no LIMIT — sem varrer a tabela de contatos.
+    Mantida por people/signals.py e services/contact_search.reindex_contacts().
+    """
+    contact = models.ForeignKey(Contact, on_delete=models.CASCADE, related_name="search_keys")
+    key = models.CharField(max_length=64)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["contact", "key"], name="uix_contact_search_key"),
+        ]
+        indexes = [
+            models.Index(fields=["key", "contact"], name="contact_search_key_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.key} → {self.contact_id}"
+
 # --- Endereço (múltiplos por contato) ---
 class Address(models.Model):
     contact = models.ForeignKey(Contact, on_delete=models.CASCADE, related_name="addresses")
@@ -0,0 +1,348 @@
+# -*- coding: utf-8 -*-
+"""
+Deduplicação de contatos (manage.py dedup_contacts e admin > Contatos > Duplicados).
+
+Busca (find_duplicates):
+- Cada contato gera chaves de bloco: documento (CNPJ/CPF só dígitos), e-mail
+  em minúsculas, telefone (sem DDI 55) e as palavras do nome (fold, sem
+  "ltda"/"me"/"de"...) em ordem alfabética. Só pares que dividem um bloco são
+  comparados — nunca todos contra todos. Blocos de e-mail/telefone/nome
+  maiores que max_block (ex. e-mail de contabilidade usado por centenas de
+  empresas) são ignorados; os de documento não têm teto.
+- Score do par (0..1): mesmo CNPJ/CPF = 1; senão e-mail (0,35) + telefone
+  (0,3) + semelhança das palavras do nome (0,5 x Jaccard). CPF/CNPJ
+  diferentes = 0 (nunca mescla).
+- Pares >= threshold viram grupos (union-find, dos pares mais fortes para os
+  mais fracos); um grupo nunca junta dois CNPJs/CPFs diferentes. O contato
+  mais antigo (menor id) fica; os demais são mesclados nele.
+- verify_clusters: grupos escolhidos no admin (os IDs exibidos) conferidos
+  de novo antes da mescla, só entre esses contatos.
+
+Mescla (merge_clusters), em lotes, cada lote numa transação:
+- campos vazios do contato mantido são preenchidos pelos duplicados (papéis: OU);
+- endereços e categorias passam para o contato mantido (UPDATE/INSERT em lote);
+- IDs em Product.bling_extra["people"] são trocados
+  (catalog.services.people_links.repoint_people_links);
+- duplicados excluídos; search_key, chaves de importação e palavras do
+  autocomplete do contato mantido recalculadas.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from itertools import combinations
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Sequence, Set, Tuple
+
+from django.db import transaction
+from django.db.models import Case, IntegerField, Value, When
+from django.utils import timezone
+
+from catalog.services.people_links import repoint_people_links
+from crontex.imports import chunked
+from crontex.pagination import invalidate_counts
+from people.models import Address, Contact
+from people.services.contact_search import COUNT_NAMESPACE, sync_search_keys
+from people.utils import fold, normalize_phone
+
+DEFAULT_THRESHOLD = 0.7
+DEFAULT_MAX_BLOCK = 50
+DEFAULT_BATCH_SIZE = 200
+
+# palavras que não distinguem nomes ("ACME Ltda" == "Acme")
+NAME_STOPWORDS = frozenset({"ltda", "me", "epp", "eireli", "sa", "s", "a", "cia", "de", "da", "do", "das", "dos", "e"})
+
+# preenchidos no contato mantido quando vazios nele
+FILL_FIELDS = ("name", "fantasy_name", "person_kind", "cpf", "cnpj", "ie", "rg", "email", "phone", "phone_alt", "notes")
+OR_FIELDS = ("is_cliente", "is_fornecedor", "is_colaborador", "is_parceiro", "ie_isento")
+
+_LOADED = ("id", "name", "cnpj_digits", "cpf_digits", "email_lower", "phone", "phone_alt")
+
+
+@dataclass(frozen=True)
+class Candidate:
+    pk: int
+    name: str
+    tokens: FrozenSet[str]
+    cnpj: str
+    cpf: str
+    email: str
+    phones: FrozenSet[str]
+
+    def block_keys(self) -> Iterator[str]:
+        if self.cnpj:
+            yield f"cnpj:{self.cnpj}"
+        if self.cpf:
+            yield f"cpf:{self.cpf}"
+        if self.email:
+            yield f"email:{self.email}"
+        for phone in self.phones:
+            yield f"phone:{phone}"
+        if self.tokens:
+            yield "name:" + " ".join(sorted(self.tokens))
+
+
+@dataclass
+class Cluster:
+    survivor: int
+    duplicates: List[int]
+    score: float  # menor score entre os pares que formaram o grupo
+    names: Dict[int, str] = field(default_factory=dict)
+
+    @property
+    def ids(self) -> List[int]:
+        return [self.survivor, *self.duplicates]
+
+
+@dataclass
+class MergeResult:
+    clusters: int = 0
+    merged: int = 0
+    addresses: int = 0
+    links: int = 0
+    products: int = 0
+
+
+def _phones(*values: str) -> FrozenSet[str]:
+    out = set()
+    for value in values:
+        digits = normalize_phone(value)
+        if digits.startswith("55") and len(digits) >= 12:
+            digits = digits[2:]
+        if len(digits) >= 10:  # DDD + número; sem DDD colide demais
+            out.add(digits)
+    return frozenset(out)
+
+
+def name_tokens(name: str) -> FrozenSet[str]:
+    return frozenset(t for t in fold(name).split() if t not in NAME_STOPWORDS)
+
+
+def _candidate(row: Sequence) -> Candidate:
+    pk, name, cnpj, cpf, email, phone, phone_alt = row
+    return Candidate(pk, name, name_tokens(name), cnpj, cpf, email, _phones(phone, phone_alt))
+
+
+def _conflicts(a: Candidate, b: Candidate) -> bool:
+    return bool((a.cnpj and b.cnpj and a.cnpj != b.cnpj) or (a.cpf and b.cpf and a.cpf != b.cpf))
+
+
+def score(a: Candidate, b: Candidate) -> float:
+    if _conflicts(a, b):
+        return 0.0
+    if (a.cnpj and a.cnpj == b.cnpj) or (a.cpf and a.cpf == b.cpf):
+        return 1.0
+    total = 0.0
+    if a.email and a.email == b.email:
+        total += 0.35
+    if a.phones & b.phones:
+        total += 0.3
+    if a.tokens and b.tokens:
+        total += 0.5 * len(a.tokens & b.tokens) / len(a.tokens | b.tokens)
+    return min(total, 1.0)
+
+
+class _Groups:
+    """Union-find; cada raiz guarda os CNPJs/CPFs do grupo para não juntar documentos diferentes."""
+
+    def __init__(self, candidates: Dict[int, Candidate]) -> None:
+        self.parent: Dict[int, int] = {}
+        self.docs: Dict[int, Tuple[Set[str], Set[str]]] = {}
+        self.weakest: Dict[int, float] = {}
+        self.candidates = candidates
+
+    def find(self, pk: int) -> int:
+        if pk not in self.parent:
+            c = self.candidates[pk]
+            self.parent[pk] = pk
+            self.docs[pk] = ({c.cnpj} - {""}, {c.cpf} - {""})
+            self.weakest[pk] = 1.0
+        root = pk
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[pk] != root:  # compressão de caminho
+            self.parent[pk], pk = root, self.parent[pk]
+        return root
+
+    def union(self, a: int, b: int, pair_score: float) -> bool:
+        ra, rb = self.find(a), self.find(b)
+        if ra == rb:
+            return False
+        (cnpj_a, cpf_a), (cnpj_b, cpf_b) = self.docs[ra], self.docs[rb]
+        if len(cnpj_a | cnpj_b) > 1 or len(cpf_a | cpf_b) > 1:
+            return False
+        root, child = (ra, rb) if ra < rb else (rb, ra)
+        self.parent[child] = root
+        self.docs[root] = (cnpj_a | cnpj_b, cpf_a | cpf_b)
+        self.weakest[root] = min(self.weakest[ra], self.weakest[rb], pair_score)
+        return True
+
+
+def _scored_pairs(candidates: Dict[int, Candidate], threshold: float, max_block: int) -> Dict[Tuple[int, int], float]:
+    """Pares (a, b) com score >= threshold, comparando só dentro dos blocos (candidates em ordem de pk)."""
+    blocks: Dict[str, List[int]] = {}
+    for c in candidates.values():
+        for key in c.block_keys():
+            blocks.setdefault(key, []).append(c.pk)
+
+    pairs: Dict[Tuple[int, int], float] = {}
+    for key, members in blocks.items():
+        if len(members) < 2:
+            continue
+        if key.startswith(("cnpj:", "cpf:")):
+            # mesmo documento: score 1 entre todos; ligar cada um ao 1º basta para o grupo (sem teto de bloco)
+            block_pairs = ((members[0], pk) for pk in members[1:])
+        elif len(members) > max_block:
+            continue
+        else:
+            block_pairs = combinations(members, 2)
+        for a, b in block_pairs:
+            pair_score = score(candidates[a], candidates[b])
+            if pair_score >= threshold:
+                pairs[(a, b)] = pair_score  # mesmo par em vários blocos: uma entrada
+    return pairs
+
+
+def _group(candidates: Dict[int, Candidate], pairs: Dict[Tuple[int, int], float]) -> _Groups:
+    groups = _Groups(candidates)
+    for (a, b), pair_score in sorted(pairs.items(), key=lambda item: (-item[1], item[0])):
+        groups.union(a, b, pair_score)
+    return groups
+
+
+def find_duplicates(
+    *, threshold: float = DEFAULT_THRESHOLD, max_block: int = DEFAULT_MAX_BLOCK, chunk_size: int = 5000,
+) -> List[Cluster]:
+    """Grupos de duplicados (contatos não excluídos), do maior score para o menor."""
+    candidates: Dict[int, Candidate] = {}
+    rows = Contact.objects.filter(is_deleted=False).order_by("pk").values_list(*_LOADED)
+    for row in rows.iterator(chunk_size=chunk_size):
+        c = _candidate(row)
+        candidates[c.pk] = c
+
+    groups = _group(candidates, _scored_pairs(candidates, threshold, max_block))
+    members: Dict[int, List[int]] = {}
+    for pk in list(groups.parent):
+        members.setdefault(groups.find(pk), []).append(pk)
+    clusters = [
+        Cluster(root, sorted(pk for pk in pks if pk != root), groups.weakest[root],
+                {pk: candidates[pk].name for pk in sorted(pks)})
+        for root, pks in members.items() if len(pks) > 1
+    ]
+    clusters.sort(key=lambda c: (-c.score, c.survivor))
+    return clusters
+
+
+def verify_clusters(
+    groups: Iterable[Tuple[int, Iterable[int]]], *,
+    threshold: float = DEFAULT_THRESHOLD, max_block: int = DEFAULT_MAX_BLOCK,
+) -> List[Cluster]:
+    """
+    Grupos escolhidos na tela (survivor, duplicados exibidos), conferidos antes da
+    mescla: só esses contatos entram, e cada duplicado só fica se ainda estiver
+    ligado ao survivor por pares >= threshold (mesma regra de find_duplicates,
+    mas só entre os contatos do grupo). Contato em dois grupos fica no primeiro.
+    """
+    groups = [(int(keep), sorted({int(pk) for pk in dups} - {int(keep)})) for keep, dups in groups]
+    ids = {pk for keep, dups in groups for pk in (keep, *dups)}
+    rows = Contact.objects.filter(pk__in=ids, is_deleted=False).order_by("pk").values_list(*_LOADED)
+    loaded = {c.pk: c for c in map(_candidate, rows)}
+
+    taken: Set[int] = set()
+    clusters: List[Cluster] = []
+    for keep, dups in groups:
+        candidates = {pk: loaded[pk] for pk in sorted({keep, *dups}) if pk in loaded and pk not in taken}
+        if keep not in candidates:
+            continue
+        found = _group(candidates, _scored_pairs(candidates, threshold, max_block))
+        root = found.find(keep)
+        linked = [pk for pk in candidates if pk != keep and pk in found.parent and found.find(pk) == root]
+        if not linked:
+            continue
+        taken.update((keep, *linked))
+        clusters.append(Cluster(keep, linked, found.weakest[root], {pk: candidates[pk].name for pk in (keep, *linked)}))
+    return clusters
+
+
+# ---------- mescla ----------
+
+def _absorb(survivor: Contact, duplicates: Iterable[Contact]) -> Set[str]:
+    """Preenche o contato mantido com os dados dos duplicados; devolve os campos alterados."""
+    changed: Set[str] = set()
+    for dup in duplicates:
+        for name in FILL_FIELDS:
+            if not getattr(survivor, name) and getattr(dup, name):
+                setattr(survivor, name, getattr(dup, name))
+                changed.add(name)
+        for name in OR_FIELDS:
+            if getattr(dup, name) and not getattr(survivor, name):
+                setattr(survivor, name, True)
+                changed.add(name)
+    return changed
+
+
+def _move_addresses(mapping: Dict[int, int]) -> int:
+    target = Case(*(When(contact_id=dup, then=Value(keep)) for dup, keep in mapping.items()), output_field=IntegerField())
+    return Address.objects.filter(contact_id__in=list(mapping)).update(contact_id=target)
+
+
+def _move_links(mapping: Dict[int, int]) -> int:
+    """Categorias dos duplicados -> contato mantido; devolve só os vínculos realmente novos."""
+    Through = Contact.categories.through
+    new = {
+        (mapping[contact_id], category_id)
+        for contact_id, category_id in Through.objects.filter(contact_id__in=list(mapping)).values_list("contact_id", "category_id")
+    }
+    if not new:
+        return 0
+    new -= set(
+        Through.objects.filter(contact_id__in={keep for keep, _cat in new}).values_list("contact_id", "category_id")
+    )
+    Through.objects.bulk_create([Through(contact_id=c, category_id=cat) for c, cat in new], ignore_conflicts=True)
+    return len(new)
+
+
+def _merge_batch(clusters: List[Cluster], result: MergeResult) -> None:
+    mapping = {dup: c.survivor for c in clusters for dup in c.duplicates}
+    contacts = Contact.objects.in_bulk([pk for c in clusters for pk in c.ids])
+    now = timezone.now()
+    survivors: List[Contact] = []
+    fields: Set[str] = set()
+    for cluster in clusters:
+        keep = contacts.get(cluster.survivor)
+        dups = [contacts[pk] for pk in cluster.duplicates if pk in contacts]
+        if keep is None or not dups:  # alterado desde a busca
+            continue
+        changed = _absorb(keep, dups)
+        if changed:
+            keep.updated_at = now
+            fields |= changed | {"updated_at"}
+            survivors.append(keep)
+        result.clusters += 1
+    mapping = {dup: keep for dup, keep in mapping.items() if dup in contacts and keep in contacts}
+    if not mapping:
+        return
+
+    result.addresses += _move_addresses(mapping)
+    result.links += _move_links(mapping)
+    result.products += repoint_people_links(mapping)
+    # CASCADE: palavras do autocomplete e vínculos de categoria dos duplicados
+    Contact.objects.filter(pk__in=list(mapping)).delete()
+    result.merged += len(mapping)
+
+    if survivors:
+        for keep in survivors:
+            keep.search_key = keep.build_search_key()
+            keep.set_match_keys()
+        fields |= {"search_key", *Contact.MATCH_KEY_FIELDS}
+        Contact.objects.bulk_update(survivors, sorted(fields), batch_size=500)
+        sync_search_keys(survivors)
+
+
+def merge_clusters(clusters: Iterable[Cluster], *, batch_size: int = DEFAULT_BATCH_SIZE) -> MergeResult:
+    """Mescla os grupos (duplicados -> survivor), um lote de grupos por transação."""
+    result = MergeResult()
+    for batch in chunked(clusters, batch_size):
+        with transaction.atomic():
+            _merge_batch(batch, result)
+    invalidate_counts(COUNT_NAMESPACE)
+    return result
@@ -0,0 +1,338 @@
+# -*- coding: utf-8 -*-
+"""
+Importação de contatos via CSV (modelo em /people/import-template.csv).
+
+Usado pelo worker de importações (catalog/services/import_jobs.py), fora do
+request. Processa em chunks, cada um numa transação, para permitir retomada
+a partir do checkpoint gravado no ImportJob.
+
+Por chunk (upsert), em vez de get_or_create/save/set linha a linha:
+- 1 SELECT dos contatos existentes, pelas colunas indexadas cnpj_digits,
+  cpf_digits, email_lower e nome (prioridade nessa ordem; ver _Matcher);
+- bulk_create (novos) + bulk_update (alterados; iguais são pulados);
+- categorias: mapa nome -> id carregado uma vez por importação; nomes novos
+  entram num bulk_create por chunk;
+- vínculos contato-categoria direto na tabela intermediária: 1 SELECT,
+  1 DELETE (removidos) e 1 bulk_create (novos);
+- palavras do autocomplete e totais da lista atualizados no fim do chunk
+  (bulk_* não dispara post_save).
+Linhas inválidas (sem nome, texto maior que a coluna) são puladas e
+registradas em ImportResult.errors, antes da escrita.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.text import slugify
+
+from crontex.imports import DEFAULT_CHUNK_SIZE, ChunkCallback, ImportResult, chunked
+from crontex.pagination import invalidate_counts
+from crontex.streaming import csv_dict_rows
+from people.models import Category, Contact
+from people.services.contact_search import COUNT_NAMESPACE, sync_search_keys
+from people.utils import normalize_cnpj, normalize_cpf, normalize_email
+
+ROLES_HEADER = "roles (cliente|fornecedor|colaborador|parceiro separados por ,)"
+CATEGORIES_HEADER = "categories (nomes separados por ,)"
+
+# colunas do CSV gravadas em Contact (além de name e dos papéis)
+TEXT_FIELDS = ("person_kind", "email", "phone", "cpf", "cnpj")
+ROLE_FIELDS = ("is_cliente", "is_fornecedor", "is_colaborador", "is_parceiro")
+
+_BATCH_SIZE = 500
+# colunas lidas dos contatos existentes (comparação + chaves derivadas)
+_LOADED_FIELDS = ("id", "search_key", *TEXT_FIELDS, *ROLE_FIELDS, *Contact.SEARCH_FIELDS, *Contact.MATCH_KEY_FIELDS)
+
+
+def _to_bool_roles(tokens: Iterable[str]) -> dict[str, bool]:
+    t = {x.strip().lower() for x in tokens if x.strip()}
+    return {
+        "is_cliente": "cliente" in t,
+        "is_fornecedor": "fornecedor" in t,
+        "is_colaborador": "colaborador" in t,
+        "is_parceiro": "parceiro" in t,
+    }
+
+
+def iter_contact_rows(binary: Any) -> Iterator[Dict[str, str]]:
+    """
+    Gera um dict por linha do CSV (UTF-8, com fallback Latin-1), em streaming:
+    o arquivo é decodificado bloco a bloco (crontex/streaming.py).
+    """
+    yield from csv_dict_rows(binary, allow_empty=False)
+
+
+@dataclass
+class ContactRow:
+    line: int
+    name: str
+    values: Dict[str, Any] = field(default_factory=dict)
+    categories: List[str] = field(default_factory=list)
+    errors: List[str] = field(default_factory=list)
+
+    @property
+    def match_keys(self) -> Dict[str, str]:
+        """Mesma normalização de Contact.set_match_keys()."""
+        return {
+            "cnpj_digits": normalize_cnpj(self.values.get("cnpj")),
+            "cpf_digits": normalize_cpf(self.values.get("cpf")),
+            "email_lower": normalize_email(self.values.get("email")),
+        }
+
+
+def _max_length(name: str) -> Optional[int]:
+    return Contact._meta.get_field(name).max_length
+
+
+def parse_row(line: int, row: Dict[str, str]) -> Optional[ContactRow]:
+    """Linha do CSV -> ContactRow (com errors se inválida); None = linha sem nome (ignorada)."""
+    name = (row.get("name") or "").strip()
+    if not name:
+        # MVP: pula linhas sem nome
+        return None
+
+    # "FISICA"/"JURIDICA" (modelo) ou "F"/"J"; colunas são NOT NULL -> "" quando vazio
+    person_kind = (row.get("person_kind") or "").strip().upper()[:1]
+    if person_kind not in ("F", "J"):
+        person_kind = ""
+    values: Dict[str, Any] = {"person_kind": person_kind}
+    for col in TEXT_FIELDS[1:]:
+        values[col] = (row.get(col) or "").strip()
+    values.update(_to_bool_roles((row.get(ROLES_HEADER) or "").split(",")))
+
+    cat_names = [x.strip() for x in (row.get(CATEGORIES_HEADER) or "").split(",") if x.strip()]
+    parsed = ContactRow(line, name, values, list(dict.fromkeys(cat_names)))
+
+    # sem savepoint por linha na escrita em lote: o que o banco recusaria é barrado aqui
+    for col, value in (("name", name), *((f, values[f]) for f in TEXT_FIELDS)):
+        limit = _max_length(col)
+        if limit and len(value) > limit:
+            parsed.errors.append(f"{col}: máximo de {limit} caracteres ({len(value)}).")
+    limit = Category._meta.get_field("name").max_length
+    if any(len(cn) > limit for cn in parsed.categories):
+        parsed.errors.append(f"categories: máximo de {limit} caracteres por nome.")
+    return parsed
+
+
+class CategoryMap:
+    """Categorias por nome -> id, carregadas uma vez; nomes novos criados em lote."""
+
+    def __init__(self) -> None:
+        self.ids: Dict[str, int] = {}
+        self.slugs: Set[str] = set()
+        for pk, name, slug in Category.objects.values_list("id", "name", "slug"):
+            self.ids[name] = pk
+            self.slugs.add(slug)
+
+    def _slug(self, name: str) -> str:
+        limit = Category._meta.get_field("slug").max_length
+        base = (slugify(name) or "categoria")[: limit - 8]
+        slug, n = base, 1
+        while slug in self.slugs:
+            n += 1
+            slug = f"{base}-{n}"
+        self.slugs.add(slug)
+        return slug
+
+    def resolve(self, names: Iterable[str]) -> Dict[str, int]:
+        """{nome: id} dos nomes pedidos, criando os que faltam (1 INSERT + 1 SELECT por chamada)."""
+        names = list(dict.fromkeys(names))
+        missing = [n for n in names if n not in self.ids]
+        if missing:
+            now = timezone.now()
+            Category.objects.bulk_create(
+                [Category(name=n, slug=self._slug(n), created_at=now) for n in missing],
+                batch_size=_BATCH_SIZE,
+                ignore_conflicts=True,  # criada em paralelo: o id vem do SELECT abaixo
+            )
+            self.ids.update(Category.objects.filter(name__in=missing).values_list("name", "id"))
+        return {n: self.ids[n] for n in names if n in self.ids}
+
+
+class _Matcher:
+    """
+    Contato de cada linha, pelas chaves indexadas: CNPJ, CPF, e-mail e, por
+    último, nome. E-mail/nome só valem se o contato não tem outro CPF/CNPJ
+    (homônimo ou e-mail compartilhado de outra empresa vira contato novo).
+    Contatos criados/alterados no chunk entram no índice, então linhas
+    repetidas caem no mesmo contato, como na importação linha a linha.
+    """
+
+    KEYS = ("cnpj_digits", "cpf_digits", "email_lower", "name")
+
+    def __init__(self, rows: List[ContactRow]) -> None:
+        self.index: Dict[str, Dict[str, Contact]] = {key: {} for key in self.KEYS}
+        wanted: Dict[str, Set[str]] = {key: set() for key in self.KEYS}
+        for row in rows:
+            for key, value in (*row.match_keys.items(), ("name", row.name)):
+                if value:
+                    wanted[key].add(value)
+        query = Q()
+        for key, values in wanted.items():
+            if values:
+                query |= Q(**{f"{key}__in": list(values)})
+        # 1 consulta (OR de buscas indexadas); duplicados no banco: vale o mais antigo
+        for obj in Contact.objects.filter(query).only(*_LOADED_FIELDS).order_by("-pk"):
+            for key in self.KEYS:
+                value = getattr(obj, key)
+                if value:
+                    self.index[key][value] = obj
+
+    def add(self, obj: Contact) -> None:
+        for key in self.KEYS:
+            value = getattr(obj, key)
+            if value:
+                self.index[key].setdefault(value, obj)
+
+    @staticmethod
+    def _conflicts(obj: Contact, keys: Dict[str, str]) -> bool:
+        return any(keys[k] and getattr(obj, k) and getattr(obj, k) != keys[k] for k in ("cnpj_digits", "cpf_digits"))
+
+    def match(self, row: ContactRow) -> Optional[Contact]:
+        keys = row.match_keys
+        for key in ("cnpj_digits", "cpf_digits"):
+            if keys[key] and keys[key] in self.index[key]:
+                return self.index[key][keys[key]]
+        for key, value in (("email_lower", keys["email_lower"]), ("name", row.name)):
+            obj = self.index[key].get(value) if value else None
+            if obj is not None and not self._conflicts(obj, keys):
+                return obj
+        return None
+
+
+def _write_links(links: Dict[int, Set[int]]) -> Set[int]:
+    """
+    Substitui as categorias dos contatos informados (equivale a categories.set, em lote).
+    Devolve os contatos cujos vínculos mudaram.
+    """
+    if not links:
+        return set()
+    Through = Contact.categories.through
+    stale: List[int] = []
+    changed: Set[int] = set()
+    for pk, contact_id, category_id in Through.objects.filter(contact_id__in=list(links)).values_list(
+        "id", "contact_id", "category_id"
+    ):
+        wanted = links[contact_id]
+        if category_id in wanted:
+            wanted.discard(category_id)  # já vinculada
+        else:
+            stale.append(pk)
+            changed.add(contact_id)
+    if stale:
+        Through.objects.filter(pk__in=stale).delete()
+    new = [Through(contact_id=cid, category_id=cat) for cid, cats in links.items() for cat in cats]
+    if new:
+        Through.objects.bulk_create(new, batch_size=_BATCH_SIZE, ignore_conflicts=True)
+        changed.update(link.contact_id for link in new)
+    return changed
+
+
+def write_chunk(rows: List[ContactRow], result: ImportResult, categories: CategoryMap) -> None:
+    """Upsert de um chunk de linhas válidas. Deve rodar dentro de transaction.atomic()."""
+    if not rows:
+        return
+    matcher = _Matcher(rows)
+
+    now = timezone.now()
+    to_create: List[Contact] = []
+    to_update: Dict[int, Contact] = {}
+    update_fields: Set[str] = {"updated_at"}
+    links: Dict[int, Tuple[Contact, List[str]]] = {}  # id(obj) -> categorias (novos ainda sem pk)
+    pending: List[Contact] = []  # casados sem campo alterado: contam conforme as categorias
+    for row in rows:
+        obj = matcher.match(row)
+        if obj is None:
+            obj = Contact(name=row.name, created_at=now, updated_at=now, **row.values)
+            to_create.append(obj)
+            result.created += 1
+        else:
+            # atualiza campos básicos se vierem preenchidos (papéis sempre; nome, se achado por documento/e-mail)
+            values = {"name": row.name, **row.values}
+            changed = [f for f, v in values.items() if v not in (None, "") and getattr(obj, f) != v]
+            for f in changed:
+                setattr(obj, f, values[f])
+            if changed:
+                result.updated += 1
+            elif row.categories:
+                pending.append(obj)
+            else:
+                result.unchanged += 1
+            if obj.pk is not None and changed:
+                obj.updated_at = now
+                update_fields.update(changed)
+                to_update[obj.pk] = obj
+        obj.set_match_keys()
+        matcher.add(obj)
+        if row.categories:
+            links[id(obj)] = (obj, row.categories)
+
+    for obj in to_create:
+        obj.search_key = obj.build_search_key()
+    if update_fields & set(Contact.SEARCH_FIELDS):
+        update_fields.add("search_key")
+        for obj in to_update.values():
+            obj.search_key = obj.build_search_key()
+    if update_fields & set(Contact.MATCH_FIELDS):
+        update_fields.update(Contact.MATCH_KEY_FIELDS)
+
+    if to_create:
+        Contact.objects.bulk_create(to_create, batch_size=_BATCH_SIZE)
+    if to_update:
+        Contact.objects.bulk_update(list(to_update.values()), sorted(update_fields), batch_size=_BATCH_SIZE)
+
+    # categorias: só das linhas que trazem a coluna preenchida (vazia mantém as atuais)
+    relinked: Set[int] = set()
+    if links:
+        cat_ids = categories.resolve(cn for _obj, names in links.values() for cn in names)
+        relinked = _write_links({obj.pk: {cat_ids[cn] for cn in names if cn in cat_ids} for obj, names in links.values()})
+    for obj in pending:
+        if obj.pk in relinked:
+            result.updated += 1
+        else:
+            result.unchanged += 1
+
+    # bulk_* não dispara post_save: palavras do autocomplete e totais/cache da lista aqui
+    reindexed = to_create + (list(to_update.values()) if "search_key" in update_fields else [])
+    if reindexed:
+        sync_search_keys(reindexed)
+    invalidate_counts(COUNT_NAMESPACE)
+
+
+def import_contacts(
+    raw_rows: Iterable[Dict[str, str]],
+    *,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    start_row: int = 0,
+    result: Optional[ImportResult] = None,
+    on_chunk: Optional[ChunkCallback] = None,
+) -> ImportResult:
+    """
+    Importa contatos (match por CNPJ, CPF, e-mail, nome). Mesma assinatura de bling_import.import_rows.
+    """
+    result = result or ImportResult()
+    categories = CategoryMap()
+    rows_done = start_row
+    for chunk in chunked(enumerate(islice(raw_rows, start_row, None), start=2 + start_row), chunk_size):
+        valid: List[ContactRow] = []
+        for line, raw in chunk:
+            row = parse_row(line, raw)
+            if row is None:
+                continue
+            if row.errors:
+                result.record_error(line, row.name, row.errors)
+            else:
+                valid.append(row)
+        with transaction.atomic():
+            write_chunk(valid, result, categories)
+            rows_done += len(chunk)
+            result.rows += len(chunk)
+            if on_chunk is not None:
+                on_chunk(result, rows_done)
+    return result
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""
+Resolução de IDs de contato em lote, por request.
+
+O formulário de produto tem 13 pares pessoa (texto + *_id). Antes cada par
+fazia uma consulta ao hidratar o texto, outra no clean do campo (exists) e
+outra no clean do form (nome oficial). Com o resolver, o form registra todos
+os IDs que pode precisar (want) e a primeira leitura busca todos de uma vez
+(in_bulk); as seguintes saem do dicionário.
+
+    contacts = ContactResolver()
+    contacts.want(3, "7", None)
+    contacts.name(3)      # 1 consulta para 3 e 7
+    contacts.exists(7)    # sem consulta
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, List, Optional
+
+from people.models import Contact
+
+# colunas usadas pelo texto exibido (Contact.__str__) e pelo subtítulo da API
+_FIELDS = ("id", "name", "cpf", "cnpj", "email", "phone")
+
+
+def as_contact_id(value: Any) -> Optional[int]:
+    """"12"/12 -> 12; vazio, zero, negativo ou lixo -> None."""
+    try:
+        pk = int(value)
+    except (TypeError, ValueError):
+        return None
+    return pk if pk > 0 else None
+
+
+class ContactResolver:
+    def __init__(self, ids: Iterable[Any] = ()) -> None:
+        self._pending: set[int] = set()
+        self._loaded: Dict[int, Optional[Contact]] = {}
+        self.want(*ids)
+
+    def want(self, *ids: Any) -> None:
+        """Registra IDs para a próxima busca (valores inválidos são ignorados)."""
+        for value in ids:
+            pk = as_contact_id(value)
+            if pk is not None and pk not in self._loaded:
+                self._pending.add(pk)
+
+    def _load(self) -> None:
+        if not self._pending:
+            return
+        found = Contact.objects.only(*_FIELDS).in_bulk(list(self._pending))
+        for pk in self._pending:
+            self._loaded[pk] = found.get(pk)
+        self._pending.clear()
+
+    def get(self, value: Any) -> Optional[Contact]:
+        pk = as_contact_id(value)
+        if pk is None:
+            return None
+        if pk not in self._loaded:
+            self._pending.add(pk)
+            self._load()
+        return self._loaded[pk]
+
+    def many(self, values: Iterable[Any]) -> List[Contact]:
+        """Contatos existentes, na ordem pedida, sem repetição."""
+        values = list(values)
+        self.want(*values)
+        self._load()
+        out: Dict[int, Contact] = {}
+        for value in values:
+            contact = self.get(value)
+            if contact is not None:
+                out.setdefault(contact.pk, contact)
+        return list(out.values())
+
+    def exists(self, value: Any) -> bool:
+        return self.get(value) is not None
+
+    def name(self, value: Any) -> str:
+        """Texto exibido do contato ("" se não existir)."""
+        contact = self.get(value)
+        return "" if contact is None else (contact.name or str(contact))
@@ -0,0 +1,226 @@
+# -*- coding: utf-8 -*-
+"""
+Autocomplete de contatos (/people/api/search/, formulário de produto).
+
+- Contact.search_key: nome/fantasia/e-mail sem acento e em minúsculas +
+  dígitos de telefone/CPF/CNPJ; cada palavra vira uma linha de
+  ContactSearchKey, indexada por (key, contact).
+- Consulta: cada termo é prefixo de alguma palavra ("mar sil" acha "Maria da
+  Silva"; "(11) 98" acha o telefone). O termo (o mais seletivo, se vários)
+  percorre o índice por faixa (key >= t AND key < t + U+FFFF), em ordem, e
+  para ao juntar as linhas da página; os demais termos são conferidos pelo
+  índice (contact, key), no máximo _PROBE candidatos por consulta.
+- Cache por prefixo: a consulta guarda até CONTACT_SEARCH_CACHE_ROWS linhas.
+  Se a lista de um prefixo está completa ("ma" com 40 contatos), as teclas
+  seguintes ("mar", "mari") são filtradas em memória, sem banco. A versão do
+  namespace "people.contact" (crontex/pagination.py) troca a cada escrita em
+  Contact, então o cache nunca mostra contato alterado/excluído.
+
+Sincronização das palavras: save()/delete() -> people/signals.py;
+bulk_create/bulk_update ou SQL direto -> reindex_contacts().
+"""
+
+from __future__ import annotations
+
+import hashlib
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import Exists, OuterRef, Q
+
+from crontex.pagination import invalidate_counts, namespace_version
+from people.models import Contact, ContactSearchKey
+from people.utils import search_terms
+
+COUNT_NAMESPACE = "people.contact"
+DEFAULT_CACHE_ROWS = 200
+DEFAULT_CACHE_SECONDS = 300
+_HIGH = "\uffff"
+_ID_CHUNK = 500
+_PROBE = 2000  # vários termos: teto de candidatos do termo mais seletivo (custo por consulta)
+
+# (id, texto, subtítulo, search_key)
+Row = Tuple[int, str, str, str]
+_ROW_FIELDS = ("name", "email", "phone", "search_key")
+
+
+def _cache_rows() -> int:
+    return int(getattr(settings, "CONTACT_SEARCH_CACHE_ROWS", DEFAULT_CACHE_ROWS))
+
+
+def _matches(key: str, terms: Sequence[str]) -> bool:
+    """Cada termo é início de alguma palavra da chave."""
+    return all(key.startswith(t) or f" {t}" in key for t in terms)
+
+
+def _distinct_rows(values: Iterable[Tuple[Any, ...]], limit: int) -> List[Row]:
+    """(id, name, email, phone, key) -> linhas, sem repetir contato ("ana" casa 2x em "Ana Mariana")."""
+    rows: Dict[int, Row] = {}
+    for pk, name, email, phone, key in values:
+        if pk not in rows:
+            rows[pk] = (pk, name, email or phone, key)
+            if len(rows) >= limit:
+                break
+    return list(rows.values())
+
+
+def _key_range(term: str) -> Q:
+    return Q(key__gte=term, key__lt=term + _HIGH)
+
+
+def _lead(terms: Sequence[str]) -> Tuple[str, int]:
+    """Termo que percorre o índice (o de menos palavras casadas) e quantas casou, até _PROBE."""
+    hits = {t: ContactSearchKey.objects.filter(_key_range(t))[:_PROBE].count() for t in dict.fromkeys(terms)}
+    lead = min(hits, key=lambda t: (hits[t], -len(t)))
+    return lead, hits[lead]
+
+
+def _fetch(terms: Sequence[str], role: str, offset: int, limit: int) -> Tuple[List[Row], bool]:
+    """
+    Banco: linhas [offset, offset + limit) da consulta, na ordem do índice, e se
+    a busca foi truncada (vários termos, todos com mais de _PROBE palavras).
+    """
+    if not terms:
+        qs = Contact.objects.order_by("name", "id")
+        if role:
+            qs = qs.filter(categories__slug__iexact=role).distinct()
+        return _distinct_rows(qs.values_list("id", *_ROW_FIELDS)[offset: offset + limit], limit), False
+
+    distinct = list(dict.fromkeys(terms))
+    lead, hits = _lead(distinct) if len(distinct) > 1 else (distinct[0], 0)
+    qs = ContactSearchKey.objects.filter(_key_range(lead))
+    truncated = hits >= _PROBE
+    if truncated:
+        # todos os termos amplos ("maria silva q"): só os _PROBE primeiros do índice viram candidatos —
+        # custo limitado; a próxima tecla estreita o termo e a busca volta a ser exata
+        for key, cid in qs.order_by("key", "contact_id").values_list("key", "contact_id")[_PROBE - 1: _PROBE]:
+            qs = qs.filter(Q(key__lt=key) | Q(key=key, contact_id__lte=cid))
+    for term in distinct:
+        if term != lead:
+            # demais termos pelo índice único (contact, key), sem ler a linha do contato
+            qs = qs.filter(Exists(ContactSearchKey.objects.filter(_key_range(term), contact_id=OuterRef("contact_id"))))
+    if role:
+        qs = qs.filter(contact__categories__slug__iexact=role)
+
+    # colunas do contato pelo próprio join, na ordem do índice (key, contact); para ao juntar a página
+    wanted = offset + limit
+    values = qs.order_by("key", "contact_id").values_list("contact_id", *(f"contact__{f}" for f in _ROW_FIELDS))
+    return _distinct_rows(values.iterator(chunk_size=max(wanted, 100)), wanted)[offset:], truncated
+
+
+def _cache_key(version: Any, role: str, norm: str) -> str:
+    digest = hashlib.sha1(f"{role}\x00{norm}".encode("utf-8")).hexdigest()
+    return f"contactac:{version}:{digest}"
+
+
+def _cached(terms: List[str], role: str) -> Tuple[List[Row], bool, bool]:
+    """
+    Primeiras linhas da consulta, se a lista está completa (paginação sem banco)
+    e se é exata (serve de base para prefixos mais longos: "mar" a partir de "ma").
+    """
+    norm = " ".join(terms)
+    version = namespace_version(COUNT_NAMESPACE)
+    prefixes = list(dict.fromkeys(norm[:n].rstrip() for n in range(len(norm), -1, -1)))
+    keys = {p: _cache_key(version, role, p) for p in prefixes}
+    found = cache.get_many(list(keys.values()))
+    ttl = int(getattr(settings, "CONTACT_SEARCH_CACHE_SECONDS", DEFAULT_CACHE_SECONDS))
+
+    exact = found.get(keys[norm])
+    if exact is not None:
+        return exact
+    for prefix in prefixes[1:]:
+        entry = found.get(keys[prefix])
+        if entry is not None and entry[1] and entry[2]:
+            entry = ([r for r in entry[0] if _matches(r[3], terms)], True, True)
+            cache.set(keys[norm], entry, ttl)
+            return entry
+
+    size = _cache_rows()
+    rows, truncated = _fetch(terms, role, 0, size + 1)
+    complete = len(rows) <= size
+    if complete and terms:
+        rows.sort(key=lambda r: (r[3], r[0]))  # lista inteira: ordem alfabética (chave começa pelo nome)
+    entry = (rows[:size], complete, complete and not truncated)
+    cache.set(keys[norm], entry, ttl)
+    return entry
+
+
+def search_contacts(q: str, *, role: str = "", page: int = 1, page_size: int = 20) -> Tuple[List[Dict[str, Any]], bool]:
+    """Página do autocomplete: ([{"id", "text", "subtitle"}], há mais?)."""
+    terms = search_terms(q)
+    role = role.strip().lower()
+    start = (page - 1) * page_size
+    end = start + page_size
+
+    rows, complete, _exact = _cached(terms, role)
+    if complete or end < len(rows):
+        chunk = rows[start: end + 1]
+    else:
+        chunk, _truncated = _fetch(terms, role, start, page_size + 1)  # além do que cabe no cache
+
+    results = [{"id": pk, "text": text, "subtitle": subtitle} for pk, text, subtitle, _key in chunk[:page_size]]
+    return results, len(chunk) > page_size
+
+
+# ---------- manutenção das palavras ----------
+
+def sync_search_keys(contacts: Iterable[Contact]) -> None:
+    """Acerta ContactSearchKey com a search_key atual dos contatos (insere/remove só a diferença)."""
+    wanted = {c.pk: set(c.search_key.split()) for c in contacts}
+    if not wanted:
+        return
+    stale: List[int] = []
+    for row_id, cid, key in ContactSearchKey.objects.filter(contact_id__in=list(wanted)).values_list("id", "contact_id", "key"):
+        if key in wanted[cid]:
+            wanted[cid].discard(key)
+        else:
+            stale.append(row_id)
+    if stale:
+        ContactSearchKey.objects.filter(pk__in=stale).delete()
+    new = [(cid, key) for cid, keys in wanted.items() for key in keys]
+    if new:
+        # executemany: ~8 palavras por contato; bulk_create monta um objeto por palavra (importação em lote)
+        qn = connection.ops.quote_name
+        sql = f"INSERT INTO {qn(ContactSearchKey._meta.db_table)} (contact_id, {qn('key')}) VALUES (%s, %s) ON CONFLICT DO NOTHING"
+        with connection.cursor() as cur:
+            cur.executemany(sql, new)
+
+
+def _reindex_batch(batch: List[Contact]) -> None:
+    changed = []
+    for c in batch:
+        key = c.build_search_key()
+        if key != c.search_key:
+            c.search_key = key
+            changed.append((key, c.pk))
+    with transaction.atomic():
+        if changed:
+            # executemany: o bulk_update (CASE WHEN por linha) custa mais que o resto do reindex
+            with connection.cursor() as cur:
+                cur.executemany(f"UPDATE {Contact._meta.db_table} SET search_key = %s WHERE id = %s", changed)
+        sync_search_keys(batch)
+
+
+def reindex_contacts(pks: Optional[Iterable[int]] = None) -> int:
+    """
+    Recalcula search_key e as palavras dos contatos informados (None = todos),
+    em blocos; para gravações que não passam por save() (bulk_create/bulk_update).
+    """
+    qs = Contact.objects.only("id", "search_key", *Contact.SEARCH_FIELDS).order_by("pk")
+    total = 0
+    if pks is None:
+        last = 0
+        while batch := list(qs.filter(pk__gt=last)[:_ID_CHUNK]):
+            _reindex_batch(batch)
+            total += len(batch)
+            last = batch[-1].pk
+    else:
+        ids = sorted(set(pks))
+        for i in range(0, len(ids), _ID_CHUNK):
+            batch = list(qs.filter(pk__in=ids[i: i + _ID_CHUNK]))
+            _reindex_batch(batch)
+            total += len(batch)
+    invalidate_counts(COUNT_NAMESPACE)  # bulk_update não dispara sinais: descarta o cache do autocomplete
+    return total
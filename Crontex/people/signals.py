@@ -0,0 +1,18 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from people.models import Contact
+from people.services.contact_search import sync_search_keys
+
+
+@receiver(post_save, sender=Contact)
+def index_contact(sender, instance: Contact, created: bool, update_fields=None, raw=False, **kwargs):
+    # search_key já foi recalculada em Contact.save(); exclusão: CASCADE em ContactSearchKey
+    if raw:
+        return
+    if update_fields is not None and "search_key" not in update_fields:
+        return  # ex.: save(update_fields=["status"]) não mexe no texto buscável
+    sync_search_keys([instance])
@@ -33,6 +33,8 @@ urlpatterns = [
     #   -> {"results":[{"id":1,"text":"Nome","subtitle":"email/phone"}], "pagination":{"more":false}}
     #   /people/api/get/?id=<pk>
     #   -> {"id":1,"text":"Nome","subtitle":"..."}
+    #   /people/api/get/?ids=1,2,3
+    #   -> {"results":[{"id":1,"text":"Nome","subtitle":"..."}, ...]}
     path("api/search/", views.contact_search_api, name="api_search"),
     path("api/get/", views.contact_get_api, name="api_get"),
 ]
@@ -2,9 +2,13 @@
 from __future__ import annotations
 
 import re
-from typing import Optional
+import unicodedata
+from typing import Iterable, List, Optional
 
 _ONLY_DIGITS_RE = re.compile(r"\D+")
+_NON_ALNUM_RE = re.compile(r"[^0-9a-z]+")
+_HAS_LETTER_RE = re.compile(r"[^\W\d_]")
+SEARCH_TOKEN_MAX = 64
 
 def only_digits(s: Optional[str]) -> str:
     return "" if not s else _ONLY_DIGITS_RE.sub("", s)
@@ -24,3 +28,48 @@ def normalize_phone(s: Optional[str]) -> str:
 
 def normalize_uf(s: Optional[str]) -> str:
     return "" if not s else s.strip().upper()[:2]
+
+def normalize_email(s: Optional[str]) -> str:
+    return "" if not s else s.strip().lower()
+
+
+# ---------- chave de busca (autocomplete de contatos) ----------
+
+def fold(s: Optional[str]) -> str:
+    """Minúsculas, sem acentos, só [0-9a-z] separados por espaço: "João D'Ávila" -> "joao d avila"."""
+    if not s:
+        return ""
+    plain = unicodedata.normalize("NFKD", s).encode("ascii", "ignore").decode("ascii").lower()
+    return _NON_ALNUM_RE.sub(" ", plain).strip()
+
+
+def search_terms(q: Optional[str]) -> List[str]:
+    """
+    Termos de uma consulta de autocomplete. Sem letras (telefone, CPF/CNPJ com
+    máscara) vira um termo só de dígitos: "(11) 9999-" -> ["119999"].
+    """
+    if not q:
+        return []
+    if not _HAS_LETTER_RE.search(q):
+        digits = only_digits(q)
+        return [digits] if digits else []
+    return fold(q).split()
+
+
+def contact_search_key(
+    *, name: str = "", fantasy_name: str = "", email: str = "",
+    phones: Iterable[Optional[str]] = (), documents: Iterable[Optional[str]] = (),
+) -> str:
+    """
+    Chave normalizada de um contato: palavras de nome/fantasia/e-mail (fold) e
+    dígitos de telefones/CPF/CNPJ, sem repetição, separadas por espaço.
+    Telefone com DDI 55 entra também sem ele ("(11) 9..." acha "+5511 9...").
+    """
+    tokens = fold(name).split() + fold(fantasy_name).split() + fold(email).split()
+    for phone in phones:
+        digits = only_digits(phone)
+        tokens.append(digits)
+        if digits.startswith("55") and len(digits) >= 12:
+            tokens.append(digits[2:])
+    tokens += [only_digits(d) for d in documents]
+    return " ".join(dict.fromkeys(t[:SEARCH_TOKEN_MAX] for t in tokens if t))
@@ -3,17 +3,23 @@ from __future__ import annotations
 
 import csv
 import io
-from typing import Any, Optional, cast, Iterable
+from typing import Any, Optional, cast
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.db.models import Q, QuerySet
-from django.http import HttpRequest, HttpResponse
+from django.http import HttpRequest, HttpResponse, StreamingHttpResponse
 from django.shortcuts import redirect, render
 from django.urls import reverse_lazy
 from django.views.generic import CreateView, DeleteView, DetailView, ListView, UpdateView
 
+from catalog.models import ImportJob
+from catalog.services.import_jobs import enqueue_import
+from crontex.pagination import KeysetPaginationMixin
+from crontex.streaming import gzip_chunks, iter_csv_bytes
+
 from .forms import ContactForm, build_address_formset, ContactImportForm
 from .models import Contact, ContactStatus, Category  # Category deve existir no seu models (M2M de Contact)
+from .services.contact_export import iter_export_rows
 
 
 def ping(request: HttpRequest) -> HttpResponse:
@@ -33,14 +39,17 @@ class StaffRequiredMixin(UserPassesTestMixin):
         return u.is_authenticated and (u.is_staff or u.is_superuser)
 
 
-class ContactListView(LoginRequiredMixin, ListView):
+class ContactListView(LoginRequiredMixin, KeysetPaginationMixin, ListView):
     model = Contact
     template_name = "people/contact_list.html"
     context_object_name = "contacts"
     paginate_by = 20
+    # cursor ?after= (created_at, id); id desempata contatos criados no mesmo instante
+    keyset_ordering = ("-created_at", "-id")
+    count_namespace = "people.contact"
 
     def get_queryset(self) -> QuerySet[Contact]:
-        qs: QuerySet[Contact] = Contact.objects.filter(is_deleted=False).order_by("-created_at")
+        qs: QuerySet[Contact] = Contact.objects.filter(is_deleted=False).order_by(*self.keyset_ordering)
         q = (self.request.GET.get("q") or "").strip()
         status = (self.request.GET.get("status") or "").strip()
 
@@ -163,33 +172,18 @@ class ContactDeleteView(StaffRequiredMixin, DeleteView):
 
 
 # ---------- CSV: export ----------
-def export_contacts_csv(request: HttpRequest) -> HttpResponse:
+def export_contacts_csv(request: HttpRequest) -> StreamingHttpResponse:
     """
     Exporta contatos (sem endereços) em ; (Excel-friendly). Se ?bom=1, inclui BOM UTF-8.
+    Se ?gzip=1, baixa contatos.csv.gz. Em streaming: ver people/services/contact_export.py.
     """
-    qs = Contact.objects.filter(is_deleted=False).order_by("name")
-    delimiter = ";"
-    add_bom = request.GET.get("bom") == "1"
-
-    buf = io.StringIO()
-    writer = csv.writer(buf, delimiter=delimiter)
-    writer.writerow(["id","name","person_kind","email","phone","cpf","cnpj","status","roles","categories"])
-    for c in qs:
-        roles = ",".join([r for r, flag in {
-            "cliente": c.is_cliente,
-            "fornecedor": c.is_fornecedor,
-            "colaborador": c.is_colaborador,
-            "parceiro": c.is_parceiro,
-        }.items() if flag])
-        cats = ",".join(c.categories.values_list("name", flat=True))
-        writer.writerow([c.id, c.name, c.person_kind, c.email, c.phone, c.cpf, c.cnpj, c.status, roles, cats])
-
-    data = buf.getvalue()
-    resp = HttpResponse(content_type="text/csv; charset=utf-8")
-    if add_bom:
-        resp.write("\ufeff")  # BOM
-    resp.write(data)
-    resp["Content-Disposition"] = 'attachment; filename="contatos.csv"'
+    chunks = iter_csv_bytes(iter_export_rows(), delimiter=";", bom=request.GET.get("bom") == "1")
+    if request.GET.get("gzip") == "1":
+        resp = StreamingHttpResponse(gzip_chunks(chunks), content_type="application/gzip")
+        resp["Content-Disposition"] = 'attachment; filename="contatos.csv.gz"'
+    else:
+        resp = StreamingHttpResponse(chunks, content_type="text/csv; charset=utf-8")
+        resp["Content-Disposition"] = 'attachment; filename="contatos.csv"'
     return resp
 
 
@@ -216,18 +210,6 @@ def download_import_template(request: HttpRequest) -> HttpResponse:
 
 
 # ---------- CSV: import ----------
-def _detect_delimiter(sample: str) -> str:
-    return ";" if sample.count(";") >= sample.count(",") else ","
-
-def _to_bool_roles(tokens: Iterable[str]) -> dict[str, bool]:
-    t = {x.strip().lower() for x in tokens if x.strip()}
-    return {
-        "is_cliente": "cliente" in t,
-        "is_fornecedor": "fornecedor" in t,
-        "is_colaborador": "colaborador" in t,
-        "is_parceiro": "parceiro" in t,
-    }
-
 def import_contacts_view(request: HttpRequest) -> HttpResponse:
     if request.method == "GET":
         form = ContactImportForm()
@@ -239,88 +221,10 @@ def import_contacts_view(request: HttpRequest) -> HttpResponse:
         messages.error(request, "Arquivo inválido.")
         return render(request, "people/contact_import.html", {"form": form})
 
-    f = form.cleaned_data["file"]
-    raw = f.read()
-    try:
-        text = raw.decode("utf-8")
-    except UnicodeDecodeError:
-        try:
-            text = raw.decode("latin1")
-        except Exception:
-            messages.error(request, "Não foi possível decodificar o arquivo (UTF-8 ou Latin-1).")
-            return render(request, "people/contact_import.html", {"form": form})
-
-    if not text.strip():
-        messages.error(request, "Arquivo vazio.")
-        return render(request, "people/contact_import.html", {"form": form})
-
-    delim = _detect_delimiter(text.splitlines()[0])
-    reader = csv.DictReader(io.StringIO(text), delimiter=delim)
-    created, updated, errors = 0, 0, 0
-    for i, row in enumerate(reader, start=2):  # header na linha 1
-        try:
-            name = (row.get("name") or "").strip()
-            if not name:
-                # MVP: pula linhas sem nome
-                continue
-
-            person_kind = (row.get("person_kind") or "").strip().upper() or None
-            email = (row.get("email") or "").strip() or None
-            phone = (row.get("phone") or "").strip() or None
-            cpf = (row.get("cpf") or "").strip() or None
-            cnpj = (row.get("cnpj") or "").strip() or None
-
-            roles_tokens = (row.get("roles (cliente|fornecedor|colaborador|parceiro separados por ,)") or "").split(",")
-            roles = _to_bool_roles(roles_tokens)
-
-            cat_names = [x.strip() for x in (row.get("categories (nomes separados por ,)") or "").split(",") if x.strip()]
-
-            obj, created_flag = Contact.objects.get_or_create(
-                name=name,
-                defaults={
-                    "person_kind": person_kind,
-                    "email": email,
-                    "phone": phone,
-                    "cpf": cpf,
-                    "cnpj": cnpj,
-                    **roles,
-                },
-            )
-            if not created_flag:
-                # Atualiza campos básicos se vierem preenchidos
-                for field, val in {
-                    "person_kind": person_kind,
-                    "email": email,
-                    "phone": phone,
-                    "cpf": cpf,
-                    "cnpj": cnpj,
-                    **roles,
-                }.items():
-                    if val not in (None, ""):
-                        setattr(obj, field, val)
-                obj.save()
-                updated += 1
-            else:
-                created += 1
-
-            # Categorias por nome (cria se não existir)
-            if cat_names:
-                cat_objs = []
-                for cn in cat_names:
-                    cobj, _ = Category.objects.get_or_create(name=cn)
-                    cat_objs.append(cobj)
-                obj.categories.set(cat_objs)  # substitui conjunto
-        except Exception as exc:
-            errors += 1
-            # Logaria erro linha a linha; por ora só segue.
-            continue
-
-    if errors:
-        messages.warning(request, f"Importação concluída: {created} criados, {updated} atualizados, {errors} linhas com erro.")
-    else:
-        messages.success(request, f"Importação concluída: {created} criados, {updated} atualizados.")
-
-    return redirect("people:list")
+    # roda fora do request (worker: manage.py run_import_jobs)
+    job = enqueue_import(ImportJob.Kind.CONTACTS, form.cleaned_data["file"], request.user)
+    messages.info(request, f"Importação #{job.pk} enfileirada.")
+    return redirect("catalog:import_job_detail", pk=job.pk)
 
 # --- [ADICIONAR AO FINAL DE people/views.py] ---------------------------------
 # Mini-API de autocomplete para integrar com o módulo catalog (texto + hidden id).
@@ -330,9 +234,14 @@ def import_contacts_view(request: HttpRequest) -> HttpResponse:
 
 from django.http import JsonResponse
 from django.db.models import Q
+from django.contrib.auth.decorators import login_required
 from django.views.decorators.http import require_GET
 
 from .models import Contact  # usa seu model real
+from .services.contact_resolver import ContactResolver
+from .services.contact_search import search_contacts
+
+GET_API_MAX_IDS = 100
 
 def _safe_int(val, default=1):
     """
@@ -344,135 +253,70 @@ def _safe_int(val, default=1):
     except Exception:
         return default
 
-# people/views.py  — SUBSTITUIR SOMENTE ESTA FUNÇÃO
-
 @require_GET
 def contact_search_api(request):
     """
-    GET /people/api/search/?q=<termo>&page=1&page_size=20[&type=supplier][&role=CLIENTE]
+    GET /people/api/search/?q=<termo>&page=1&page_size=20[&role=<slug da categoria>]
 
-    - 'q'     : termo de busca (name/email/phone, se existirem)
+    - 'q'     : início de palavra do nome/fantasia/e-mail, sem acento/maiúsculas,
+                ou dígitos de telefone/CPF/CNPJ (máscara ignorada); vários termos = todos
     - 'page'  : página (1-based)
-    - 'type'  : filtro opcional por Contact.type (se o model tiver esse campo)
-    - 'role'  : filtro compatível com seu front (data-role); tenta filtrar por:
-                * FK   : category.slug | category.key | category.name
-                * M2M  : categories.slug | categories.key | categories.name
-                * Char : role (campo texto simples)
-              Se nada disso existir no model, o filtro é ignorado (retorna todos).
+    - 'role'  : filtro por categoria (Contact.categories, slug sem diferenciar maiúsculas)
+    - 'type'  : aceito por compatibilidade com o front e ignorado (Contact não tem esse campo)
+    Busca por prefixo indexada e em cache: ver people/services/contact_search.py.
     Retorna:
       {
         "results": [{"id":<int>,"text":"Nome","subtitle":"email/phone"}],
         "pagination": {"more": <bool>}
       }
     """
-    q = (request.GET.get('q') or '').strip()
-    page = _safe_int(request.GET.get('page'), 1)
-    page_size = min(_safe_int(request.GET.get('page_size'), 20), 50)
-    ctype = (request.GET.get('type') or '').strip().lower()
-    role  = (request.GET.get('role') or '').strip()
-
-    qs = Contact.objects.all().order_by('name')
-
-    # --- filtro por 'type' (se existir no model) ---
-    if ctype and hasattr(Contact, 'type'):
-        qs = qs.filter(type=ctype)
-
-    # --- filtro por 'role' (compat com seu front) ---
-    if role:
-        role_norm = role.strip().lower()
-
-        # 1) FK 'category'
-        if hasattr(Contact, 'category'):
-            rel = Contact.category.field
-            mdl = rel.related_model
-            if hasattr(mdl, 'slug'):
-                qs = qs.filter(category__slug__iexact=role_norm)
-            elif hasattr(mdl, 'key'):
-                qs = qs.filter(category__key__iexact=role_norm)
-            elif hasattr(mdl, 'name'):
-                qs = qs.filter(category__name__iexact=role_norm)
-
-        # 2) M2M 'categories'
-        elif hasattr(Contact, 'categories'):
-            rel = Contact._meta.get_field('categories')
-            mdl = rel.remote_field.model
-            if hasattr(mdl, 'slug'):
-                qs = qs.filter(categories__slug__iexact=role_norm)
-            elif hasattr(mdl, 'key'):
-                qs = qs.filter(categories__key__iexact=role_norm)
-            elif hasattr(mdl, 'name'):
-                qs = qs.filter(categories__name__iexact=role_norm)
-
-        # 3) CharField simples 'role'
-        elif hasattr(Contact, 'role'):
-            qs = qs.filter(role__iexact=role)
-
-    # --- busca textual básica ---
-    if q:
-        name_field = 'name'
-        email_field = 'email' if hasattr(Contact, 'email') else None
-        phone_field = 'phone' if hasattr(Contact, 'phone') else None
-
-        filt = Q(**{f"{name_field}__icontains": q})
-        if email_field:
-            filt |= Q(**{f"{email_field}__icontains": q})
-        if phone_field:
-            filt |= Q(**{f"{phone_field}__icontains": q})
-        qs = qs.filter(filt)
-
-    # --- paginação ---
-    start = (page - 1) * page_size
-    end = start + page_size
-    total = qs.count()
-
-    results = []
-    for c in qs[start:end]:
-        subtitle = ''
-        if hasattr(c, 'email') and getattr(c, 'email', ''):
-            subtitle = c.email
-        elif hasattr(c, 'phone') and getattr(c, 'phone', ''):
-            subtitle = c.phone
-
-        results.append({
-            "id": c.pk,
-            "text": getattr(c, 'name', str(c)),
-            "subtitle": subtitle,
-        })
-
+    results, more = search_contacts(
+        request.GET.get('q') or '',
+        role=request.GET.get('role') or '',
+        page=_safe_int(request.GET.get('page'), 1),
+        page_size=min(_safe_int(request.GET.get('page_size'), 20), 50),
+    )
     return JsonResponse({
         "results": results,
-        "pagination": {"more": total > end}
+        "pagination": {"more": more}
     })
 
 
+def _contact_json(c) -> dict:
+    return {
+        "id": c.pk,
+        "text": c.name or str(c),
+        "subtitle": c.email or c.phone or '',
+    }
+
+
+@login_required
 @require_GET
 def contact_get_api(request):
     """
-    GET /people/api/get/?id=<pk>
+    GET /people/api/get/?id=<pk>  (só usuário autenticado: devolve e-mail/telefone)
     Retorna dados mínimos para hidratar o rótulo do campo quando já existe um ID salvo.
     {
       "id": 1, "text": "Nome", "subtitle": "email/phone"
     }
+
+    GET /people/api/get/?ids=1,2,3  (lote: hidrata todos os campos do form numa chamada)
+    {"results": [{"id": 1, ...}, {"id": 3, ...}]}  — na ordem pedida, inexistentes omitidos
     """
+    if 'ids' in request.GET:
+        raw = [v for v in request.GET['ids'].split(',') if v.strip()]
+        if len(raw) > GET_API_MAX_IDS:
+            return JsonResponse({"detail": f"Max {GET_API_MAX_IDS} ids"}, status=400)
+        contacts = ContactResolver().many(raw)
+        return JsonResponse({"results": [_contact_json(c) for c in contacts]})
+
     cid = _safe_int(request.GET.get('id'), 0)
     if not cid:
         return JsonResponse({"detail": "Missing id"}, status=400)
 
-    try:
-        c = Contact.objects.get(pk=cid)
-    except Contact.DoesNotExist:
+    c = ContactResolver().get(cid)
+    if c is None:
         return JsonResponse({"detail": "Not Found"}, status=404)
-
-    subtitle = ''
-    if hasattr(c, 'email') and getattr(c, 'email', ''):
-        subtitle = c.email
-    elif hasattr(c, 'phone') and getattr(c, 'phone', ''):
-        subtitle = c.phone
-
-    return JsonResponse({
-        "id": c.pk,
-        "text": getattr(c, 'name', str(c)),
-        "subtitle": subtitle,
-    })
+    return JsonResponse(_contact_json(c))
 # --- [FIM DAS ADIÇÕES] -------------------------------------------------------
 
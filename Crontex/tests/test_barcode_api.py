@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+import json
+from decimal import Decimal
+
+import pytest
+from django.contrib.auth.models import Permission, User
+from django.test import Client
+from django.urls import reverse
+
+from catalog.models import Product, ProductVariant
+from catalog.services import barcode_index
+from catalog.utils.ean import ean13_compose
+
+UPC = "036000291452"  # UPC-A válido; como EAN-13 = "0" + UPC
+
+
+@pytest.fixture
+def scanner(client, settings):
+    settings.CATALOG_BARCODE_REFRESH_SECONDS = 0
+    u = User.objects.create_user("coletor", password="x")
+    u.user_permissions.add(Permission.objects.get(codename="view_product"))
+    client.force_login(u)
+    barcode_index._index = barcode_index.BarcodeIndex()
+    return client
+
+
+@pytest.mark.django_db
+def test_lookup_produto_variante_e_lote(scanner, django_assert_max_num_queries):
+    p = Product.objects.create(sku="CAM", name="Camiseta", gtin=UPC, price=Decimal("50"), stock_qty=Decimal("3"))
+    ean = ean13_compose("1234", "5678", "01", "02")
+    v = ProductVariant.objects.create(product=p, size_name="P", color_name="Azul", sku="CAM-P", ean13=ean,
+                                      stock_qty=Decimal("2"))
+
+    # UPC-12 e EAN-13 com zero à esquerda caem no mesmo item
+    body = scanner.get(reverse("catalog:barcode_lookup", args=["0" + UPC])).json()
+    assert body["product_id"] == p.pk and body["variant_id"] is None and body["price"] == "50.00"
+
+    body = scanner.get(reverse("catalog:barcode_lookup", args=[ean])).json()
+    assert (body["variant_id"], body["variant"], body["stock"], body["price"]) == (v.pk, "P/Azul", "2.000", "50.00")
+
+    # refresh incremental: preço do produto reflete na variante; só consulta o que mudou
+    Product.objects.filter(pk=p.pk).update(price=Decimal("60"))  # sem updated_at -> invisível
+    p.price = Decimal("60")
+    p.save()
+    with django_assert_max_num_queries(6):  # sessão, usuário, 2x permissões + 2 consultas por updated_at
+        body = scanner.get(reverse("catalog:barcode_lookup", args=[ean])).json()
+    assert body["price"] == "60.00"
+
+    resp = scanner.post(
+        reverse("catalog:barcode_lookup_batch"),
+        data=json.dumps({"codes": [ean, UPC, "7890000000000", "abc"]}),
+        content_type="application/json",
+    )
+    items = resp.json()["items"]
+    assert [it["found"] for it in items] == [True, True, False, False]
+    assert items[3]["error"] == "código inválido"
+
+    v.delete()
+    assert scanner.get(reverse("catalog:barcode_lookup", args=[ean])).status_code == 404
+
+
+@pytest.mark.django_db
+def test_lote_por_post_exige_csrf():
+    u = User.objects.create_user("coletor", password="x")
+    u.user_permissions.add(Permission.objects.get(codename="view_product"))
+    client = Client(enforce_csrf_checks=True)
+    client.force_login(u)
+    url = reverse("catalog:barcode_lookup_batch")
+    body = json.dumps({"codes": [UPC]})
+
+    assert client.post(url, data=body, content_type="application/json").status_code == 403
+    client.cookies["csrftoken"] = token = "a" * 32  # cookie que o JS já tem
+    resp = client.post(url, data=body, content_type="application/json", HTTP_X_CSRFTOKEN=token)
+    assert resp.status_code == 200 and len(resp.json()["items"]) == 1
+
+
+@pytest.mark.django_db
+def test_recarga_completa_nao_bloqueia_nem_quebra_consulta(settings, monkeypatch):
+    p = Product.objects.create(sku="CAM", name="Camiseta", gtin=UPC)
+    ean = ean13_compose("1234", "5678", "01", "02")
+    v = ProductVariant.objects.create(product=p, size_name="P", sku="CAM-P", ean13=ean)
+    index = barcode_index.BarcodeIndex().load()
+    old_maps = index._maps
+
+    # variante sumiu do dict mas o código ainda aponta para ela: "não encontrado", sem KeyError
+    index._variants.pop(v.pk)
+    assert index.lookup(ean)["found"] is False
+
+    # recarga: dicts novos trocados de uma vez; quem leu antes segue com o conjunto antigo inteiro
+    index.load()
+    assert index._maps is not old_maps and index.lookup(ean)["variant_id"] == v.pk
+
+    # intervalo da recarga completa vencido: vai para a thread, a requisição só faz o incremental
+    settings.CATALOG_BARCODE_FULL_RELOAD_SECONDS = 0
+    started = []
+    monkeypatch.setattr(index, "reload_in_background", lambda: started.append(1) or True)
+    monkeypatch.setattr(index, "load", lambda: pytest.fail("carga completa dentro da requisição"))
+    index.ensure_fresh()
+    assert started == [1] and index.lookup(UPC)["product_id"] == p.pk
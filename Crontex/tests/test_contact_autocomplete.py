@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+import pytest
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from people.models import Category, Contact, ContactSearchKey
+from people.services.contact_search import reindex_contacts, search_contacts
+
+
+@pytest.fixture(autouse=True)
+def _clear_cache():
+    cache.clear()
+
+
+def _names(q, **kw):
+    return [r["text"] for r in search_contacts(q, **kw)[0]]
+
+
+@pytest.mark.django_db
+def test_prefixo_sem_acento_e_digitos():
+    joao = Contact.objects.create(name="João D'Ávila", email="jd@avila.com.br", phone="+5511988887777")
+    Contact.objects.create(name="Maria da Silva", fantasy_name="Ateliê Maré", cpf="529.982.247-25")
+    Contact.objects.create(name="Mariana Souza")
+
+    assert _names("jo") == ["João D'Ávila"]
+    assert _names("ÁVI") == ["João D'Ávila"]
+    assert _names("mar") == ["Maria da Silva", "Mariana Souza"]
+    assert _names("mar sil") == ["Maria da Silva"]
+    assert _names("atelie") == ["Maria da Silva"]
+    assert _names("(11) 98888") == ["João D'Ávila"]
+    assert _names("529.982") == ["Maria da Silva"]
+    assert _names("avila.com") == ["João D'Ávila"]
+
+    joao.name = "Joana Prado"
+    joao.save()
+    assert _names("avila") == ["Joana Prado"]  # e-mail ainda casa
+    assert _names("jo") == ["Joana Prado"]
+    assert set(ContactSearchKey.objects.filter(contact=joao).values_list("key", flat=True)) == set(joao.search_key.split())
+
+    Contact.objects.filter(pk=joao.pk).update(name="Outro")  # fora do save()
+    assert reindex_contacts([joao.pk]) == 1
+    assert _names("outro") == ["Outro"]
+
+
+@pytest.mark.django_db
+def test_cache_por_prefixo_e_paginacao():
+    Contact.objects.bulk_create([Contact(name=f"Cliente {i:02d}") for i in range(30)])
+    reindex_contacts()
+    Contact.objects.create(name="Fornecedor X")
+
+    assert len(_names("cli")) == 20
+    page2, more = search_contacts("cli", page=2)
+    assert len(page2) == 10 and not more
+
+    # lista de "cli" completa: "clie", "cliente 1" saem do cache, sem banco
+    with CaptureQueriesContext(connection) as ctx:
+        assert _names("cliente 1") == [f"Cliente {i}" for i in range(10, 20)]
+        assert len(_names("clie")) == 20
+    assert not ctx.captured_queries
+
+    # escrita troca a versão: contato novo aparece
+    Contact.objects.create(name="Cliente Novo")
+    assert "Cliente Novo" in _names("cliente n")
+
+
+@pytest.mark.django_db
+def test_api_filtra_por_categoria(client):
+    client.force_login(User.objects.create_user("u", password="x"))
+    forn = Category.objects.create(name="Fornecedor", slug="fornecedor")
+    a = Contact.objects.create(name="Malharia Alfa", email="alfa@x.com")
+    a.categories.add(forn)
+    Contact.objects.create(name="Malharia Beta")
+
+    data = client.get(reverse("people:api_search"), {"q": "malh", "role": "FORNECEDOR"}).json()
+    assert data == {"results": [{"id": a.pk, "text": "Malharia Alfa", "subtitle": "alfa@x.com"}], "pagination": {"more": False}}
+    data = client.get(reverse("people:api_search"), {"q": "malh", "type": "x"}).json()
+    assert [r["text"] for r in data["results"]] == ["Malharia Alfa", "Malharia Beta"]
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+import pytest
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.urls import reverse
+
+from catalog.models import Product
+from people.models import Address, Category, Contact
+from people.services.contact_dedup import find_duplicates, merge_clusters
+from people.services.contact_search import search_contacts
+
+
+@pytest.mark.django_db
+def test_agrupa_por_bloco_e_mescla_em_lote():
+    acme = Contact.objects.create(name="ACME Ltda", cnpj="12.345.678/0001-90")
+    acme2 = Contact.objects.create(name="Acme Comércio", cnpj="12345678000190", email="vendas@acme.com", is_fornecedor=True)
+    acme3 = Contact.objects.create(name="Acme Comercio", email="VENDAS@acme.com", phone="5511988887777")  # e-mail + nome
+    outra = Contact.objects.create(name="ACME Ltda", cnpj="99.888.777/0001-66")  # homônimo, outro CNPJ
+    joao = Contact.objects.create(name="João Silva", phone="11977776666")
+    joao2 = Contact.objects.create(name="Joao da Silva", phone="+55 11 97777-6666")
+    Contact.objects.create(name="Maria", phone="11955554444")
+    Contact.objects.create(name="Pedro", phone="11955554444")  # só o telefone: abaixo do threshold
+
+    clusters = find_duplicates()
+    assert [(c.survivor, c.duplicates) for c in clusters] == [(acme.pk, [acme2.pk, acme3.pk]), (joao.pk, [joao2.pk])]
+
+    cat = Category.objects.create(name="Tecidos", slug="tecidos")
+    acme2.categories.add(cat)
+    Address.objects.create(contact=acme3, city="São Paulo")
+    p = Product.objects.create(sku="P-1", name="Camiseta", bling_extra={"grade": {"x": 1}, "people": {
+        "pedido": {"cliente_id": acme3.pk}, "manufatura": {"corte_id": joao2.pk, "costura_id": outra.pk},
+    }})
+
+    acme.categories.add(cat)  # já vinculada ao mantido: não conta de novo
+    acme3.categories.add(cat, Category.objects.create(name="Aviamentos", slug="aviamentos"))
+    result = merge_clusters(clusters)
+    assert (result.clusters, result.merged, result.addresses, result.links, result.products) == (2, 3, 1, 1, 1)
+    assert not Contact.objects.filter(pk__in=[acme2.pk, acme3.pk, joao2.pk]).exists()
+
+    acme.refresh_from_db()
+    assert (acme.email, acme.email_lower, acme.phone, acme.is_fornecedor) == ("vendas@acme.com", "vendas@acme.com", "5511988887777", True)
+    assert [c.name for c in acme.categories.all()] == ["Aviamentos", "Tecidos"]
+    assert acme.addresses.get().city == "São Paulo"
+    assert [r["id"] for r in search_contacts("vendas")[0]] == [acme.pk]
+
+    p.refresh_from_db()
+    assert p.bling_extra["people"] == {
+        "pedido": {"cliente_id": acme.pk}, "manufatura": {"corte_id": joao.pk, "costura_id": outra.pk},
+    } and p.bling_extra["grade"] == {"x": 1}
+    assert find_duplicates() == []
+
+
+@pytest.mark.django_db
+def test_comando_e_admin(client):
+    a = Contact.objects.create(name="Loja Azul", email="azul@x.com")
+    b = Contact.objects.create(name="Loja Azul", email="Azul@X.com")
+    c = Contact.objects.create(name="Bazar", cpf="529.982.247-25")
+    d = Contact.objects.create(name="Bazar do Zé", cpf="52998224725")
+
+    call_command("dedup_contacts")  # só lista
+    assert Contact.objects.count() == 4
+
+    client.force_login(User.objects.create_superuser("root", "r@x.com", "x"))
+    url = reverse("admin:people_contact_dedup")
+    html = client.get(url).content.decode()
+    assert "2 grupos, 2 duplicados" in html and f'value="{c.pk}:{d.pk}"' in html
+
+    # contato criado depois da listagem não entra; grupo que deixou de ser duplicado é ignorado
+    e = Contact.objects.create(name="Bazar", cpf="52998224725")
+    Contact.objects.filter(pk=b.pk).update(name="Outra Loja", email="", email_lower="")
+    resp = client.post(url, {"group": [f"{c.pk}:{d.pk}", f"{a.pk}:{b.pk}"], "threshold": "0.7"})
+    assert resp.status_code == 302
+    assert list(Contact.objects.order_by("pk").values_list("pk", flat=True)) == [a.pk, b.pk, c.pk, e.pk]
+    Contact.objects.filter(pk=e.pk).delete()
+    Contact.objects.filter(pk=b.pk).update(name="Loja Azul", email="Azul@X.com", email_lower="azul@x.com")
+
+    call_command("dedup_contacts", "--apply")
+    assert set(Contact.objects.values_list("pk", flat=True)) == {a.pk, c.pk}
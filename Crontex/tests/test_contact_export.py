@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+import csv
+import gzip
+import io
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from people.models import Category, Contact
+from people.services.contact_export import iter_export_rows
+
+
+@pytest.mark.django_db
+def test_exportacao_streaming_sem_n_mais_1(client):
+    varejo = Category.objects.create(name="Varejo", slug="varejo")
+    atacado = Category.objects.create(name="Atacado", slug="atacado")
+    for i in range(30):
+        c = Contact.objects.create(name=f"Contato {i:02d}", email=f"c{i}@x.com", is_cliente=True, is_parceiro=i % 2 == 0)
+        c.categories.add(varejo, *([atacado] if i % 3 == 0 else []))
+    Contact.objects.create(name="Excluído", is_deleted=True)
+
+    with CaptureQueriesContext(connection) as ctx:
+        rows = list(iter_export_rows(chunk_size=10))
+    assert len(ctx.captured_queries) <= 1 + 2 * 3  # categorias + (contatos, vínculos) por bloco
+    assert rows[0][-2:] == ["roles", "categories"] and len(rows) == 31
+    assert rows[1][1] == "Contato 00" and rows[1][-2:] == ["cliente,parceiro", "Atacado,Varejo"]
+    assert rows[2][-2:] == ["cliente", "Varejo"]
+
+    resp = client.get(reverse("people:export_csv"), {"bom": "1"})
+    assert resp.streaming and resp["Content-Type"].startswith("text/csv")
+    text = b"".join(resp.streaming_content).decode("utf-8")
+    assert text.startswith("﻿id;name;") and "Excluído" not in text
+
+    resp = client.get(reverse("people:export_csv"), {"gzip": "1"})
+    assert resp["Content-Disposition"] == 'attachment; filename="contatos.csv.gz"'
+    data = gzip.decompress(b"".join(resp.streaming_content)).decode("utf-8")
+    assert list(csv.reader(io.StringIO(data), delimiter=";")) == [[str(v) for v in r] for r in rows]
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+import io
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from people.models import Category, Contact
+from people.services.contact_import import CATEGORIES_HEADER, ROLES_HEADER, import_contacts, iter_contact_rows
+from people.services.contact_search import search_contacts
+
+HEADER = f"name;person_kind;email;phone;cpf;cnpj;{ROLES_HEADER};{CATEGORIES_HEADER}\n"
+
+
+def _rows(lines):
+    return iter_contact_rows(io.BytesIO((HEADER + "".join(f"{line}\n" for line in lines)).encode("utf-8")))
+
+
+@pytest.mark.django_db
+def test_importacao_em_lote_com_consultas_constantes_por_chunk():
+    Category.objects.create(name="Tecidos", slug="tecidos")
+    antigo = Contact.objects.create(name="Malharia Sul", email="velho@sul.com", is_cliente=True)
+    antigo.categories.add(Category.objects.create(name="Antiga", slug="antiga"))
+
+    lines = [f"Cliente {i};FISICA;c{i}@x.com;1199999{i:04d};;;cliente;Varejo, Tecidos" for i in range(60)]
+    lines += [
+        "Malharia Sul;JURIDICA;;;;;fornecedor;Tecidos",
+        "Cliente 0;;novo@x.com;;;;cliente,parceiro;",  # repetido: atualiza sem apagar o resto
+        f"Telefone Longo;;;{'9' * 40};;;;",
+        ";;sem-nome@x.com;;;;;",
+    ]
+    with CaptureQueriesContext(connection) as ctx:
+        result = import_contacts(_rows(lines), chunk_size=1000)
+    writes = [q["sql"] for q in ctx.captured_queries if q["sql"].startswith(("INSERT", "UPDATE", "DELETE"))]
+    assert len(writes) < 15, writes  # linha a linha seriam centenas
+
+    assert (result.rows, result.created, result.updated, result.error_count) == (64, 60, 2, 1)
+    assert result.errors[0]["line"] == 64 and "phone" in result.errors[0]["errors"][0]
+
+    c0 = Contact.objects.get(name="Cliente 0")
+    assert (c0.email, c0.phone, c0.person_kind, c0.is_parceiro) == ("novo@x.com", "11999990000", "F", True)
+    assert sorted(c0.categories.values_list("name", flat=True)) == ["Tecidos", "Varejo"]
+    assert Category.objects.get(name="Varejo").slug == "varejo"
+
+    antigo.refresh_from_db()
+    assert (antigo.email, antigo.person_kind, antigo.is_cliente, antigo.is_fornecedor) == ("velho@sul.com", "J", False, True)
+    assert list(antigo.categories.values_list("name", flat=True)) == ["Tecidos"]
+
+    # autocomplete enxerga os contatos criados em lote
+    assert [r["text"] for r in search_contacts("cliente 59")[0]] == ["Cliente 59"]
+
+
+@pytest.mark.django_db
+def test_reimportacao_igual_nao_grava_e_chunks_retomam():
+    lines = [f"Pessoa {i};;p{i}@x.com;;;;;Grupo {i % 3}" for i in range(10)]
+    import_contacts(_rows(lines), chunk_size=4)
+    assert Contact.objects.count() == 10 and Category.objects.count() == 3
+
+    lines = [f"Pessoa {i};;p{i}@x.com;;;;;" for i in range(10)]
+    with CaptureQueriesContext(connection) as ctx:
+        result = import_contacts(_rows(lines), chunk_size=4, start_row=2)
+    assert (result.rows, result.created, result.updated, result.unchanged) == (8, 0, 0, 8)
+    assert not [q for q in ctx.captured_queries if q["sql"].startswith(("INSERT", "UPDATE", "DELETE"))]
+    assert Contact.objects.get(name="Pessoa 4").categories.get().name == "Grupo 1"
+
+    # mesmas categorias: sem alteração; só a linha com categoria diferente conta
+    lines = [f"Pessoa {i};;p{i}@x.com;;;;;Grupo {i % 3}" for i in range(10)]
+    lines[3] = "Pessoa 3;;p3@x.com;;;;;Grupo 2"
+    result = import_contacts(_rows(lines), chunk_size=4)
+    assert (result.created, result.updated, result.unchanged) == (0, 1, 9)
+
+
+@pytest.mark.django_db
+def test_match_por_documento_e_email_sem_duplicar():
+    acme = Contact.objects.create(name="ACME Ltda", cnpj="12.345.678/0001-90")
+    ana = Contact.objects.create(name="Ana", email=" Ana@Exemplo.com ")
+    assert (acme.cnpj_digits, ana.email_lower) == ("12345678000190", "ana@exemplo.com")
+    ana.cpf = "529.982.247-25"
+    ana.save(update_fields=["cpf"])
+    assert Contact.objects.get(pk=ana.pk).cpf_digits == "52998224725"
+
+    lines = [
+        "Acme Comércio;JURIDICA;;;;12345678000190;fornecedor;",  # mesmo CNPJ, outra grafia do nome
+        "Ana Souza;;ANA@exemplo.com;;;;cliente;",                 # e-mail sem diferenciar maiúsculas
+        "ACME Ltda;JURIDICA;;;;11.222.333/0001-81;;",             # homônimo com outro CNPJ: contato novo
+        "Beto;FISICA;;;111.444.777-35;;;",
+        "Roberto;FISICA;;;11144477735;;parceiro;",                # mesmo CPF da linha anterior, no mesmo chunk
+    ]
+    first = import_contacts(_rows(lines))
+    assert (first.created, first.updated) == (2, 3)
+    acme.refresh_from_db()
+    assert (acme.name, acme.is_fornecedor) == ("Acme Comércio", True)
+    assert Contact.objects.get(pk=ana.pk).name == "Ana Souza"
+    beto = Contact.objects.get(cpf_digits="11144477735")
+    assert (beto.name, beto.is_parceiro) == ("Roberto", True)
+
+    # reimportar a mesma lista: só consultas, nenhum contato novo
+    again = import_contacts(_rows(lines))
+    assert (again.created, Contact.objects.count()) == (0, 4)
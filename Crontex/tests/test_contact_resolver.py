@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+import pytest
+from django.contrib.auth.models import Permission, User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from catalog.forms import PERSON_PAIRS, ProductForm
+from catalog.models import Product
+from people.models import Contact
+
+
+def _contact_selects(ctx):
+    return [q["sql"] for q in ctx.captured_queries if q["sql"].startswith("SELECT") and 'FROM "people_contact"' in q["sql"]]
+
+
+@pytest.mark.django_db
+def test_form_resolve_os_13_pares_numa_consulta():
+    people = {id_field: Contact.objects.create(name=f"Pessoa {i}") for i, (_t, id_field) in enumerate(PERSON_PAIRS)}
+    assert len(people) == 13
+    data = {"sku": "P-1", "name": "Camiseta", "price": "1", "stock_qty": "1"}
+    data.update({id_field: str(c.pk) for id_field, c in people.items()})
+    data["os_arte"] = "texto digitado"  # trocado pelo nome oficial
+
+    with CaptureQueriesContext(connection) as ctx:
+        form = ProductForm(data=data)
+        assert form.is_valid(), form.errors
+    assert len(_contact_selects(ctx)) == 1
+    assert form.cleaned_data["os_arte"] == people["os_arte_id"].name
+    assert form.cleaned_data["m_acabamento_id"] == people["m_acabamento_id"].pk
+
+    # ID inexistente: erro no campo; texto livre sem ID só vale fora do pedido
+    form = ProductForm(data={**data, "m_corte_id": "999999", "pedido_cliente_id": "", "pedido_cliente": "Solto", "os_estilo_id": "", "os_estilo": "Livre"})
+    assert not form.is_valid() and "m_corte_id" in form.errors
+    assert form.cleaned_data["pedido_cliente"] == "" and form.cleaned_data["os_estilo"] == "Livre"
+
+
+@pytest.mark.django_db
+def test_edicao_hidrata_ids_salvos_e_api_em_lote(client):
+    a = Contact.objects.create(name="Ana", email="ana@x.com")
+    b = Contact.objects.create(name="Bia", phone="11999999999")
+    p = Product.objects.create(sku="P-2", name="Calça", bling_extra={"people": {"os": {"estilo_id": a.pk}, "manufatura": {"corte_id": b.pk}}})
+
+    with CaptureQueriesContext(connection) as ctx:
+        form = ProductForm(instance=p)
+    assert len(_contact_selects(ctx)) == 1
+    assert (form.initial["os_estilo_id"], form.initial["os_estilo"]) == (a.pk, "Ana")
+    assert (form.initial["m_corte_id"], form.initial["m_corte"]) == (b.pk, "Bia")
+
+    u = User.objects.create_user("u", password="x")
+    u.user_permissions.add(Permission.objects.get(codename="change_product"))
+    client.force_login(u)
+    html = client.get(reverse("catalog:produto_update", args=[p.pk])).content.decode()
+    assert f'name="m_corte_id" value="{b.pk}"' in html
+
+    with CaptureQueriesContext(connection) as ctx:
+        resp = client.get(reverse("people:api_get"), {"ids": f"{b.pk},999,{a.pk},x,{b.pk}"})
+    assert len(_contact_selects(ctx)) == 1
+    assert resp.json() == {"results": [
+        {"id": b.pk, "text": "Bia", "subtitle": "11999999999"},
+        {"id": a.pk, "text": "Ana", "subtitle": "ana@x.com"},
+    ]}
+    assert client.get(reverse("people:api_get"), {"id": a.pk}).json()["text"] == "Ana"
+    assert client.get(reverse("people:api_get"), {"ids": ",".join(["1"] * 101)}).status_code == 400
+
+    client.logout()
+    assert client.get(reverse("people:api_get"), {"ids": f"{a.pk},{b.pk}"}).status_code == 302
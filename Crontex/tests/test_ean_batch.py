@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+import json
+import random
+
+import pytest
+from django.contrib.auth.models import Permission, User
+from django.test import Client
+from django.urls import reverse
+
+from catalog.utils import ean_batch
+from catalog.utils.ean import ean13_compose
+from catalog.utils.ean_batch import check_digits_batch, ean13_batch
+
+
+def _random_codes(n, seed=7):
+    rnd = random.Random(seed)
+    return (
+        [rnd.randrange(10_000) for _ in range(n)],
+        [f"{rnd.randrange(10_000):04d}" for _ in range(n)],
+        [rnd.randrange(100) for _ in range(n)],
+        [f"{rnd.randrange(100)}" for _ in range(n)],
+    )
+
+
+@pytest.mark.parametrize("backend", ["python", "numpy"])
+def test_lote_igual_ao_ean13_compose(monkeypatch, backend):
+    if backend == "numpy":
+        pytest.importorskip("numpy")
+        monkeypatch.setattr(ean_batch, "_NUMPY_MIN", 0)
+    else:
+        monkeypatch.setattr(ean_batch, "np", None)
+
+    refs, bases, sizes, colors = _random_codes(2000)
+    expected = [ean13_compose(*args) for args in zip(refs, bases, sizes, colors)]
+    assert ean13_batch(refs, bases, sizes, colors) == expected
+    assert check_digits_batch(e[:12] for e in expected) == [int(e[-1]) for e in expected]
+
+
+def test_lote_aceita_escalares_e_valida_tamanho():
+    assert ean13_batch("12-34", 456, ["01", "2"], "01") == [
+        ean13_compose("1234", "0456", "01", "01"),
+        ean13_compose("1234", "0456", "02", "01"),
+    ]
+    with pytest.raises(ValueError):
+        ean13_batch("12345", "0456", ["01"], ["01"])
+    with pytest.raises(ValueError):
+        ean13_batch("1234", "0456", ["01", "02"], ["01"])
+
+
+def _login_cadastro(client):
+    u = User.objects.create_user("cadastro", password="x")
+    u.user_permissions.add(Permission.objects.get(codename="add_product"))
+    client.force_login(u)
+
+
+@pytest.mark.django_db
+def test_api_batch_exige_login_e_permissao(client):
+    url = reverse("catalog:ean_batch")
+    body = json.dumps({"refs": "1234", "bases": "0456", "sizes": ["01"], "colors": ["01"]})
+    assert client.post(url, data=body, content_type="application/json").status_code == 302
+    client.force_login(User.objects.create_user("sem_perm", password="x"))
+    assert client.post(url, data=body, content_type="application/json").status_code == 403
+
+
+@pytest.mark.django_db
+def test_api_batch_cartesiano(client):
+    _login_cadastro(client)
+    resp = client.post(
+        reverse("catalog:ean_batch"),
+        data=json.dumps({"refs": "1234", "bases": "0456", "sizes": ["01", "02", "03"],
+                         "colors": ["01", "02"], "cartesian": True}),
+        content_type="application/json",
+    )
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["count"] == 6
+    assert body["eans"][1] == ean13_compose("1234", "0456", "01", "02")
+
+    resp = client.post(
+        reverse("catalog:ean_batch"),
+        data=json.dumps({"refs": "1234", "bases": "0456", "sizes": ["01"], "colors": ["123"]}),
+        content_type="application/json",
+    )
+    assert resp.status_code == 400
+
+
+@pytest.mark.django_db
+def test_api_batch_exige_csrf():
+    client = Client(enforce_csrf_checks=True)
+    _login_cadastro(client)
+    url = reverse("catalog:ean_batch")
+    body = json.dumps({"refs": "1234", "bases": "0456", "sizes": ["01"], "colors": ["01"]})
+    assert client.post(url, data=body, content_type="application/json").status_code == 403
+    client.cookies["csrftoken"] = token = "b" * 32
+    resp = client.post(url, data=body, content_type="application/json", HTTP_X_CSRFTOKEN=token)
+    assert resp.status_code == 200 and resp.json()["count"] == 1
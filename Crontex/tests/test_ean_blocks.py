@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+import io
+
+import pytest
+from django.db import transaction
+
+from catalog.models import Product, ProductVariant
+from catalog.services.bling_import import import_rows
+from catalog.services.bling_rows import iter_csv_rows
+from catalog.services.ean_blocks import BlockAllocator, assign_blocks, block_ref_base, reserve_blocks
+from catalog.services.variant_sync import sync_variants
+from catalog.utils.ean import ean13_compose
+
+
+@pytest.mark.django_db
+def test_reservas_disjuntas_e_cache_por_worker(settings, django_assert_num_queries):
+    settings.CATALOG_EAN_BLOCK_START = 12340000
+    assert reserve_blocks(3) == range(12340000, 12340003)
+    assert block_ref_base(12340002) == ("1234", "0002")
+
+    w1, w2 = BlockAllocator(batch=50), BlockAllocator(batch=50)
+    w1.reserve_ahead(1)
+    w2.reserve_ahead(1)
+    with django_assert_num_queries(0):
+        got1 = w1.take(10) + w1.take(40)
+    got2 = w2.take(50)
+    assert len(set(got1) | set(got2)) == 100
+    assert min(got1) == 12340003
+
+    # dentro de transação: reserva exata, nada de sobra em cache
+    w3 = BlockAllocator(batch=50)
+    with transaction.atomic():
+        assert len(w3.take(2)) == 2
+    assert len(w3) == 0
+
+
+@pytest.mark.django_db
+def test_importacao_e_grade_usam_bloco(settings):
+    settings.CATALOG_EAN_AUTO_BLOCKS = True
+    settings.CATALOG_EAN_BLOCK_START = 55550000
+    data = io.BytesIO("Código;Descrição\nA-1;Um\nB-2;Dois\n".encode("utf-8"))
+    import_rows(iter_csv_rows(data), workers=1)
+    blocks = set(Product.objects.values_list("ean_block", flat=True))
+    assert len(blocks) == 2 and None not in blocks
+
+    p = Product.objects.get(sku="A-1")
+    p.bling_extra = {"grade": {"parametros": [
+        {"chave": "TAM", "role": "size", "valores": [{"label": "P", "code": "01"}]},
+    ]}}
+    sync_variants(p)
+    ref, base = block_ref_base(p.ean_block)
+    assert ProductVariant.objects.get(product=p).ean13 == ean13_compose(ref, base, "01", "00")
+
+    q = Product.objects.create(sku="C-3", name="Manual")
+    assert assign_blocks([q, p]) == 1 and q.ean_block not in blocks
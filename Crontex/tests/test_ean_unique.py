@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+import pytest
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from catalog.models import Product, ProductVariant
+from catalog.services.ean_unique import EanIndex, bulk_create_variants, check_unique_eans
+from catalog.utils.ean import ean13_compose
+
+
+def _ean(i):
+    return ean13_compose(1234, 5678, i // 100, i % 100)
+
+
+@pytest.mark.django_db
+def test_lote_checado_com_uma_consulta(django_assert_num_queries):
+    p = Product.objects.create(sku="V-1", name="Variantes")
+    ProductVariant.objects.create(product=p, size_name="P", sku="V-1-P", ean13=_ean(1))
+
+    eans = [_ean(i) for i in range(2, 2000)]
+    with django_assert_num_queries(3):  # 1998 EANs / 900 por IN
+        assert check_unique_eans(eans) == eans
+
+    bad = _ean(2)[:12] + str((int(_ean(2)[12]) + 1) % 10)
+    with pytest.raises(ValidationError) as err:
+        check_unique_eans([_ean(1), _ean(3), _ean(3), bad])
+    codes = sorted((e.code, e.params["ean13"]) for e in err.value.error_dict["ean13"])
+    assert codes == sorted([("unique", _ean(1)), ("repeated", _ean(3)), ("invalid", bad)])
+    assert "EAN-13 já cadastrado em outra variante." in err.value.message_dict["ean13"]
+
+
+@pytest.mark.django_db
+def test_indice_quente_e_integrity_error_mapeado():
+    p = Product.objects.create(sku="V-2", name="Variantes")
+    index = EanIndex().load()
+    variants = [ProductVariant(product=p, size_name=str(i), sku=f"V-2-{i}", ean13=_ean(i)) for i in range(500)]
+    with CaptureQueriesContext(connection) as ctx:
+        bulk_create_variants(variants, index=index)
+    # só INSERTs em lote (SQLite limita variáveis por comando); nenhuma consulta de EAN
+    assert not [q for q in ctx.captured_queries if q["sql"].startswith("SELECT")]
+    assert len(index) == 500 and index.owner(_ean(7)) == variants[7].pk
+
+    # índice desatualizado (outro processo gravou no meio): o UNIQUE barra e vira erro de campo
+    stale = EanIndex()
+    stale.warm = True
+    with pytest.raises(ValidationError) as err:
+        bulk_create_variants([ProductVariant(product=p, size_name="X", sku="V-2-X", ean13=_ean(7))], index=stale)
+    assert err.value.message_dict == {"ean13": ["EAN-13 já cadastrado em outra variante."]}
+
+    # save() individual: sem SELECT de unicidade no pre_save, mesmo erro por campo
+    dup = ProductVariant(product=p, size_name="Y", sku="V-2-Y", ean13=_ean(8))
+    with pytest.raises(ValidationError) as err:
+        dup.save()
+    assert err.value.message_dict == {"ean13": ["EAN-13 já cadastrado em outra variante."]}
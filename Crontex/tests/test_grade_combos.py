@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+import json
+from itertools import product
+
+import pytest
+from django.contrib.auth.models import Permission, User
+from django.urls import reverse
+
+from catalog.forms import ProductForm
+from catalog.models import Product
+from catalog.services.grade_combos import combo_at, combo_count, grade_value_lists, iter_combos
+from catalog.services.grade_skus import generate_skus_from_grade, iter_skus_from_grade
+from catalog.services.variant_sync import desired_variants
+
+
+def _grade(*sizes):
+    return {
+        "parametros": [
+            {"chave": f"P{i}", "role": "attr", "valores": [{"label": f"v{j}"} for j in range(n)]}
+            for i, n in enumerate(sizes)
+        ]
+    }
+
+
+def test_contagem_e_fatias_sem_materializar():
+    lists = grade_value_lists(_grade(3, 4, 5))
+    full = list(product(*lists))
+    assert combo_count(lists) == len(full) == 60
+    assert list(iter_combos(lists)) == full
+    assert list(iter_combos(lists, 17, 33)) == full[17:33]
+    assert list(iter_combos(lists, 55, 999)) == full[55:]
+    assert combo_at(lists, 41) == full[41]
+
+    # 20^5 = 3,2 milhões de combinações: só conta e serve a fatia pedida
+    huge = grade_value_lists(_grade(20, 20, 20, 20, 20))
+    assert combo_count(huge) == 3_200_000
+    assert list(iter_combos(huge, 3_199_999)) == [("v19",) * 5]
+
+
+
+def test_skus_da_grade_com_teto_e_so_pares_do_ean(settings):
+    settings.CATALOG_GRADE_MAX_COMBOS = 50
+    huge = _grade(20, 20, 20, 20, 20)
+    rows, summary = generate_skus_from_grade("1234", "5678", huge)
+    assert len(rows) == 50 and summary["count"] == 3_200_000 and summary["truncated"]
+    page, _ = generate_skus_from_grade("1234", "5678", huge, start=3_199_999, stop=3_200_010)
+    assert [r["combo"]["P4"] for r in page] == ["v19"]
+
+    # variantes: 20 x 20 pares, sem passar pelos 3,2 milhões de combinações
+    pairs, summary = iter_skus_from_grade("1234", "5678", huge, ean_params_only=True)
+    assert summary["count"] == 400 and len({r["sku"] for r in pairs}) == 400
+    assert len(desired_variants(Product(sku="X", ean_block=12345678, bling_extra={"grade": huge}))) == 400
+
+
+@pytest.mark.django_db
+def test_form_recusa_grade_acima_do_teto(settings):
+    settings.CATALOG_GRADE_MAX_COMBOS = 100
+    form = ProductForm(data={"sku": "G-1", "name": "Grade", "grade_payload": json.dumps(_grade(5, 5, 5))})
+    assert not form.is_valid()
+    assert "125 combinações" in str(form.errors["grade_payload"])
+
+
+@pytest.mark.django_db
+def test_preview_paginado_da_grade(client):
+    p = Product.objects.create(sku="CAM", name="Camiseta", bling_extra={"grade": _grade(10, 10, 10)})
+    u = User.objects.create_user("grade", password="x")
+    u.user_permissions.add(Permission.objects.get(codename="view_product"))
+    client.force_login(u)
+
+    resp = client.get(reverse("catalog:produto_grade_combos", args=[p.pk]), {"offset": 990, "limit": 50})
+    body = resp.json()
+    assert body["count"] == 1000
+    assert [it["index"] for it in body["items"]] == list(range(990, 1000))
+    assert body["items"][0] == {"index": 990, "sku": "CAM-v9-v9-v0", "attrs": ["v9", "v9", "v0"]}
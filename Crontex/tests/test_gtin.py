@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+import random
+
+import pytest
+from django.core.exceptions import ValidationError
+
+from catalog.services.grade_skus import ean13_check_digit12
+from catalog.utils import gtin
+from catalog.utils.ean import ean13_check_digit
+from catalog.validators import validate_gtin
+
+
+def _ref_check_digit(body: str) -> int:
+    total = sum((ord(ch) - 48) * (3 if i % 2 == 1 else 1) for i, ch in enumerate(reversed(body), start=1))
+    return (10 - total % 10) % 10
+
+
+def test_dv_bate_com_referencia_em_todos_os_comprimentos():
+    rnd = random.Random(7)
+    for length in gtin.GTIN_LENGTHS:
+        for _ in range(500):
+            body = "".join(rnd.choice("0123456789") for _ in range(length - 1))
+            dv = _ref_check_digit(body)
+            assert gtin.check_digit(body) == dv
+            assert gtin.is_valid(f"{body}{dv}")
+            assert not gtin.is_valid(f"{body}{(dv + 1) % 10}")
+            if length == 13:
+                assert ean13_check_digit(body) == dv
+                assert ean13_check_digit12(body) == str(dv)
+
+
+def test_validate_many_e_canonico():
+    codes = ["7891234567895", "789.1234.56789-5", "7891234567890", "", None, "96385074", "036000291452", "abc"]
+    assert gtin.validate_many(codes) == [True, True, False, False, False, True, True, False]
+    assert gtin.validate_many(codes[:2], strip=False) == [True, False]
+    # UPC-12 e EAN-13 do mesmo item caem no mesmo GTIN-14
+    assert gtin.to_gtin14("036000291452") == gtin.to_gtin14("0036000291452") == "00036000291452"
+    assert gtin.to_gtin14("123") is None
+    assert gtin.compose("789123456789") == "7891234567895"
+
+
+def test_entradas_invalidas_mantem_contrato_dos_chamadores():
+    with pytest.raises(ValueError):
+        gtin.check_digit("12a")
+    with pytest.raises(ValueError):
+        gtin.check_digit("")
+    assert ean13_check_digit12("123") == "0"
+    validate_gtin("7891234567895")
+    with pytest.raises(ValidationError):
+        validate_gtin("7891234567890")
+    with pytest.raises(ValidationError):
+        validate_gtin("12345")
@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+from datetime import timedelta
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.utils import timezone
+
+from catalog.models import ImportJob, Product
+from catalog.services import bling_import
+from catalog.services.import_jobs import (
+    claim_next,
+    enqueue_apply,
+    enqueue_import,
+    requeue,
+    requeue_stale,
+    run_job,
+)
+from people.models import Contact
+
+
+@pytest.fixture(autouse=True)
+def _media(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+
+
+def _products_csv(n):
+    lines = ["Código;Descrição;Preço\n"] + [f"J-{i};Produto {i};{i},00\n" for i in range(n)]
+    return SimpleUploadedFile("bling.csv", "".join(lines).encode("utf-8"))
+
+
+@pytest.mark.django_db
+def test_job_retoma_do_ultimo_chunk_commitado(monkeypatch):
+    job = enqueue_import(ImportJob.Kind.PRODUCTS, _products_csv(5))
+
+    original = bling_import.write_chunk
+    calls = {"n": 0}
+
+    def crash_on_second_chunk(rows, result):
+        calls["n"] += 1
+        if calls["n"] == 2:
+            raise RuntimeError("worker caiu")
+        return original(rows, result)
+
+    monkeypatch.setattr(bling_import, "write_chunk", crash_on_second_chunk)
+    job = run_job(claim_next("w1"), chunk_size=2)
+
+    assert job.status == ImportJob.Status.FAILED
+    assert job.checkpoint == 2
+    assert Product.objects.count() == 2
+
+    monkeypatch.setattr(bling_import, "write_chunk", original)
+    requeue(job)
+    job = run_job(claim_next("w2"), chunk_size=2)
+
+    assert job.status == ImportJob.Status.DONE
+    assert (job.checkpoint, job.rows_processed, job.rows_created) == (5, 5, 5)
+    assert job.attempts == 2
+    assert Product.objects.count() == 5
+
+
+@pytest.mark.django_db
+def test_requeue_stale_e_claim_unico():
+    job = enqueue_import(ImportJob.Kind.PRODUCTS, _products_csv(1))
+    assert claim_next("w1").pk == job.pk
+    assert claim_next("w2") is None
+
+    ImportJob.objects.filter(pk=job.pk).update(heartbeat_at=timezone.now() - timedelta(minutes=10))
+    assert requeue_stale(60) == 1
+    assert claim_next("w2").pk == job.pk
+
+
+@pytest.mark.django_db
+def test_worker_once_processa_contatos():
+    csv_text = (
+        "name;person_kind;email;phone;cpf;cnpj;roles (cliente|fornecedor|colaborador|parceiro separados por ,);"
+        "categories (nomes separados por ,)\n"
+        "Padaria do João;JURIDICA;contato@padaria.com;11999999999;;;cliente,fornecedor;Alimentação\n"
+    )
+    job = enqueue_import(ImportJob.Kind.CONTACTS, SimpleUploadedFile("c.csv", csv_text.encode("utf-8")))
+
+    call_command("run_import_jobs", "--once")
+
+    job.refresh_from_db()
+    assert job.status == ImportJob.Status.DONE
+    c = Contact.objects.get(name="Padaria do João")
+    assert c.is_cliente and c.is_fornecedor and c.person_kind == "J"
+    assert list(c.categories.values_list("name", flat=True)) == ["Alimentação"]
+
+
+@pytest.mark.django_db
+def test_preview_nao_grava_e_aplica_changeset(client):
+    from django.contrib.auth.models import User
+    from django.urls import reverse
+
+    from catalog.models import ImportChange
+
+    Product.objects.create(sku="J-0", name="Produto 0", price="0")
+    Product.objects.create(sku="J-1", name="Nome antigo", price="1")
+    Product.objects.create(sku="FORA", name="Não está na planilha")
+
+    enqueue_import(ImportJob.Kind.PRODUCTS, _products_csv(3), mode=ImportJob.Mode.PREVIEW)
+    preview = run_job(claim_next("w"))
+    assert (preview.rows_unchanged, preview.rows_created, preview.rows_updated, preview.rows_missing) == (1, 1, 1, 1)
+    assert Product.objects.get(sku="J-1").name == "Nome antigo"
+    assert not Product.objects.filter(sku="J-2").exists()
+
+    changed = ImportChange.objects.get(job=preview, action=ImportChange.Action.CHANGED)
+    assert changed.diff["name"] == ["Nome antigo", "Produto 1"]
+
+    admin = User.objects.create_superuser("adm", "adm@x.com", "x")
+    client.force_login(admin)
+    page = client.get(reverse("catalog:import_job_detail", args=[preview.pk]), {"action": "changed"})
+    assert page.status_code == 200 and "Nome antigo" in page.content.decode()
+
+    resp = client.post(reverse("catalog:import_job_apply", args=[preview.pk]))
+    assert resp.status_code == 302
+    # 2º clique: nada novo na fila
+    again = client.post(reverse("catalog:import_job_apply", args=[preview.pk]))
+    assert again["Location"] == reverse("catalog:import_job_detail", args=[preview.pk])
+    assert ImportJob.objects.filter(source=preview, mode=ImportJob.Mode.APPLY).count() == 1
+    with pytest.raises(ValueError, match="já foi aplicada"):
+        enqueue_apply(preview)
+    applied = run_job(claim_next("w"))
+    assert applied.status == ImportJob.Status.DONE
+    assert (applied.rows_created, applied.rows_updated) == (1, 1)
+    assert Product.objects.get(sku="J-1").name == "Produto 1"
+    assert Product.objects.filter(sku="J-2").exists()
+    assert Product.objects.filter(sku="FORA").exists()  # ausentes não são apagados
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth.models import Permission, User
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from catalog.models import Product
+from people.models import Contact
+
+
+@pytest.fixture
+def viewer(client):
+    cache.clear()
+    u = User.objects.create_user("leitor", password="x")
+    u.user_permissions.add(Permission.objects.get(codename="view_product"))
+    client.force_login(u)
+    return client
+
+
+def _walk(client, url, key):
+    """Segue os cursores ?after= até o fim; devolve as páginas (pks)."""
+    pages, params = [], {}
+    while True:
+        resp = client.get(url, params)
+        page = resp.context["page_obj"]
+        pages.append([o.pk for o in resp.context[key]])
+        if not page.has_next():
+            return pages, resp
+        params = {"after": page.next_token}
+
+
+@pytest.mark.django_db
+def test_produtos_por_cursor_com_total_em_cache(viewer):
+    Product.objects.bulk_create([Product(sku=f"P{i:03d}", name=f"Produto {i}") for i in range(60)])
+    url = reverse("catalog:produto_list")
+
+    pages, last = _walk(viewer, url, "produtos")
+    assert [len(p) for p in pages] == [25, 25, 10]
+    flat = [pk for p in pages for pk in p]
+    assert flat == sorted(flat, reverse=True) and len(set(flat)) == 60
+    assert last.context["paginator"].count == 60
+
+    # página funda: sem OFFSET e sem COUNT (total vem do cache)
+    with CaptureQueriesContext(connection) as ctx:
+        viewer.get(url, {"after": last.context["page_obj"].previous_token})
+    sql = " ".join(q["sql"] for q in ctx.captured_queries if "catalog_product" in q["sql"])
+    assert "OFFSET" not in sql and "COUNT(" not in sql
+
+    # voltar (?before=) devolve a página anterior
+    back = viewer.get(url, {"before": last.context["page_obj"].previous_token})
+    assert [o.pk for o in back.context["produtos"]] == pages[1]
+
+    # escrita invalida o total
+    Product.objects.create(sku="NOVO", name="Novo")
+    assert viewer.get(url).context["paginator"].count == 61
+
+    assert viewer.get(url, {"after": "adulterado"}).status_code == 404
+    # ?page= e busca continuam no modo por página
+    assert viewer.get(url, {"page": 2}).context["page_obj"].number == 2
+
+
+@pytest.mark.django_db
+def test_contatos_por_cursor_com_empate_de_data(viewer):
+    now = timezone.now()
+    Contact.objects.bulk_create(
+        [Contact(name=f"C{i}", created_at=now - timedelta(minutes=i // 3)) for i in range(45)]
+    )
+    pages, last = _walk(viewer, reverse("people:list"), "contacts")
+    assert [len(p) for p in pages] == [20, 20, 5]
+    assert len({pk for p in pages for pk in p}) == 45
+    assert last.context["paginator"].count == 45
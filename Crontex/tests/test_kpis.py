@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+import io
+import threading
+import time
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from accounts.models import Account, KpiCounter, Membership
+from catalog.models import Product
+from catalog.services.bling_import import import_rows
+from catalog.services.bling_rows import iter_csv_rows
+from crontex import kpis
+
+
+@pytest.fixture(autouse=True)
+def _clear_cache():
+    cache.clear()
+
+
+def _counts(ctx):
+    return [q["sql"] for q in ctx.captured_queries if "COUNT(" in q["sql"]]
+
+
+@pytest.mark.django_db
+def test_contadores_seguem_sinais_e_importacao():
+    a = Product.objects.create(sku="A", name="A")
+    Product.objects.create(sku="B", name="B", is_active=False)
+    k = kpis.get_kpis()  # 1ª leitura conta e grava as linhas
+    assert (k["catalog.product.total"], k["catalog.product.active"]) == (2, 1)
+
+    # insert/delete: só deltas, nenhuma recontagem
+    with CaptureQueriesContext(connection) as ctx:
+        Product.objects.create(sku="C", name="C")
+        Product.objects.get(sku="B").delete()
+        k = kpis.get_kpis()
+    assert (k["catalog.product.total"], k["catalog.product.active"]) == (2, 2)
+    assert not _counts(ctx)
+
+    # update: o valor anterior vem do banco (recontagem só do contador com filtro)
+    with CaptureQueriesContext(connection) as ctx:
+        a.is_active = False
+        a.save()
+        k = kpis.get_kpis()
+    assert (k["catalog.product.total"], k["catalog.product.active"]) == (2, 1)
+    assert len(_counts(ctx)) == 1
+
+    data = io.BytesIO("Código;Descrição\nD;Novo\nA;A alterado\n".encode("utf-8"))
+    import_rows(iter_csv_rows(data), workers=1)
+    k = kpis.get_kpis()
+    assert (k["catalog.product.total"], k["catalog.product.active"]) == (3, 2)
+    assert kpis.recount()["catalog.product.active"] == 2
+
+
+@pytest.mark.django_db
+def test_dashboards_leem_os_contadores(client):
+    staff = User.objects.create_user("staff", password="x", is_staff=True)
+    other = User.objects.create_user("op", password="x")
+    acme = Account.objects.create(name="Acme", slug="acme", plan="pro")
+    Account.objects.create(name="Beta", slug="beta")
+    Membership.objects.create(user=other, account=acme)
+    Membership.objects.create(user=staff, account=acme)
+    Product.objects.create(sku="A", name="Camiseta")
+    client.force_login(staff)
+
+    resp = client.get(reverse("accounts:global_dashboard"))
+    ctx = resp.context
+    assert (ctx["total_accounts"], ctx["active_accounts"], ctx["users_plat_total"], ctx["staff_count"]) == (2, 2, 2, 1)
+    assert ctx["per_plan"] == [{"plan": "basic", "qty": 1}, {"plan": "pro", "qty": 1}]
+    assert ctx["users_tenants_distinct"] == 2
+
+    acme.plan = "enterprise"
+    acme.save()
+    Membership.objects.filter(user=staff).delete()
+    ctx = client.get(reverse("accounts:global_dashboard")).context
+    assert ctx["per_plan"] == [{"plan": "basic", "qty": 1}, {"plan": "enterprise", "qty": 1}]
+    assert ctx["users_tenants_distinct"] == 1
+    assert KpiCounter.objects.get(name="accounts.account.plan:pro").value == 0
+
+    client.get(reverse("crontex_ui:dashboard"))
+    with CaptureQueriesContext(connection) as ctx:
+        resp = client.get(reverse("crontex_ui:dashboard"))
+    assert resp.context["kpi_produtos_total"] == 1 and "Camiseta" in resp.content.decode()
+    assert not [q for q in ctx.captured_queries if "catalog_product" in q["sql"] or "kpicounter" in q["sql"]]
+
+
+def test_leituras_concorrentes_recalculam_uma_vez():
+    calls = []
+
+    def slow():
+        calls.append(1)
+        time.sleep(0.2)
+        return {"x": 1}
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(kpis.cached("stampede", slow))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(calls) == 1 and results == [{"x": 1}] * 8
+
+
+@pytest.mark.django_db
+def test_updates_concorrentes_da_mesma_linha_nao_descontam_duas_vezes():
+    Product.objects.create(sku="A", name="A")
+    kpis.get_kpis()
+    first, second = Product.objects.get(sku="A"), Product.objects.get(sku="A")
+    for obj in (first, second):  # ambos carregaram is_active=True
+        obj.is_active = False
+        obj.save()
+    assert kpis.get_kpis()["catalog.product.active"] == 0
+
+
+def test_recalculo_em_andamento_serve_o_valor_anterior():
+    assert kpis.cached("prev", lambda: {"x": 1}) == {"x": 1}
+    kpis.invalidate()
+    version = cache.get(kpis.VERSION_KEY)
+    cache.add(f"kpi:{version}:prev:lock", 1, kpis.LOCK_SECONDS)  # outro processo recalculando
+    started = time.monotonic()
+    assert kpis.cached("prev", lambda: {"x": 2}) == {"x": 1}
+    assert time.monotonic() - started < kpis.POLL_SECONDS
+
+
+@pytest.mark.django_db
+def test_comando_reconta():
+    Product.objects.create(sku="A", name="A")
+    Product.objects.filter(sku="A").update(is_active=False)  # fora dos sinais
+    out = io.StringIO()
+    call_command("recount_kpis", stdout=out)
+    assert "catalog.product.active: 0" in out.getvalue()
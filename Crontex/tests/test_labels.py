@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+import re
+import zlib
+
+import pytest
+from django.contrib.auth.models import Permission, User
+from django.urls import reverse
+
+from catalog.models import Product
+from catalog.services.variant_sync import sync_variants
+from catalog.utils import barcode_render
+from catalog.utils.barcode_render import Label, ean13_modules, render_sheet_pdf, render_sheet_svg
+
+
+def test_modulos_ean13_e_cache_de_simbolos():
+    # exemplo clássico da especificação (paridade LGGLGL do dígito 5)
+    assert ean13_modules("5901234123457") == (
+        "10100010110100111011001100100110111101001110101010110011011011001000010101110010011101000100101"
+    )
+    with pytest.raises(ValueError):
+        ean13_modules("5901234123450")
+
+    cache = barcode_render.render_cache()
+    cache.clear()
+    labels = [Label("5901234123457", ("CAM-0101", "P / Azul"))] * 25
+    svg = render_sheet_svg(labels)
+    assert svg.count("<path") == 25 and "P / Azul" in svg
+    assert (cache.misses, cache.hits) == (1, 24)
+
+    # PDF: 2 páginas (21 por folha) e xref apontando para os objetos
+    pdf = render_sheet_pdf(labels)
+    assert pdf.startswith(b"%PDF-1.4") and b"/Count 2" in pdf
+    xref = int(re.search(rb"startxref\n(\d+)", pdf).group(1))
+    offsets = [int(x) for x in re.findall(rb"(\d{10}) 00000 n", pdf[xref:])]
+    for obj_id, off in enumerate(offsets, start=1):
+        assert pdf[off:].startswith(f"{obj_id} 0 obj".encode())
+    stream = re.search(rb"stream\n(.*?)\nendstream", pdf, re.S).group(1)
+    assert zlib.decompress(stream).count(b" re") >= 21 * 30
+
+
+@pytest.mark.django_db
+def test_folha_de_etiquetas_da_grade(client):
+    u = User.objects.create_user("prod", password="x")
+    u.user_permissions.add(Permission.objects.get(codename="view_product"))
+    client.force_login(u)
+
+    p = Product.objects.create(sku="1234-5678", name="Camiseta", ean_block=12345678, bling_extra={
+        "avi_acabamento": {"tag": "Tag bordada"},
+        "grade": {"parametros": [
+            {"chave": "TAM", "role": "size", "valores": ["P", "M"]},
+            {"chave": "COR", "role": "color", "valores": ["Azul"]},
+        ]},
+    })
+    url = reverse("catalog:produto_labels", args=[p.pk])
+
+    # sem variantes materializadas: EANs vêm da grade
+    resp = client.get(url, {"format": "svg", "copies": 2})
+    body = resp.content.decode()
+    assert resp["Content-Type"] == "image/svg+xml"
+    assert body.count("<path") == 4 and "Tag bordada" in body
+
+    sync_variants(p)
+    resp = client.get(url)
+    assert resp["Content-Type"] == "application/pdf" and resp.content.startswith(b"%PDF")
+    again = client.get(url, HTTP_IF_NONE_MATCH=resp["ETag"])
+    assert again.status_code == 304
+
+    assert client.get(url, {"format": "png"}).status_code == 400
@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+import pytest
+from django.contrib.auth.models import Permission, User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from catalog.models import Product
+
+
+@pytest.mark.django_db
+def test_lista_e_dashboard_nao_leem_bling_extra(client):
+    u = User.objects.create_user("leitor", password="x")
+    u.user_permissions.add(Permission.objects.get(codename="view_product"))
+    client.force_login(u)
+    Product.objects.create(
+        sku="CAM-1", name="Camiseta", notes="x" * 5000,
+        bling_extra={"grade_skus": [{"sku": f"CAM-1-{i}"} for i in range(500)]},
+    )
+
+    for url, marker in ((reverse("catalog:produto_list"), "Camiseta"), (reverse("crontex_ui:dashboard"), "Camiseta")):
+        with CaptureQueriesContext(connection) as ctx:
+            resp = client.get(url)
+        assert resp.status_code == 200 and marker in resp.content.decode()
+        product_sql = [q["sql"] for q in ctx.captured_queries if 'FROM "catalog_product"' in q["sql"]]
+        assert product_sql and not any('"bling_extra"' in sql or '"notes"' in sql for sql in product_sql)
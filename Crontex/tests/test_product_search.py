@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+import io
+
+import pytest
+from django.contrib.auth.models import User
+from django.urls import reverse
+
+from catalog.models import Product
+from catalog.services.bling_import import import_rows
+from catalog.services.bling_rows import iter_csv_rows
+from catalog.services.product_search import match_expression, rebuild_index, search_products
+
+
+def _skus(qs):
+    return [p.sku for p in qs]
+
+
+@pytest.mark.django_db
+def test_indice_segue_save_delete_e_importacao():
+    a = Product.objects.create(sku="CAM-001", name="Camiseta Básica", brand="Avacab")
+    b = Product.objects.create(sku="CAL-002", name="Calça Jeans", supplier_name="Tecelagem Camaçari")
+    Product.objects.create(sku="BON-003", name="Boné", gtin="7891234567895")
+
+    assert match_expression('cam "x" OR') == '"cam"* "x"* "or"*'
+    # prefixo, sem acento; SKU pesa mais que fornecedor
+    assert _skus(search_products(Product.objects.all(), "cam")) == ["CAM-001", "CAL-002"]
+    assert _skus(search_products(Product.objects.all(), "basica avac")) == ["CAM-001"]
+    assert _skus(search_products(Product.objects.all(), "789123")) == ["BON-003"]
+
+    a.name = "Regata"
+    a.save()
+    assert _skus(search_products(Product.objects.all(), "camiseta")) == []
+    b.delete()
+    assert _skus(search_products(Product.objects.all(), "jeans")) == []
+
+    data = io.BytesIO("Código;Descrição;Marca\nMOL-9;Moletom Canguru;Avacab\n".encode("utf-8"))
+    import_rows(iter_csv_rows(data), workers=1)
+    assert _skus(search_products(Product.objects.all(), "canguru")) == ["MOL-9"]
+    data = io.BytesIO("Código;Descrição;Marca\nMOL-9;Moletom Liso;Avacab\n".encode("utf-8"))
+    import_rows(iter_csv_rows(data), workers=1)
+    assert _skus(search_products(Product.objects.all(), "canguru")) == []
+    assert set(_skus(search_products(Product.objects.all(), "avacab"))) == {"CAM-001", "MOL-9"}
+
+    Product.objects.filter(sku="MOL-9").update(name="Agasalho")  # fora dos hooks
+    assert rebuild_index() == 3
+    assert _skus(search_products(Product.objects.all(), "agasa")) == ["MOL-9"]
+
+
+@pytest.mark.django_db
+def test_lista_e_admin_usam_o_indice(client):
+    u = User.objects.create_user("staff", password="x", is_staff=True, is_superuser=True)
+    client.force_login(u)
+    Product.objects.create(sku="CAM-001", name="Camiseta Azul")
+    Product.objects.create(sku="XYZ", name="Bermuda", brand="Camaleão")
+
+    resp = client.get(reverse("catalog:produto_list"), {"q": "cama"})
+    assert [p.sku for p in resp.context["produtos"]] == ["XYZ"]
+    resp = client.get(reverse("catalog:produto_list"), {"q": "cam"})
+    assert [p.sku for p in resp.context["produtos"]] == ["CAM-001", "XYZ"]
+
+    resp = client.get(reverse("admin:catalog_product_changelist"), {"q": "azul"})
+    assert [p.sku for p in resp.context["cl"].result_list] == ["CAM-001"]
+
+
+@pytest.mark.django_db
+def test_fts_ausente_e_reconsultado(monkeypatch):
+    from catalog.services import product_search
+
+    monkeypatch.setattr(product_search, "_available", {})
+    monkeypatch.setattr(product_search, "_missing_until", {})
+    monkeypatch.setattr(product_search, "FTS_TABLE", "catalog_product_fts_ainda_nao_migrado")
+    assert not product_search.fts_enabled()
+
+    monkeypatch.setattr(product_search, "FTS_TABLE", "catalog_product_fts")  # migração rodou
+    assert not product_search.fts_enabled()  # dentro do intervalo: sem consulta nova
+    monkeypatch.setattr(product_search, "_missing_until", {"default": 0.0})
+    assert product_search.fts_enabled() and product_search._available == {"default": True}
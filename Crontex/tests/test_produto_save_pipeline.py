@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+import json
+import re
+
+import pytest
+from django.contrib.auth.models import Permission, User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from catalog.models import Product
+
+_WRITE = re.compile(r'^\s*(INSERT INTO|UPDATE) "catalog_product"\s', re.I)
+
+
+def _product_writes(ctx):
+    return [q["sql"] for q in ctx.captured_queries if _WRITE.match(q["sql"])]
+
+
+@pytest.mark.django_db
+def test_um_insert_e_um_update_por_submit(client, settings):
+    settings.CATALOG_EAN_AUTO_BLOCKS = True  # variantes só com bloco EAN reservado
+    u = User.objects.create_user("qa_save", password="x", first_name="Ana")
+    for codename in ("add_product", "change_product", "view_product"):
+        u.user_permissions.add(Permission.objects.get(codename=codename))
+    client.force_login(u)
+
+    grade = {"parametros": [{"chave": "TAM", "role": "size", "valores": [{"label": "P", "code": "01"}, {"label": "M", "code": "02"}]}]}
+    payload = {
+        "sku": "1234-5678",
+        "name": "Camiseta",
+        "price": "10.00",
+        "stock_qty": "1",
+        "form_uid": "uid-save-1",
+        "pedido_status": "Em produção",
+        "grade_payload": json.dumps(grade),
+    }
+
+    with CaptureQueriesContext(connection) as ctx:
+        resp = client.post(reverse("catalog:produto_create"), payload)
+    assert resp.status_code == 302
+    assert len(_product_writes(ctx)) == 1
+
+    p = Product.objects.get(sku="1234-5678")
+    assert p.bling_extra["pedido"]["status"] == "Em produção"
+    assert p.bling_extra["pedido"]["executante_username"] == "qa_save"
+    assert len(p.bling_extra["grade_skus"]) == 2 and p.variants.count() == 2
+    assert p.ean_block is not None
+
+    payload["name"] = "Camiseta Gola V"
+    with CaptureQueriesContext(connection) as ctx:
+        resp = client.post(reverse("catalog:produto_update", args=[p.pk]), payload)
+    assert resp.status_code == 302
+    assert len(_product_writes(ctx)) == 1
+    p.refresh_from_db()
+    assert p.name == "Camiseta Gola V" and p.bling_extra["pedido"]["executante_id"] == u.pk
+
+
+@pytest.mark.django_db
+def test_bloco_reservado_antes_da_transacao_do_form(client, settings, monkeypatch):
+    from catalog.services.ean_blocks import BlockAllocator
+    from catalog.views import web
+
+    settings.CATALOG_EAN_AUTO_BLOCKS = True
+    allocator = BlockAllocator(batch=10)  # cache vazio
+    monkeypatch.setattr(web, "default_allocator", allocator)
+    u = User.objects.create_user("qa_block", password="x")
+    for codename in ("add_product", "view_product"):
+        u.user_permissions.add(Permission.objects.get(codename=codename))
+    client.force_login(u)
+
+    grade = {"parametros": [{"chave": "TAM", "role": "size", "valores": [{"label": "P", "code": "01"}]}]}
+    resp = client.post(reverse("catalog:produto_create"), {
+        "sku": "1234-9999", "name": "Regata", "price": "10.00", "stock_qty": "1",
+        "form_uid": "uid-block-1", "grade_payload": json.dumps(grade),
+    })
+    assert resp.status_code == 302
+    # reserve_ahead() encheu o cache antes do atomic; dentro dele a reserva seria exata (cache fica vazio)
+    assert len(allocator) == 9
+    assert Product.objects.get(sku="1234-9999").ean_block is not None
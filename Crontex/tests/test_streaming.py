@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+import io
+
+import pytest
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import SimpleUploadedFile
+
+from crontex.streaming import open_csv
+from people.services.contact_import import iter_contact_rows
+
+
+class _Upload(SimpleUploadedFile):
+    """Registra o maior bloco lido do arquivo."""
+
+    def __init__(self, data: bytes):
+        super().__init__("c.csv", data)
+        self.largest = 0
+        read = self.file.read
+
+        def tracked(size=-1):
+            block = read(size)
+            self.largest = max(self.largest, len(block))
+            return block
+
+        self.file.read = tracked
+
+
+def test_decodifica_em_blocos_sem_ler_o_arquivo_inteiro():
+    body = "".join(f'Joana D\'Ávila {i};"linha 1\nlinha 2 ção";€{i}\r\n' for i in range(5000))
+    up = _Upload(("﻿nome;obs;valor\r\n" + body).encode("utf-8"))
+    stream = open_csv(up, chunk_size=7)  # blocos pequenos: cortam caracteres multibyte ao meio
+    assert (stream.encoding, stream.delimiter) == ("utf-8-sig", ";")
+    rows = list(stream.dict_reader())
+    assert len(rows) == 5000
+    assert rows[4999] == {"nome": "Joana D'Ávila 4999", "obs": "linha 1\nlinha 2 ção", "valor": "€4999"}
+    assert up.largest <= 64 * 1024 < len(up.file.getvalue())
+
+
+def test_latin1_e_utf8_misturado():
+    latin = "nome,cidade\nJosé,São Paulo\n".encode("latin-1")
+    assert list(open_csv(io.BytesIO(latin)).dict_reader()) == [{"nome": "José", "cidade": "São Paulo"}]
+
+    # 1º bloco em UTF-8, byte Latin-1 perdido depois: lido como Latin-1, sem "�"
+    mixed = ("nome;cidade\n" + "Ana;Brasília\n" * 10000).encode("utf-8") + "Zé;Goiânia\n".encode("latin-1")
+    rows = list(open_csv(io.BytesIO(mixed)).dict_reader())
+    assert rows[0]["cidade"] == "Brasília" and rows[-1] == {"nome": "Zé", "cidade": "Goiânia"}
+
+
+def test_contatos_arquivo_vazio():
+    with pytest.raises(ValidationError):
+        list(iter_contact_rows(SimpleUploadedFile("c.csv", b" \n")))
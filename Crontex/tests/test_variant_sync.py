@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+from decimal import Decimal
+
+import pytest
+from django.core.exceptions import ValidationError
+
+from catalog.models import Product, ProductVariant
+from catalog.services.variant_sync import VariantSyncResult, derive_ref_base, sync_variants
+from catalog.utils.ean import ean13_compose
+
+
+def _grade(sizes, colors, extra_attr=("Algodão", "Linho")):
+    # ordem do payload propositalmente "errada": o role decide tam/cor
+    return {
+        "parametros": [
+            {"chave": "COR", "role": "color", "valores": [{"label": l, "code": c} for l, c in colors]},
+            {"chave": "TAM", "role": "size", "valores": [{"label": l, "code": c} for l, c in sizes]},
+            {"chave": "TECIDO", "role": "attr", "valores": [{"label": a} for a in extra_attr]},
+        ]
+    }
+
+
+def test_derive_ref_base_igual_ao_js():
+    assert derive_ref_base("1234-AB-5678") == ("1234", "5678")
+    assert derive_ref_base("CAM1") == ("0001", "0001")
+    assert derive_ref_base("") == ("0000", "0000")
+
+
+@pytest.mark.django_db
+def test_sync_cria_atualiza_e_remove_em_lote(django_assert_max_num_queries):
+    sizes = [("P", "01"), ("M", "02"), ("G", "03")]
+    colors = [("Preto", "10"), ("Branco", "20")]
+    p = Product.objects.create(
+        sku="CAM-001", name="Camiseta", ean_block=12345678, bling_extra={"grade": _grade(sizes, colors)}
+    )
+
+    with django_assert_max_num_queries(8):
+        res = sync_variants(p)
+    assert (res.created, res.updated, res.deleted) == (6, 0, 0)  # 3º parâmetro não gera variante
+    v = ProductVariant.objects.get(product=p, size_name="M", color_name="Branco")
+    assert (v.size_code, v.color_code) == ("02", "20")
+    assert v.ean13 == ean13_compose("1234", "5678", "02", "20")
+
+    # variante casa pelos códigos: troca de códigos P<->M renomeia as linhas,
+    # EAN e estoque ficam com o código (não quebra o UNIQUE de nome)
+    ProductVariant.objects.filter(pk=v.pk).update(stock_qty=Decimal("7"))
+    p.bling_extra = {"grade": _grade([("P", "02"), ("M", "01"), ("G", "03")], [("Branco", "20")])}
+    res = sync_variants(p)
+    assert (res.created, res.updated, res.deleted, res.unchanged) == (0, 2, 3, 1)
+    v.refresh_from_db()
+    assert (v.size_name, v.size_code) == ("P", "02") and v.ean13 == ean13_compose("1234", "5678", "02", "20")
+    assert v.stock_qty == Decimal("7")
+
+    assert sync_variants(p).unchanged == 3
+
+
+@pytest.mark.django_db
+def test_sync_recusa_ean_de_outro_produto():
+    grade = _grade([("P", "01")], [("Preto", "01")])
+    a = Product.objects.create(sku="A", name="A", bling_extra={"grade": grade})
+    ProductVariant.objects.create(product=a, size_name="X", sku="A-X", ean13=ean13_compose("1111", "2222", "01", "01"))
+    b = Product.objects.create(sku="B", name="B", ean_block=11112222, bling_extra={"grade": grade})
+    with pytest.raises(ValidationError):
+        sync_variants(b)
+    assert not ProductVariant.objects.filter(product=b).exists()
+
+
+@pytest.mark.django_db
+def test_sem_bloco_nao_materializa_ean_do_sku():
+    # "CAM-A-0001" e "CAL-B-0001" derivam o mesmo ref/base: nenhum dos dois pode travar o outro
+    grade = _grade([("P", "01")], [("Azul", "01")])
+    a = Product.objects.create(sku="CAM-A-0001", name="A", bling_extra={"grade": grade})
+    b = Product.objects.create(sku="CAL-B-0001", name="B", bling_extra={"grade": grade})
+    assert sync_variants(a) == sync_variants(b) == VariantSyncResult()
+    assert not ProductVariant.objects.exists()
+
+
+@pytest.mark.django_db
+def test_renomear_rotulo_mantem_variante_e_estoque_nao_some():
+    p = Product.objects.create(
+        sku="CAM-002", name="Camiseta", ean_block=22223333,
+        bling_extra={"grade": _grade([("P", "01"), ("M", "02")], [("Azul", "05")])},
+    )
+    sync_variants(p)
+    v = ProductVariant.objects.get(product=p, size_code="01")
+    ProductVariant.objects.filter(pk=v.pk).update(stock_qty=Decimal("3"))
+
+    p.bling_extra = {"grade": _grade([("Pequeno", "01"), ("M", "02")], [("Azul", "05")])}
+    res = sync_variants(p)
+    assert (res.updated, res.deleted) == (1, 0)
+    v.refresh_from_db()
+    assert v.size_name == "Pequeno" and v.stock_qty == Decimal("3")
+
+    # grade vazia (ou sem o código) não apaga variante com estoque: sync recusado inteiro
+    for grade in ({"parametros": []}, _grade([("M", "02")], [("Azul", "05")])):
+        p.bling_extra = {"grade": grade}
+        with pytest.raises(ValidationError, match="Pequeno / Azul"):
+            sync_variants(p)
+        assert ProductVariant.objects.filter(product=p).count() == 2
+
+
+@pytest.mark.django_db
+def test_comando_com_config_padrao_cria_variantes(settings):
+    from io import StringIO
+
+    from django.core.management import call_command
+
+    assert not settings.CATALOG_EAN_AUTO_BLOCKS  # padrão
+    p = Product.objects.create(sku="CAM-A-0001", name="A", bling_extra={"grade": _grade([("P", "01")], [("Azul", "01")])})
+    out = StringIO()
+    call_command("sync_product_variants", stdout=out)
+    assert "--assign-blocks" in out.getvalue() and not ProductVariant.objects.exists()
+
+    call_command("sync_product_variants", "--assign-blocks", stdout=StringIO())
+    p.refresh_from_db()
+    v = ProductVariant.objects.get(product=p)
+    assert p.ean_block is not None and (v.size_name, v.color_name) == ("P", "Azul")